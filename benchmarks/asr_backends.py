@@ -0,0 +1,88 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from evaluation import evaluate_asr
+from src.asr import ASR
+from src.asr_backends import BACKENDS
+from src.audio_io import SAMPLE_RATE
+from src.config import load_config
+
+def run_backend(asr, test_df, vad_config, output_dir):
+    """
+    Transcribes the test set with one backend.
+
+    Returns:
+        dict: Accuracy and latency figures for the backend.
+    """
+    predictions, ground_truths = [], []
+    latencies, audio_seconds = [], 0.0
+
+    for _, row in test_df.iterrows():
+        start = time.perf_counter()
+        audio, speech_chunks, _ = asr.segment_audio(row['audio_path'], vad_config)
+        transcription = asr.normalize_text(asr.transcribe_audio(audio, speech_chunks))
+        latencies.append(time.perf_counter() - start)
+
+        audio_seconds += len(audio) / SAMPLE_RATE
+        predictions.append(transcription)
+        ground_truths.append(str(row['transcription']))
+
+    os.makedirs(output_dir, exist_ok=True)
+    predictions_path = os.path.join(output_dir, "predictions.txt")
+    ground_truth_path = os.path.join(output_dir, "ground_truth.txt")
+    with open(predictions_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(predictions) + '\n')
+    with open(ground_truth_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(ground_truths) + '\n')
+
+    overall_wer, overall_cer = evaluate_asr(predictions_path, ground_truth_path, os.path.join(output_dir, "evaluation_report.csv"))
+
+    latencies.sort()
+    return {
+        'wer': overall_wer,
+        'cer': overall_cer,
+        'p50_latency_s': latencies[len(latencies) // 2],
+        'p95_latency_s': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'real_time_factor': sum(latencies) / max(audio_seconds, 1e-9)
+    }
+
+def main(model_name, backends, test_dataset_path, output_dir, limit):
+    config = load_config()
+    asr_config = config.get('asr_model', {})
+
+    test_df = pd.read_csv(test_dataset_path)
+    test_df = test_df[test_df['audio_path'].map(os.path.exists)]
+    if limit:
+        test_df = test_df.head(limit)
+
+    results = {}
+    for backend in backends:
+        print(f"\n=== Backend: {backend} ===")
+        asr = ASR(
+            model_name=model_name,
+            batch_size=asr_config.get('batch_size', 8),
+            backend=backend,
+            onnx_dir=asr_config.get('onnx_dir')
+        )
+        backend_dir = os.path.join(output_dir, f"{model_name.replace('/', '_')}_{backend}")
+        results[backend] = run_backend(asr, test_df, config.get('vad', {}), backend_dir)
+
+    summary = pd.DataFrame(results).T
+    print(f"\nModel: {model_name} ({len(test_df)} files)")
+    print(summary.to_string(float_format=lambda v: f"{v:.4f}"))
+    summary.to_csv(os.path.join(output_dir, f"{model_name.replace('/', '_')}_backends.csv"))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare WER/CER and latency of ASR inference backends.")
+    parser.add_argument("--model-name", type=str, default="openai/whisper-small", help="The name of the ASR model to evaluate.")
+    parser.add_argument("--backends", nargs="+", default=['torch', 'int8'], choices=BACKENDS, help="Backends to compare.")
+    parser.add_argument("--test-dataset-path", type=str, default="data/audio_dataset/audio_dataset.csv", help="CSV with 'audio_path' and 'transcription' columns.")
+    parser.add_argument("--output-dir", type=str, default="evaluation_results/backends", help="Directory to save the evaluation results.")
+    parser.add_argument("--limit", type=int, default=None, help="The number of samples to evaluate.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    main(args.model_name, args.backends, args.test_dataset_path, args.output_dir, args.limit)
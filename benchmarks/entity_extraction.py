@@ -0,0 +1,71 @@
+import argparse
+import csv
+import re
+import time
+
+from src.embedding_classifier import QUERY_COLUMNS
+from src.entity_extractor import EntityExtractor
+from src.models import Entity
+
+_PREVIOUS_PATTERNS = {
+    'phone': r'0[567]\d{8}',
+    'date': r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
+    'time': r'\d{1,2}[:.]\d{2}',
+    'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+}
+
+def _four_pass_extract(text):
+    """Previous extractor: one uncompiled case-insensitive finditer per entity type."""
+    entities = {}
+    for entity_type, pattern in _PREVIOUS_PATTERNS.items():
+        matches = [
+            Entity(type=entity_type, value=match.group(0), raw_text=match.group(0), confidence=0.8)
+            for match in re.finditer(pattern, text, re.IGNORECASE)
+        ]
+        if matches:
+            entities[entity_type] = matches
+    return entities
+
+def load_messages(dataset_path, text_file):
+    messages = []
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            messages.extend(row[column] for column in QUERY_COLUMNS if row.get(column))
+    with open(text_file, 'r', encoding='utf-8') as f:
+        messages.extend(line.rstrip('\n') for line in f)
+    return messages
+
+def measure(extract_all, messages, repeats):
+    """Returns the best per-message cost in microseconds over `repeats` runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        extract_all(messages)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+def main(dataset_path, text_file, repeats):
+    messages = load_messages(dataset_path, text_file)
+    print(f"Messages: {len(messages)} ({dataset_path} queries + {text_file})")
+
+    extractor = EntityExtractor()
+    strategies = [
+        ('four-pass (before)', lambda batch: [_four_pass_extract(text) for text in batch]),
+        ('single scan', lambda batch: [extractor.extract(text) for text in batch]),
+        ('extract_many', extractor.extract_many),
+    ]
+    for name, extract_all in strategies:
+        print(f"{name:<20} {measure(extract_all, messages, repeats):8.2f} us/message")
+
+    before = sum(len(v) for entities in map(_four_pass_extract, messages) for v in entities.values())
+    after = sum(len(v) for entities in extractor.extract_many(messages) for v in entities.values())
+    print(f"Entities found: {before} before, {after} now")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark per-message entity extraction cost.')
+    parser.add_argument('--dataset', type=str, default='data/algerian_call_center_dataset.csv', help='Call center dataset providing the customer queries.')
+    parser.add_argument('--text-file', type=str, default='ground_truth.txt', help='One message per line.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of timed runs per strategy.')
+    args = parser.parse_args()
+
+    main(args.dataset, args.text_file, args.repeats)
@@ -0,0 +1,78 @@
+import argparse
+import csv
+import random
+import time
+
+from src.embedding_classifier import QUERY_COLUMNS, EmbeddingIntentClassifier, load_topic_intents
+from src.ml_classifier import DEFAULT_NLU_MODEL, MLIntentClassifier
+from src.models import IntentType
+
+def load_eval_set(test_dataset_path, toxic_sample, seed):
+    """
+    (text, expected intent) pairs: every query of the call-centre rows in all
+    three languages, plus a random sample of the toxic comments.
+    """
+    topic_intents = load_topic_intents()
+    with open(test_dataset_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    queries, toxic = [], []
+    for row in rows:
+        if row['Topic'] == 'Toxic Comment':
+            toxic.append((row['Customer_Query_AR'].strip(), IntentType.TOXIC))
+            continue
+        intent = IntentType(topic_intents.get(row['Topic'], IntentType.INQUIRY.value))
+        queries.extend((row[column].strip(), intent) for column in QUERY_COLUMNS if row.get(column, '').strip())
+
+    random.Random(seed).shuffle(toxic)
+    return queries + toxic[:toxic_sample]
+
+def measure(classifier, eval_set):
+    """Returns accuracy, per-message latency percentiles and messages/s of one classifier."""
+    correct, latencies = 0, []
+    for text, expected in eval_set:
+        start = time.perf_counter()
+        intent = classifier.classify(text)
+        latencies.append(time.perf_counter() - start)
+        correct += intent.type == expected
+
+    latencies.sort()
+    return {
+        'accuracy': correct / len(eval_set),
+        'p50_latency_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_latency_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        'messages_per_s': len(latencies) / sum(latencies)
+    }
+
+def main(test_dataset_path, zero_shot_model, embedding_model, toxic_sample, toxic_exemplars, seed):
+    eval_set = load_eval_set(test_dataset_path, toxic_sample, seed)
+    print(f"Evaluation set: {len(eval_set)} messages from {test_dataset_path}")
+
+    classifiers = [
+        ('zero-shot', lambda: MLIntentClassifier(zero_shot_model)),
+        # Evaluation messages are held out of the exemplars
+        ('embedding', lambda: EmbeddingIntentClassifier(
+            embedding_model,
+            toxic_exemplars_path='data/comments.txt',
+            toxic_exemplars=toxic_exemplars,
+            cache_dir=None,
+            exclude_texts=[text for text, _ in eval_set]
+        )),
+    ]
+
+    print(f"{'classifier':<12} {'accuracy':>9} {'p50 ms':>9} {'p95 ms':>9} {'msg/s':>9}")
+    for name, build in classifiers:
+        result = measure(build(), eval_set)
+        print(f"{name:<12} {result['accuracy']:9.3f} {result['p50_latency_ms']:9.1f} {result['p95_latency_ms']:9.1f} {result['messages_per_s']:9.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare accuracy and latency of the zero-shot and embedding intent classifiers.')
+    parser.add_argument('--test-dataset', type=str, default='data/test_dataset.csv', help='Labelled test set (call-centre dataset columns).')
+    parser.add_argument('--zero-shot-model', type=str, default=DEFAULT_NLU_MODEL, help='Zero-shot NLI model.')
+    parser.add_argument('--embedding-model', type=str, default='BAAI/bge-m3', help='Sentence embedding model.')
+    parser.add_argument('--toxic-sample', type=int, default=100, help='Number of toxic comments added to the evaluation set.')
+    parser.add_argument('--toxic-exemplars', type=int, default=200, help='Number of toxic comments used as embedding exemplars.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the toxic sample.')
+    args = parser.parse_args()
+
+    main(args.test_dataset, args.zero_shot_model, args.embedding_model, args.toxic_sample, args.toxic_exemplars, args.seed)
@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+from pathlib import Path
+
+from src.classifiers import DEFAULT_LEXICON_DIR, AlgerianLanguageDetector
+from src.lexicon_engine import LexiconAutomaton, load_lexicon
+from src.normalization import normalize
+
+def _substring_detect(text, darija_words, french_words):
+    """Previous detector: one substring test per lexicon entry."""
+    text_normalized = normalize(text)
+    darija_count = sum(1 for word in darija_words if word in text_normalized)
+    french_count = sum(1 for word in french_words if word in text_normalized)
+    return darija_count, french_count
+
+def _grow(words, size, alphabet, seed):
+    """Pads a word list with random pseudo-words up to `size` entries."""
+    rng = random.Random(seed)
+    words = list(words)
+    while len(words) < size:
+        words.append(''.join(rng.choice(alphabet) for _ in range(7)))
+    return words
+
+def measure(detect, lines, repeats):
+    """Returns the best messages-per-second over `repeats` runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for line in lines:
+            detect(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+def main(text_file, lexicon_sizes, repeats, limit):
+    with open(text_file, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f][:limit]
+    print(f"Text file: {text_file} ({len(lines)} lines)")
+
+    darija = [normalize(word) for word in load_lexicon(str(Path(DEFAULT_LEXICON_DIR) / 'darija.txt'))]
+    french = [normalize(word) for word in load_lexicon(str(Path(DEFAULT_LEXICON_DIR) / 'french.txt'))]
+
+    print(f"{'entries per language':>20} {'substring msg/s':>16} {'automaton msg/s':>16}")
+    for size in [max(len(darija), len(french))] + lexicon_sizes:
+        darija_words = _grow(darija, size, 'بتثجحخدذرزسشصضطظعغفقكلمنهوي', seed=size)
+        french_words = _grow(french, size, 'bcdfghjklmnpqrstvwxz', seed=size + 1)
+
+        terms = {word: 'darija' for word in darija_words}
+        terms.update({word: 'french' for word in french_words})
+        automaton = LexiconAutomaton(terms)
+
+        substring = measure(lambda line: _substring_detect(line, darija_words, french_words), lines, repeats)
+        scanned = measure(lambda line: automaton.scan(normalize(line).split()), lines, repeats)
+        print(f"{size:20,} {substring:16,.0f} {scanned:16,.0f}")
+
+    detector = AlgerianLanguageDetector()
+    print(f"AlgerianLanguageDetector.detect (shipped lexicons): {measure(detector.detect, lines, repeats):,.0f} msg/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark language detection throughput against lexicon size.')
+    parser.add_argument('--text-file', type=str, default='ground_truth.txt', help='One message per line.')
+    parser.add_argument('--lexicon-sizes', type=int, nargs='*', default=[1000, 10000], help='Entries per language beyond the shipped lexicons.')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of timed runs per strategy.')
+    parser.add_argument('--limit', type=int, default=2000, help='Number of lines used.')
+    args = parser.parse_args()
+
+    main(args.text_file, args.lexicon_sizes, args.repeats, args.limit)
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from benchmarks.intent_classifiers import load_eval_set
+from src.lexicon_classifier import LexiconIntentClassifier
+from src.ml_classifier import DEFAULT_NLU_MODEL
+
+def main(test_dataset_path, toxic_sample, seed, zero_shot_model, skip_model):
+    eval_set = load_eval_set(test_dataset_path, toxic_sample, seed)
+    print(f"Evaluation set: {len(eval_set)} messages from {test_dataset_path}")
+
+    lexicon = LexiconIntentClassifier()
+    start = time.perf_counter()
+    decisions = [lexicon.classify(text) for text, _ in eval_set]
+    elapsed = time.perf_counter() - start
+
+    decided = [(text, expected, intent) for (text, expected), intent in zip(eval_set, decisions) if intent is not None]
+    correct = sum(intent.type == expected for _, expected, intent in decided)
+    stats = lexicon.stats()
+    print(f"Lexicon: {elapsed / len(eval_set) * 1e6:.1f} us/message")
+    print(f"Short-circuited: {stats['short_circuited']}/{stats['messages']} ({stats['short_circuit_rate']:.1%}) {stats['decisions']}")
+    print(f"Lexicon accuracy on short-circuited messages: {correct / max(len(decided), 1):.3f}")
+
+    if skip_model or not decided:
+        return
+
+    # Agreement with the model the fast path stands in for
+    from src.ml_classifier import MLIntentClassifier
+    model = MLIntentClassifier(zero_shot_model)
+    agreements = sum(model.classify(text).type == intent.type for text, _, intent in decided)
+    print(f"Agreement with {zero_shot_model} on short-circuited messages: {agreements / len(decided):.3f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the share of traffic the lexicon fast path decides and its agreement with the zero-shot model.')
+    parser.add_argument('--test-dataset', type=str, default='data/test_dataset.csv', help='Labelled test set (call-centre dataset columns).')
+    parser.add_argument('--toxic-sample', type=int, default=100, help='Number of toxic comments added to the evaluation set.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the toxic sample.')
+    parser.add_argument('--zero-shot-model', type=str, default=DEFAULT_NLU_MODEL, help='Zero-shot NLI model to compare against.')
+    parser.add_argument('--skip-model', action='store_true', help='Only measure the lexicon.')
+    args = parser.parse_args()
+
+    main(args.test_dataset, args.toxic_sample, args.seed, args.zero_shot_model, args.skip_model)
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import time
+
+from benchmarks.intent_classifiers import load_eval_set
+from src.nlu_service import NLUBatchService
+from src.orchestrator import AlgerianAgentOrchestrator
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+async def _loop_lag(stop, interval_s=0.005):
+    """Largest delay of a timer on the event loop: how long handlers blocked it."""
+    worst = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval_s
+        await asyncio.sleep(interval_s)
+        worst = max(worst, loop.time() - expected)
+    return worst
+
+async def run(messages, concurrency, redis_url, nlu_batching):
+    redis_client = None
+    if redis_url:
+        import redis.asyncio
+        redis_client = redis.asyncio.Redis.from_url(redis_url)
+
+    agent = AlgerianAgentOrchestrator(
+        {'tenant_id': 'benchmark'},
+        redis_client=redis_client,
+        nlu_service=NLUBatchService() if nlu_batching else None
+    )
+    agent.preload_models()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    totals, stages = [], {}
+
+    async def one(text):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await agent.process_message(text, customer_id='benchmark', tenant_id='benchmark')
+            totals.append((time.perf_counter() - start) * 1000)
+            for stage, ms in response['metadata']['stage_ms'].items():
+                stages.setdefault(stage, []).append(ms)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.ensure_future(_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in messages))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_lag = await lag_task
+
+    print(f"{len(messages)} messages, concurrency {concurrency}, nlu_batching {'on' if nlu_batching else 'off'}: {len(messages) / elapsed:.1f} msg/s")
+    print(f"end-to-end p50 {percentile(totals, 0.5):.1f} ms, p99 {percentile(totals, 0.99):.1f} ms, worst event loop lag {worst_lag * 1000:.1f} ms")
+    for stage, values in stages.items():
+        print(f"  {stage:<10} p50 {percentile(values, 0.5):8.2f} ms  p99 {percentile(values, 0.99):8.2f} ms")
+
+def main(test_dataset_path, limit, concurrency, redis_url, nlu_batching):
+    messages = [text for text, _ in load_eval_set(test_dataset_path, toxic_sample=limit, seed=0)][:limit]
+    asyncio.run(run(messages, concurrency, redis_url, nlu_batching))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='End-to-end text message latency, per-stage timings and event loop lag of the orchestrator.')
+    parser.add_argument('--test-dataset', type=str, default='data/test_dataset.csv', help='Messages to send (call-centre dataset columns).')
+    parser.add_argument('--limit', type=int, default=200, help='Number of messages.')
+    parser.add_argument('--concurrency', type=int, default=16, help='Messages in flight at once.')
+    parser.add_argument('--redis-url', type=str, default=None, help='Session store; without it sessions are not persisted.')
+    parser.add_argument('--nlu-batching', action='store_true', help='Classify through the cross-tenant NLU batching service.')
+    args = parser.parse_args()
+
+    main(args.test_dataset, args.limit, args.concurrency, args.redis_url, args.nlu_batching)
@@ -0,0 +1,55 @@
+import argparse
+import time
+
+from src.models import Entity, Intent, IntentType, Language, LanguageContext
+from src.response_templates import ResponseTemplateEngine, compile_template
+
+def _grow(engine, size):
+    """Pads the compiled table with synthetic topic templates up to `size` keys."""
+    table = dict(engine._table)
+    i = 0
+    while len(table) < size:
+        table[(IntentType.INQUIRY, 'fr', f'Synthetic topic {i}')] = (compile_template("Réponse {phone}", 'provide_information', True, False),)
+        i += 1
+    engine._table = table
+
+def measure(render, repeats, calls):
+    """Returns the best per-response cost in microseconds over `repeats` runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            render()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+def main(templates_path, sizes, repeats, calls):
+    tenant_config = {'tenant_id': 'benchmark', 'business_name': 'Demo Business'}
+    if templates_path:
+        tenant_config['response_templates'] = {'path': templates_path}
+
+    start = time.perf_counter()
+    engine = ResponseTemplateEngine(tenant_config)
+    print(f"Compiled {len(engine._table)} keys in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    entities = {'phone': [Entity(type='phone', value='0551234567', raw_text='0551234567', confidence=0.8)]}
+    cases = [
+        ('topic + darija', Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.9, parameters={'topic': 'Internet Outage'}), LanguageContext(primary=Language.DARIJA)),
+        ('topic + french', Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.9, parameters={'topic': 'Internet Outage'}), LanguageContext(primary=Language.FRENCH)),
+        ('english default', Intent(type=IntentType.RESERVATION, confidence=0.9), LanguageContext(primary=Language.MSA)),
+    ]
+    print(f"{'table keys':>10} " + ' '.join(f"{name:>16}" for name, _, _ in cases) + "  (us/response)")
+    for size in [len(engine._table)] + sizes:
+        _grow(engine, size)
+        costs = [measure(lambda: engine.render(intent, language, entities), repeats, calls) for _, intent, language in cases]
+        print(f"{size:10,} " + ' '.join(f"{cost:16.2f}" for cost in costs))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark response template compilation and per-response rendering cost against table size.')
+    parser.add_argument('--templates', type=str, default='data/templates/demo_tenant.csv', help='Tenant template CSV (Intent,Language,Topic,Text,Action).')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 100000], help='Table sizes beyond the compiled one.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of timed runs per case.')
+    parser.add_argument('--calls', type=int, default=20000, help='Responses rendered per run.')
+    args = parser.parse_args()
+
+    main(args.templates, args.sizes, args.repeats, args.calls)
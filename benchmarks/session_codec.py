@@ -0,0 +1,68 @@
+import argparse
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+from src.models import ConversationContext, Entity, Intent, IntentType, Language, LanguageContext
+from src.session_codec import decode_context, decode_legacy_json, encode_intent, encode_message, encode_state
+
+def _turn(context, i):
+    """Appends one turn as the orchestrator does and returns its new intent and messages."""
+    intent = Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.87, parameters={'topic': 'Internet Outage', 'similarity': 0.81})
+    context.language_context = LanguageContext(primary=Language.MIXED, contains_darija=True, contains_french=True, darija_words=['rani'], french_words=['connexion'], confidence=0.6)
+    context.intent_history.append(intent)
+    context.entities['phone'] = [Entity(type='phone', value='0551234567', raw_text='0551234567', confidence=0.8)]
+    messages = [
+        {'role': 'customer', 'message': f'salam, rani bla connexion men lbareh, ra9mi 0551234567 ({i})'},
+        {'role': 'agent', 'message': 'آسف على الإزعاج، ممكن تعطيني رقم الخط تاعك باش نشوف المشكل؟'},
+    ]
+    context.conversation_history.extend(messages)
+    context.updated_at = datetime.now()
+    return [intent], messages
+
+def main(turns, repeats):
+    context = ConversationContext(conversation_id='benchmark', tenant_id='benchmark', customer_id='benchmark', language_context=LanguageContext(primary=Language.DARIJA))
+    json_bytes, codec_bytes = [], []
+    json_s, codec_s = 0.0, 0.0
+    intents, history = [], []
+    for i in range(turns):
+        new_intents, new_history = _turn(context, i)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            blob = json.dumps(asdict(context), default=str).encode('utf-8')
+        json_s += (time.perf_counter() - start) / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            written = [encode_state(context)] + [encode_intent(intent) for intent in new_intents] + [encode_message(message) for message in new_history]
+        codec_s += (time.perf_counter() - start) / repeats
+
+        json_bytes.append(len(blob))
+        codec_bytes.append(sum(map(len, written)))
+        intents += written[1:1 + len(new_intents)]
+        history += written[1 + len(new_intents):]
+
+    state = encode_state(context)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode_legacy_json(blob)
+    json_load_ms = (time.perf_counter() - start) / repeats * 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        decode_context(state, intents, history)
+    codec_load_ms = (time.perf_counter() - start) / repeats * 1000
+
+    print(f"{turns} turns")
+    print(f"{'':<8} {'last turn B':>12} {'total B':>10} {'save us/turn':>13} {'load ms':>8}")
+    print(f"{'json':<8} {json_bytes[-1]:12,} {sum(json_bytes):10,} {json_s / turns * 1e6:13.1f} {json_load_ms:8.3f}")
+    print(f"{'msgpack':<8} {codec_bytes[-1]:12,} {sum(codec_bytes):10,} {codec_s / turns * 1e6:13.1f} {codec_load_ms:8.3f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bytes written per turn and save/load time of the session codec vs the previous JSON blob.')
+    parser.add_argument('--turns', type=int, default=50, help='Turns in the simulated conversation.')
+    parser.add_argument('--repeats', type=int, default=20, help='Timed encodings per turn.')
+    args = parser.parse_args()
+
+    main(args.turns, args.repeats)
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Modules whose presence shows which stacks a worker imported
+HEAVY_MODULES = ('torch', 'transformers', 'librosa', 'webrtcvad')
+
+def _rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def _start_worker():
+    """Child process: import the API, run its startup, and wait for background preloading."""
+    start = time.perf_counter()
+    from src import deployment_api
+    imported = time.perf_counter()
+
+    await deployment_api.startup_event()
+    ready = time.perf_counter()
+    ready_rss = _rss_mb()
+
+    if deployment_api.state._preload_task:
+        await deployment_api.state._preload_task
+    models_ready = time.perf_counter()
+
+    return {
+        'import_s': imported - start,
+        'ready_s': ready - start,
+        'ready_rss_mb': ready_rss,
+        'models_ready_s': models_ready - start,
+        'models_rss_mb': _rss_mb(),
+        'modules': [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+def measure(profile, preload, config_path):
+    """Starts a fresh interpreter for one profile/preload combination and returns its report."""
+    env = {**os.environ, 'WORKER_PROFILE': profile, 'MODEL_PRELOAD': preload, 'CONFIG_PATH': config_path}
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child'],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(profiles, preloads, config_path):
+    print(f"{'profile':<8} {'preload':<11} {'import':>8} {'ready':>8} {'RSS':>9} {'models':>8} {'RSS':>9}  imported")
+    for profile in profiles:
+        for preload in preloads:
+            report = measure(profile, preload, config_path)
+            print(
+                f"{profile:<8} {preload:<11} {report['import_s']:7.2f}s {report['ready_s']:7.2f}s "
+                f"{report['ready_rss_mb']:7.0f}MB {report['models_ready_s']:7.2f}s {report['models_rss_mb']:7.0f}MB  "
+                f"{', '.join(report['modules']) or '-'}"
+            )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark API worker startup time and RSS per profile and preload mode.')
+    parser.add_argument('--profiles', nargs='+', default=['text', 'full'], choices=['text', 'full'], help='Worker profiles to start.')
+    parser.add_argument('--preloads', nargs='+', default=['lazy', 'background', 'eager'], choices=['lazy', 'background', 'eager'], help='Model preload modes to start.')
+    parser.add_argument('--config-path', type=str, default='config.yml', help='Path to the configuration file.')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_start_worker())))
+    else:
+        main(args.profiles, args.preloads, args.config_path)
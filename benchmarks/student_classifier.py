@@ -0,0 +1,50 @@
+import argparse
+import csv
+import os
+import time
+
+from src.ml_classifier import DEFAULT_NLU_MODEL
+from src.student_classifier import DEFAULT_STUDENT_MODEL_PATH, StudentIntentClassifier
+
+def throughput(classify_batch, texts, batch_size):
+    """Messages per second classifying `texts` in batches of `batch_size`."""
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        classify_batch(texts[offset:offset + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+def main(model_path, heldout_path, teacher_model, teacher_sample, skip_teacher):
+    with open(heldout_path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    texts = [row['text'] for row in rows]
+    print(f"Held-out set: {len(texts)} texts labelled by the teacher ({heldout_path})")
+
+    student = StudentIntentClassifier(model_path)
+    predictions = student.classify_batch(texts)
+    agreement = sum(intent.type.value == row['intent'] for intent, row in zip(predictions, rows)) / len(rows)
+    print(f"Student agreement with the teacher: {agreement:.4f}")
+
+    print(f"{'classifier':<10} {'batch':>6} {'msg/s':>12}")
+    for batch_size in (1, 64):
+        print(f"{'student':<10} {batch_size:>6} {throughput(student.classify_batch, texts, batch_size):12,.0f}")
+
+    if skip_teacher:
+        return
+
+    from src.ml_classifier import MLIntentClassifier
+    teacher = MLIntentClassifier(teacher_model)
+    sample = texts[:teacher_sample]
+    for batch_size in (1, 16):
+        print(f"{'teacher':<10} {batch_size:>6} {throughput(teacher.classify_batch, sample, batch_size):12,.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare agreement and throughput of the distilled student with the zero-shot teacher.')
+    parser.add_argument('--model-path', type=str, default=DEFAULT_STUDENT_MODEL_PATH, help='Student artifact.')
+    parser.add_argument('--heldout-path', type=str, default=None, help='Held-out texts with teacher labels (defaults to the one next to the artifact).')
+    parser.add_argument('--teacher-model', type=str, default=DEFAULT_NLU_MODEL, help='Zero-shot teacher model.')
+    parser.add_argument('--teacher-sample', type=int, default=200, help='Number of held-out texts timed with the (slow) teacher.')
+    parser.add_argument('--skip-teacher', action='store_true', help='Only measure the student.')
+    args = parser.parse_args()
+
+    heldout_path = args.heldout_path or f"{os.path.splitext(args.model_path)[0]}_heldout.csv"
+    main(args.model_path, heldout_path, args.teacher_model, args.teacher_sample, args.skip_teacher)
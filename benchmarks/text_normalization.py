@@ -0,0 +1,47 @@
+import argparse
+import re
+import time
+
+from src.normalization import normalize, normalize_many
+
+def _seven_pass_normalize(text):
+    """Previous ASR normalizer: one regex or replace pass per rule."""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'[\u064B-\u0652]', '', text)
+    text = text.replace('أ', 'ا').replace('إ', 'ا').replace('آ', 'ا')
+    text = text.replace('ة', 'ه')
+    text = text.replace('ى', 'ي')
+    text = re.sub(r'(.)\1+', r'\1', text)
+    return text
+
+def measure(normalize_batch, lines, repeats):
+    """Returns the best lines-per-second over `repeats` runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        normalize_batch(lines)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+def main(text_file, repeats):
+    with open(text_file, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f]
+    print(f"Text file: {text_file} ({len(lines)} lines)")
+
+    strategies = [
+        ('seven-pass (before)', lambda batch: [_seven_pass_normalize(line) for line in batch]),
+        ('normalize per line', lambda batch: [normalize(line) for line in batch]),
+        ('normalize_many', normalize_many),
+    ]
+    for name, normalize_batch in strategies:
+        print(f"{name:<22} {measure(normalize_batch, lines, repeats):12,.0f} lines/s")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark text normalization throughput.')
+    parser.add_argument('--text-file', type=str, default='ground_truth.txt', help='One text per line.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of timed runs per strategy.')
+    args = parser.parse_args()
+
+    main(args.text_file, args.repeats)
@@ -1,6 +1,6 @@
 import pandas as pd
-import re
 from difflib import SequenceMatcher
+from src.normalization import normalize, normalize_many
 
 # Load the comprehensive dataset
 try:
@@ -8,22 +8,26 @@ try:
     DATASET_PATH = 'algerian_call_center_dataset.csv'
     df = pd.read_csv(DATASET_PATH)
 except FileNotFoundError:
-    print(f"Error: Dataset not found at {DATAET_PATH}. Please ensure it is in the correct directory.")
+    print(f"Error: Dataset not found at {DATASET_PATH}. Please ensure it is in the correct directory.")
     exit()
 
+# Normalized dataset columns, computed once per column instead of on every query
+_normalized_columns = {}
+
+def _normalized_column(column):
+    if column not in _normalized_columns:
+        _normalized_columns[column] = normalize_many(df[column].astype(str)).tolist()
+    return _normalized_columns[column]
+
 def get_best_match(query, column):
     """Finds the best matching query in a given column using simple string similarity."""
     best_score = 0
     best_match_index = -1
     
-    # Simple preprocessing: convert to lowercase and remove punctuation/extra spaces
-    processed_query = re.sub(r'[^\w\s]', '', query).lower().strip()
+    # Same canonical form as the (pre-normalized) dataset column
+    processed_query = normalize(query)
 
-    for index, row in df.iterrows():
-        # Handle potential NaN values in the column
-        target_text = str(row[column])
-        processed_target = re.sub(r'[^\w\s]', '', target_text).lower().strip()
-        
+    for index, processed_target in enumerate(_normalized_column(column)):
         # Use SequenceMatcher for a simple similarity score
         score = SequenceMatcher(None, processed_query, processed_target).ratio()
         
@@ -0,0 +1,131 @@
+import argparse
+import csv
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+
+from src.embedding_classifier import QUERY_COLUMNS
+from src.ml_classifier import DEFAULT_NLU_MODEL
+from src.normalization import normalize
+from src.student_classifier import DEFAULT_STUDENT_MODEL_PATH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def load_texts(ground_truth_path, dataset_path):
+    """Transcripts and call-centre queries (AR/FR/EN), deduplicated on their normalized form."""
+    texts = []
+    with open(ground_truth_path, 'r', encoding='utf-8') as f:
+        texts.extend(line.strip() for line in f)
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            texts.extend((row.get(column) or '').strip() for column in QUERY_COLUMNS)
+
+    unique, seen = [], set()
+    for text in texts:
+        key = normalize(text)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(text)
+    return unique
+
+def label_with_teacher(texts, labels_path, teacher_model, batch_size=32):
+    """
+    Labels texts with the zero-shot teacher. Labels are appended to `labels_path`
+    as they are produced, so an interrupted run resumes where it stopped.
+    """
+    labelled = {}
+    if os.path.exists(labels_path):
+        with open(labels_path, 'r', encoding='utf-8') as f:
+            labelled = {row['text']: (row['intent'], float(row['confidence'])) for row in csv.DictReader(f)}
+
+    pending = [text for text in texts if text not in labelled]
+    logging.info(f"{len(labelled)} texts already labelled, {len(pending)} to label with {teacher_model}")
+
+    if pending:
+        from src.ml_classifier import MLIntentClassifier
+        teacher = MLIntentClassifier(teacher_model)
+
+        write_header = not os.path.exists(labels_path)
+        with open(labels_path, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(['text', 'intent', 'confidence'])
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                for text, intent in zip(batch, teacher.classify_batch(batch)):
+                    labelled[text] = (intent.type.value, intent.confidence)
+                    writer.writerow([text, intent.type.value, f"{intent.confidence:.4f}"])
+                f.flush()
+                logging.info(f"Labelled {min(start + batch_size, len(pending))}/{len(pending)}")
+
+    return [labelled[text] for text in texts]
+
+def train_student(texts, intents, max_iter=1000):
+    """Character n-gram TF-IDF + logistic regression over normalized text."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    student = Pipeline([
+        ('tfidf', TfidfVectorizer(preprocessor=normalize, analyzer='char_wb', ngram_range=(2, 5), min_df=2, sublinear_tf=True)),
+        ('classifier', LogisticRegression(max_iter=max_iter, class_weight='balanced')),
+    ])
+    student.fit(texts, intents)
+    return student
+
+def agreement_report(student, texts, teacher_intents, report_path):
+    """Writes per-intent precision/recall of the student against the teacher and returns the overall agreement."""
+    from sklearn.metrics import classification_report
+
+    predictions = student.predict(texts)
+    agreement = sum(p == t for p, t in zip(predictions, teacher_intents)) / len(texts)
+    report = classification_report(teacher_intents, predictions, zero_division=0)
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(f"Held-out agreement with the teacher: {agreement:.4f} ({len(texts)} texts)\n\n{report}")
+    logging.info(f"Held-out agreement with the teacher: {agreement:.4f}\n{report}")
+    return agreement
+
+def main(ground_truth_path, dataset_path, labels_path, model_path, teacher_model, test_size=0.2, random_state=42):
+    import joblib
+    from sklearn.model_selection import train_test_split
+
+    texts = load_texts(ground_truth_path, dataset_path)
+    labels = label_with_teacher(texts, labels_path, teacher_model)
+    intents = [intent for intent, _ in labels]
+
+    train_texts, test_texts, train_intents, test_intents = train_test_split(texts, intents, test_size=test_size, random_state=random_state)
+    logging.info(f"Training the student on {len(train_texts)} texts: {dict(Counter(train_intents))}")
+    student = train_student(train_texts, train_intents)
+
+    base_path = os.path.splitext(model_path)[0]
+    agreement = agreement_report(student, test_texts, test_intents, f"{base_path}_report.txt")
+
+    # Held-out texts with their teacher labels, for benchmarks.student_classifier
+    with open(f"{base_path}_heldout.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['text', 'intent'])
+        writer.writerows(zip(test_texts, test_intents))
+
+    os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+    joblib.dump({
+        'pipeline': student,
+        'teacher_model': teacher_model,
+        'trained_at': datetime.now().isoformat(),
+        'train_size': len(train_texts),
+        'heldout_agreement': agreement,
+    }, model_path)
+    logging.info(f"Student saved to {model_path}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distill the zero-shot intent classifier into a character n-gram student.")
+    parser.add_argument("--ground-truth", default="ground_truth.txt", help="Transcripts, one per line.")
+    parser.add_argument("--dataset", default="data/algerian_call_center_dataset.csv", help="Call center dataset providing the customer queries.")
+    parser.add_argument("--labels-path", default="data/teacher_intent_labels.csv", help="Teacher labels (reused and extended across runs).")
+    parser.add_argument("--model-path", default=DEFAULT_STUDENT_MODEL_PATH, help="Where the student artifact is written.")
+    parser.add_argument("--teacher-model", default=DEFAULT_NLU_MODEL, help="Zero-shot teacher model.")
+    parser.add_argument("--test-size", type=float, default=0.2, help="Share of texts held out for the agreement report.")
+    args = parser.parse_args()
+    main(args.ground_truth, args.dataset, args.labels_path, args.model_path, args.teacher_model, args.test_size)
@@ -0,0 +1,57 @@
+import pandas as pd
+import argparse
+import csv
+from collections import Counter
+
+from src.normalization import normalize
+
+# Label columns of the AlgD toxicity dataset; a comment is toxic if any of them says yes
+LABEL_COLUMNS = ['Hate speech', 'cyberbullying التنمر الإلكتروني', ' Offensive Language  الكلام الـمسيئ']
+QUERY_COLUMNS = ['Customer_Query_AR', 'Customer_Query_FR', 'Customer_Query_EN']
+
+def main(xlsx_path, call_center_dataset_path, output_path, min_count=15, min_precision=0.95):
+    """
+    Proposes toxic lexicon candidates: normalized tokens that (almost) only occur
+    in comments labelled toxic and never in call-centre queries. The output is
+    reviewed by hand before terms are added to data/lexicons/toxic.txt.
+    """
+    df = pd.read_excel(xlsx_path)
+    df = df[df['comment'].notna()]
+    toxic = (df[LABEL_COLUMNS] == 'yes').any(axis=1)
+
+    counts, toxic_counts = Counter(), Counter()
+    for comment, is_toxic in zip(df['comment'], toxic):
+        for token in set(normalize(str(comment)).split()):
+            counts[token] += 1
+            toxic_counts[token] += int(is_toxic)
+
+    # Words customers use with the call centre can never be lexicon terms
+    call_center = pd.read_csv(call_center_dataset_path, usecols=QUERY_COLUMNS)
+    call_center_tokens = {token for column in QUERY_COLUMNS for text in call_center[column].dropna() for token in normalize(text).split()}
+
+    candidates = [
+        (token, toxic_counts[token], counts[token])
+        for token in counts
+        if counts[token] >= min_count
+        and toxic_counts[token] / counts[token] >= min_precision
+        and token not in call_center_tokens
+    ]
+    candidates.sort(key=lambda candidate: -candidate[1])
+
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['term', 'toxic_count', 'count', 'precision'])
+        for token, toxic_count, count in candidates:
+            writer.writerow([token, toxic_count, count, f"{toxic_count / count:.3f}"])
+
+    print(f"{len(candidates)} candidates written to {output_path} (toxic base rate {toxic.mean():.2f})")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Propose toxic lexicon terms from the labelled toxicity dataset.")
+    parser.add_argument("--xlsx-path", default="data/AlgD_Toxicity_Speech_Dataset.xlsx", help="Path to the labelled toxicity dataset.")
+    parser.add_argument("--call-center-dataset", default="data/algerian_call_center_dataset.csv", help="Path to the call center dataset.")
+    parser.add_argument("--output-path", default="toxic_lexicon_candidates.csv", help="Path to the candidates CSV file.")
+    parser.add_argument("--min-count", type=int, default=15, help="Minimum number of comments containing the term.")
+    parser.add_argument("--min-precision", type=float, default=0.95, help="Minimum share of those comments labelled toxic.")
+    args = parser.parse_args()
+    main(args.xlsx_path, args.call_center_dataset, args.output_path, args.min_count, args.min_precision)
@@ -2,8 +2,9 @@
 import argparse
 import pandas as pd
 from jiwer import wer, cer
+from src.normalization import normalize_many
 
-def evaluate_asr(predictions_file, ground_truth_file, report_path):
+def evaluate_asr(predictions_file, ground_truth_file, report_path, normalize=True):
     """
     Evaluates ASR performance by calculating WER, CER, and generating a detailed report.
 
@@ -11,6 +12,11 @@ def evaluate_asr(predictions_file, ground_truth_file, report_path):
         predictions_file (str): Path to the file containing predicted transcriptions.
         ground_truth_file (str): Path to the file containing ground truth transcriptions.
         report_path (str): Path to save the detailed evaluation report.
+        normalize (bool, optional): Score both sides in the canonical form of
+            src.normalization rather than raw Arabic forms. Defaults to True.
+
+    Returns:
+        tuple: Overall (WER, CER).
     """
     with open(predictions_file, 'r', encoding='utf-8') as f:
         predictions = [line.strip() for line in f]
@@ -21,6 +27,10 @@ def evaluate_asr(predictions_file, ground_truth_file, report_path):
     if len(predictions) != len(ground_truth):
         raise ValueError("The number of predictions and ground truth lines do not match.")
 
+    if normalize:
+        predictions = normalize_many(predictions)
+        ground_truth = normalize_many(ground_truth)
+
     # Calculate overall metrics
     overall_wer = wer(ground_truth, predictions)
     overall_cer = cer(ground_truth, predictions)
@@ -43,11 +53,14 @@ def evaluate_asr(predictions_file, ground_truth_file, report_path):
 
     print(f"Detailed evaluation report saved to {report_path}")
 
+    return overall_wer, overall_cer
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Evaluate ASR performance.")
     parser.add_argument("predictions_file", help="Path to the file with predicted transcriptions.")
     parser.add_argument("ground_truth_file", help="Path to the file with ground truth transcriptions.")
     parser.add_argument("--report-path", default="evaluation_report.csv", help="Path to save the detailed report.")
+    parser.add_argument("--no-normalize", action="store_true", help="Score raw text instead of normalized text.")
     args = parser.parse_args()
 
-    evaluate_asr(args.predictions_file, args.ground_truth_file, args.report_path)
+    evaluate_asr(args.predictions_file, args.ground_truth_file, args.report_path, normalize=not args.no_normalize)
@@ -1,15 +1,29 @@
 import argparse
 from src.asr import ASR
+from src.asr_backends import BACKENDS
+from src.segmentation import format_report
 
 def main():
     parser = argparse.ArgumentParser(description='ASR inference script.')
     parser.add_argument('--audio-file', type=str, required=True, help='Path to the audio file.')
     parser.add_argument('--model-name', type=str, default='openai/whisper-tiny', help='Name of the ASR model to use.')
     parser.add_argument('--device', type=str, default='cpu', help='Device to run the model on (e.g., "cpu", "cuda").')
+    parser.add_argument('--batch-size', type=int, default=8, help='Maximum number of speech chunks decoded per generate() call.')
+    parser.add_argument('--backend', type=str, default='torch', choices=BACKENDS, help='Inference backend: torch, int8 (dynamic quantization) or onnx.')
+    parser.add_argument('--assistant-model', type=str, default=None, help='Smaller Whisper model drafting tokens for assisted decoding (e.g. openai/whisper-tiny).')
+    parser.add_argument('--language', type=str, default=None, help='Force the Whisper language (e.g. "ar", "fr") instead of detecting it per chunk.')
+    parser.add_argument('--long-audio', action='store_true', help='Stream the file block by block at constant memory and print timestamped segments as they are decoded.')
     args = parser.parse_args()
 
-    asr = ASR(model_name=args.model_name, device=args.device)
-    audio, speech_chunks = asr.vad_split(args.audio_file)
+    asr = ASR(model_name=args.model_name, device=args.device, batch_size=args.batch_size, backend=args.backend, assistant_model_name=args.assistant_model, language=args.language)
+
+    if args.long_audio:
+        for segment in asr.transcribe_long_audio(args.audio_file):
+            print(f"[{segment['start'] / 1000:8.2f}s - {segment['end'] / 1000:8.2f}s] {asr.normalize_text(segment['text'])}")
+        return
+
+    audio, speech_chunks, report = asr.segment_audio(args.audio_file)
+    print(format_report(report))
     transcription = asr.transcribe_audio(audio, speech_chunks)
     normalized_transcription = asr.normalize_text(transcription)
 
@@ -1,11 +1,11 @@
-
 import argparse
 import pandas as pd
 import asyncio
-from src.asr_agent_integration import VoiceAgentPipeline, load_config
+import time
+from src.asr_agent_integration import VoiceAgentPipeline, load_config, get_transcription_cache_stats
 import os
 
-async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None):
+async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None, decoding='plain', cache_dir=None):
     """
     Runs the ASR model evaluation pipeline.
 
@@ -14,9 +14,18 @@ async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None):
         test_dataset_path (str): Path to the test dataset CSV file.
         output_dir (str): Directory to save the evaluation results.
         limit (int, optional): The number of samples to evaluate. Defaults to None.
+        decoding (str, optional): 'plain' or 'assisted' decoding. Defaults to 'plain'.
+        cache_dir (str, optional): Directory of the transcription cache, so unchanged
+            audio is not re-transcribed across runs. Defaults to None (no cache).
+
+    Returns:
+        dict: WER, CER, mean per-call latency and transcription cache hit rate.
     """
     config = load_config()
     config['asr_model']['name'] = model_name
+    config['asr_model']['decoding'] = decoding
+    if cache_dir:
+        config['transcription_cache'] = {**config.get('transcription_cache', {}), 'enabled': True, 'disk_dir': cache_dir}
 
     pipeline = VoiceAgentPipeline(config=config)
 
@@ -27,6 +36,7 @@ async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None):
 
     predictions = []
     ground_truths = []
+    latencies = []
 
     for index, row in test_df.iterrows():
         # Assuming the dataset has 'audio_path' and 'transcription' columns
@@ -37,15 +47,18 @@ async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None):
             print(f"Warning: Audio file not found at {audio_path}. Skipping.")
             continue
 
+        start = time.perf_counter()
         result = await pipeline.process_voice_call(audio_path=audio_path, customer_id=f"eval_{index}")
+        latencies.append(time.perf_counter() - start)
 
         predictions.append(result['transcription']['text'])
         ground_truths.append(ground_truth)
 
     # Save predictions and ground truths to files
-    predictions_path = os.path.join(output_dir, "predictions.txt")
+    suffix = "" if decoding == 'plain' else f"_{decoding}"
+    predictions_path = os.path.join(output_dir, f"predictions{suffix}.txt")
     ground_truth_path = os.path.join(output_dir, "ground_truth.txt")
-    report_path = os.path.join(output_dir, f"{model_name.replace('/', '_')}_evaluation_report.csv")
+    report_path = os.path.join(output_dir, f"{model_name.replace('/', '_')}{suffix}_evaluation_report.csv")
 
     with open(predictions_path, 'w', encoding='utf-8') as f:
         for pred in predictions:
@@ -57,7 +70,25 @@ async def run_evaluation(model_name, test_dataset_path, output_dir, limit=None):
 
     # Run the evaluation script
     from evaluation import evaluate_asr
-    evaluate_asr(predictions_path, ground_truth_path, report_path)
+    overall_wer, overall_cer = evaluate_asr(predictions_path, ground_truth_path, report_path)
+
+    mean_latency = sum(latencies) / len(latencies) if latencies else 0.0
+    print(f"Mean latency per call ({decoding} decoding): {mean_latency:.3f} s")
+
+    cache_stats = get_transcription_cache_stats()
+    hit_rate = cache_stats['hit_rate'] if cache_stats else 0.0
+    if cache_stats:
+        print(f"Transcription cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses (hit rate {hit_rate:.1%})")
+
+    return {'wer': overall_wer, 'cer': overall_cer, 'mean_latency_s': mean_latency, 'cache_hit_rate': hit_rate}
+
+async def main(args):
+    results = {}
+    for decoding in args.decoding:
+        results[decoding] = await run_evaluation(args.model_name, args.test_dataset_path, args.output_dir, args.limit, decoding, args.cache_dir)
+
+    print(f"\nDecoding comparison for {args.model_name}:")
+    print(pd.DataFrame(results).T.to_string(float_format=lambda v: f"{v:.4f}"))
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Run ASR model evaluation.")
@@ -65,8 +96,10 @@ if __name__ == '__main__':
     parser.add_argument("--test-dataset-path", type=str, default="data/audio_dataset/audio_dataset.csv", help="Path to the test dataset CSV file.")
     parser.add_argument("--output-dir", type=str, default="evaluation_results", help="Directory to save the evaluation results.")
     parser.add_argument("--limit", type=int, default=None, help="The number of samples to evaluate.")
+    parser.add_argument("--decoding", nargs="+", default=["plain"], choices=["plain", "assisted"], help="Decoding modes to evaluate, e.g. --decoding plain assisted.")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Transcription cache directory; unchanged audio is not re-transcribed on later runs.")
     args = parser.parse_args()
 
     os.makedirs(args.output_dir, exist_ok=True)
 
-    asyncio.run(run_evaluation(args.model_name, args.test_dataset_path, args.output_dir, args.limit))
+    asyncio.run(main(args))
@@ -1,118 +1,76 @@
-import webrtcvad
-import librosa
 import numpy as np
-import torch
-from transformers import WhisperForConditionalGeneration, WhisperProcessor
-from typing import List, Dict, Tuple
-import re
+from typing import Iterator, List, Dict, Optional, Tuple
+
+from src import inference
+from src.asr_backends import get_whisper
+from src.decoding import DecodingPolicy
+from src.audio_io import FloatView
 
 class ASR:
     """
     A class to perform Automatic Speech Recognition (ASR) using the Whisper model.
     It includes methods for voice activity detection (VAD), transcription, and text normalization.
     """
-    def __init__(self, model_name="openai/whisper-tiny", device="cpu"):
-        self.processor = WhisperProcessor.from_pretrained(model_name)
-        self.model = WhisperForConditionalGeneration.from_pretrained(model_name)
-        self.model.to(device)
+    def __init__(self, model_name="openai/whisper-tiny", device="cpu", batch_size=inference.DEFAULT_BATCH_SIZE, backend="torch", onnx_dir=None, assistant_model_name=None, language=None):
+        self.processor, self.model = get_whisper(model_name, backend=backend, onnx_dir=onnx_dir, device=device)
+        self.batch_size = batch_size
+        self.decoding_policy = DecodingPolicy(language=language)
+
+        # Optional draft model for assisted (speculative) decoding
+        self.assistant_model = None
+        if assistant_model_name:
+            _, self.assistant_model = get_whisper(assistant_model_name, backend=backend, device=device)
 
-    def read_wave(self, path: str) -> Tuple[np.ndarray, int]:
-        """Reads a .wav file and returns the audio data and sample rate."""
-        audio, sample_rate = librosa.load(path, sr=16000, mono=True)
-        return audio, sample_rate
+    def read_wave(self, path: str) -> Tuple[FloatView, int]:
+        """Reads a .wav file and returns a float view of the 16 kHz audio data and the sample rate."""
+        return inference.read_wave(path)
 
-    def vad_split(self, audio_path: str, aggressiveness: int = 3) -> Tuple[np.ndarray, List[Dict[str, int]]]:
+    def vad_split(self, audio_path: str, aggressiveness: int = 3) -> Tuple[FloatView, List[Dict[str, int]]]:
         """
         Performs Voice Activity Detection (VAD) on an audio file and splits it into speech chunks.
         """
-        audio, sample_rate = self.read_wave(audio_path)
-        pcm_data = (audio * 32767).astype(np.int16).tobytes()
-
-        vad = webrtcvad.Vad(aggressiveness)
-
-        frame_duration_ms = 30  # ms
-        frame_samples = int(sample_rate * frame_duration_ms / 1000)
-
-        speech_chunks = []
-        is_speech = False
-        start_frame = 0
-
-        for i in range(0, len(pcm_data), frame_samples * 2): # *2 because it's 16-bit
-            frame = pcm_data[i:i + frame_samples * 2]
-            if len(frame) < frame_samples * 2:
-                break
-
-            current_frame_is_speech = vad.is_speech(frame, sample_rate)
+        return inference.vad_split(audio_path, aggressiveness=aggressiveness)
 
-            if not is_speech and current_frame_is_speech:
-                start_frame = i // (frame_samples * 2)
-                is_speech = True
-            elif is_speech and not current_frame_is_speech:
-                end_frame = i // (frame_samples * 2)
-                speech_chunks.append({
-                    "start": start_frame * frame_duration_ms,
-                    "end": end_frame * frame_duration_ms
-                })
-                is_speech = False
-
-        if is_speech: # If the audio ends on a speech segment
-            end_frame = len(pcm_data) // (frame_samples * 2)
-            speech_chunks.append({
-                "start": start_frame * frame_duration_ms,
-                "end": end_frame * frame_duration_ms
-            })
-
-        return audio, speech_chunks
+    def segment_audio(self, audio_path: str, vad_config: Optional[Dict] = None) -> Tuple[FloatView, List[Dict[str, int]], Dict]:
+        """
+        Performs VAD and packs the speech chunks into Whisper-sized windows.
+        Returns the audio, the windows and a report of the encoder windows saved.
+        """
+        return inference.segment_audio(audio_path, vad_config)
 
-    def transcribe_audio(self, audio: np.ndarray, speech_chunks: List[Dict[str, int]]) -> str:
+    def transcribe_audio(self, audio: np.ndarray, speech_chunks: List[Dict[str, int]], batch_size: Optional[int] = None) -> str:
         """
         Transcribes audio chunks using the Whisper ASR model.
+        Chunks are decoded in padded batches of at most `batch_size` (defaults to the instance setting).
         """
-        if not speech_chunks:
-            return ""
-
-        full_transcription = ""
-        sample_rate = 16000
-
-        for chunk in speech_chunks:
-            start_sample = int(chunk["start"] / 1000 * sample_rate)
-            end_sample = int(chunk["end"] / 1000 * sample_rate)
-            audio_segment = audio[start_sample:end_sample]
-
-            if len(audio_segment) > 0:
-                input_features = self.processor(audio_segment, sampling_rate=sample_rate, return_tensors="pt").input_features.to(self.model.device)
-
-                # Generate token ids
-                predicted_ids = self.model.generate(input_features)
-
-                # Decode token ids to text
-                transcription = self.processor.batch_decode(predicted_ids, skip_special_tokens=True)[0]
-                full_transcription += transcription + " "
-
-        return full_transcription.strip()
+        return inference.transcribe_audio(
+            self.model,
+            self.processor,
+            audio,
+            speech_chunks,
+            batch_size=batch_size or self.batch_size,
+            assistant_model=self.assistant_model,
+            policy=self.decoding_policy
+        )
+
+    def transcribe_long_audio(self, audio_path: str, vad_config: Optional[Dict] = None, block_ms: int = 1000) -> Iterator[Dict]:
+        """
+        Transcribes a recording of any length at constant memory.
+        Yields {'start', 'end', 'text'} per speech segment (times in ms) as decoding progresses.
+        """
+        return inference.transcribe_long_audio(
+            self.model,
+            self.processor,
+            audio_path,
+            vad_config,
+            batch_size=self.batch_size,
+            assistant_model=self.assistant_model,
+            policy=self.decoding_policy,
+            block_ms=block_ms
+        )
 
     def normalize_text(self, text: str) -> str:
         """
         Advanced text normalization for multilingual ASR, especially for Arabic dialects.
         """
-        # Lowercase the text
-        text = text.lower()
-
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
-
-        # Normalize whitespace to a single space
-        text = re.sub(r'\s+', ' ', text).strip()
-
-        # Remove Arabic diacritics
-        text = re.sub(r'[\u064B-\u0652]', '', text)
-
-        # Normalize Arabic characters to their basic forms
-        text = text.replace('أ', 'ا').replace('إ', 'ا').replace('آ', 'ا')
-        text = text.replace('ة', 'ه')
-        text = text.replace('ى', 'ي')
-
-        # Remove repetitive characters
-        text = re.sub(r'(.)\1+', r'\1', text)
-
-        return text
+        return inference.normalize_text(text)
@@ -4,46 +4,77 @@ Connects Whisper ASR with the Conversational Agent Framework
 """
 
 import asyncio
-import torch
-import librosa
+import functools
+import itertools
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
-from transformers import WhisperForConditionalGeneration, WhisperProcessor
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Dict, List, Tuple
 import json
 from datetime import datetime
-import yaml
 
-from src.inference import vad_split, transcribe_audio, normalize_text
+from src.asr_backends import get_whisper
+from src.asr_scheduler import ASRBatchScheduler
+from src.asr_workers import get_worker_pool
+from src.audio_io import PCMAudio, load_audio
+from src.config import load_config
+from src.decoding import DecodingPolicy
+from src.model_registry import configure_model_registry
+from src.inference import iter_speech_segments, segment_pcm, slice_chunks, transcribe_audio, transcribe_segments, normalize_text, DEFAULT_BATCH_SIZE
+from src.normalization import normalize_many
 
 # Import agent core
 from src.orchestrator import AlgerianAgentOrchestrator
+from src.segmentation import format_report
+from src.streaming import VoiceStreamSession
+from src.transcription_cache import TranscriptionCache
 
-# ⚡ Bolt Optimization: Global cache for ASR models.
-# This prevents reloading the model from disk on every pipeline instantiation,
-# which is a very slow operation.
-_asr_model_cache = {}
-
-def load_config(config_path: str = "config.yml") -> Dict:
-    """Loads the YAML configuration file."""
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError:
-        print(f"Error: Configuration file not found at {config_path}")
-        return {}
-
-def _load_asr_model(model_name: str) -> Tuple[WhisperProcessor, WhisperForConditionalGeneration]:
-    """Loads ASR model from cache or from Hugging Face if not cached."""
-    if model_name in _asr_model_cache:
-        print(f"Loading ASR model from cache: {model_name}")
-        return _asr_model_cache[model_name]
-
-    print(f"Loading and caching ASR model: {model_name}")
-    processor = WhisperProcessor.from_pretrained(model_name)
-    model = WhisperForConditionalGeneration.from_pretrained(model_name)
-    _asr_model_cache[model_name] = (processor, model)
-    return processor, model
+if TYPE_CHECKING:
+    from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+# Cross-request micro-batching schedulers (asr_scheduler.enabled), one per ASR model setup
+_asr_schedulers: Dict[Tuple, ASRBatchScheduler] = {}
+
+# Content-addressed transcription cache (transcription_cache.enabled)
+_transcription_cache = None
+
+def _get_asr_scheduler(scheduler_config: Dict, model_key: Tuple, transcribe_batch, max_concurrent_batches: int = 1) -> ASRBatchScheduler:
+    """
+    Returns the ASR batch scheduler of a model setup, shared by every tenant pipeline
+    transcribing with it. Decoding policies and assistant models travel with each
+    segment and are never mixed in one batch.
+    """
+    scheduler = _asr_schedulers.get(model_key)
+    if scheduler is None:
+        scheduler = _asr_schedulers[model_key] = ASRBatchScheduler(
+            transcribe_batch,
+            max_batch_size=scheduler_config.get('max_batch_size', DEFAULT_BATCH_SIZE),
+            max_wait_ms=scheduler_config.get('max_wait_ms', 10),
+            max_concurrent_batches=max_concurrent_batches
+        )
+    return scheduler
+
+
+def get_asr_scheduler_metrics() -> Optional[Dict]:
+    """Metrics of each ASR batch scheduler by model, or None when batching is disabled."""
+    if not _asr_schedulers:
+        return None
+    return {
+        f"{model_name} ({backend}{', workers' if in_workers else ''})": scheduler.metrics()
+        for (model_name, backend, _, _, in_workers), scheduler in _asr_schedulers.items()
+    }
+
+
+def _get_transcription_cache(cache_config: Dict) -> TranscriptionCache:
+    """Returns the process-wide transcription cache, shared by every tenant pipeline."""
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = TranscriptionCache.from_config(cache_config)
+    return _transcription_cache
+
+
+def get_transcription_cache_stats() -> Optional[Dict]:
+    """Hit rate and size of the transcription cache, or None when it is disabled."""
+    return _transcription_cache.stats() if _transcription_cache else None
 
 
 class VoiceAgentPipeline:
@@ -65,17 +96,90 @@ class VoiceAgentPipeline:
             tenant_config: Business configuration for agent
         """
         self.config = config
-        asr_model_name = self.config.get('asr_model', {}).get('name', 'openai/whisper-small')
-
-        # Load ASR components using the caching mechanism
-        self.asr_processor, self.asr_model = _load_asr_model(asr_model_name)
+        self.tenant_config = tenant_config or self._default_tenant_config()
+        asr_config = self.config.get('asr_model', {})
+        asr_model_name = asr_config.get('name', 'openai/whisper-small')
+        asr_backend = asr_config.get('backend', 'torch')
+        self.asr_model_name = asr_model_name
+        self.asr_model_backend = asr_backend
+        self.asr_onnx_dir = asr_config.get('onnx_dir')
+        configure_model_registry(self.config.get('model_registry', {}))
+
+        self.asr_batch_size = asr_config.get('batch_size', DEFAULT_BATCH_SIZE)
+        self.decoding_policy = DecodingPolicy.from_config(asr_config)
+
+        # Decoding mode: tenant setting first, then system default
+        self.asr_decoding = self.tenant_config.get('asr_decoding', asr_config.get('decoding', 'plain'))
+        self.asr_assistant_name = None
+        if self.asr_decoding == 'assisted':
+            if asr_backend == 'onnx':
+                raise ValueError("Assisted decoding requires a torch ASR backend")
+            self.asr_assistant_name = asr_config.get('assistant_model', 'openai/whisper-tiny')
+        elif self.asr_decoding != 'plain':
+            raise ValueError(f"Unknown ASR decoding mode '{self.asr_decoding}'")
+
+        # Either dedicated worker processes hold the model, or this process does
+        # (shared with other pipelines through the model registry)
+        self.asr_pool = None
+        if self.config.get('asr_workers', {}).get('enabled', False):
+            self.asr_pool = get_worker_pool(self.config)
+        else:
+            # Loaded now so the first call does not pay for it
+            get_whisper(asr_model_name, backend=asr_backend, onnx_dir=self.asr_onnx_dir)
+            if self.asr_assistant_name:
+                get_whisper(self.asr_assistant_name, backend=asr_backend)
+
+        # Segments from concurrent requests share padded batches
+        self.asr_scheduler = None
+        scheduler_config = self.config.get('asr_scheduler', {})
+        if scheduler_config.get('enabled', False):
+            # One batch in flight per worker process, or one at a time on the in-process model
+            pool_size = self.config.get('asr_workers', {}).get('pool_size', 2) if self.asr_pool else 1
+            # Everything _transcribe_batch depends on besides the segments' own settings
+            model_key = (self.asr_model_name, self.asr_model_backend, self.asr_onnx_dir, self.asr_batch_size, self.asr_pool is not None)
+            self.asr_scheduler = _get_asr_scheduler(scheduler_config, model_key, self._transcribe_batch, pool_size)
+
+        # Repeated audio is served from the cache. Everything that changes the
+        # output is part of the namespace, so a new model or config never hits
+        # entries written by the old one.
+        self.transcription_cache = None
+        cache_config = self.config.get('transcription_cache', {})
+        if cache_config.get('enabled', False):
+            self.transcription_cache = _get_transcription_cache(cache_config)
+            self.transcription_cache_namespace = TranscriptionCache.namespace(
+                asr_model_name,
+                asr_backend,
+                self.asr_assistant_name,
+                self.decoding_policy,
+                self.config.get('vad', {})
+            )
 
         # Initialize agent
-        self.tenant_config = tenant_config or self._default_tenant_config()
         self.agent = AlgerianAgentOrchestrator(self.tenant_config)
 
         print("Voice Agent Pipeline initialized")
 
+    # Models are looked up in the registry on use rather than held here, so
+    # eviction under the memory budget actually releases them.
+
+    @property
+    def asr_processor(self) -> Optional['WhisperProcessor']:
+        if self.asr_pool:
+            return None
+        return get_whisper(self.asr_model_name, backend=self.asr_model_backend, onnx_dir=self.asr_onnx_dir)[0]
+
+    @property
+    def asr_model(self) -> Optional['WhisperForConditionalGeneration']:
+        if self.asr_pool:
+            return None
+        return get_whisper(self.asr_model_name, backend=self.asr_model_backend, onnx_dir=self.asr_onnx_dir)[1]
+
+    @property
+    def asr_assistant_model(self) -> Optional['WhisperForConditionalGeneration']:
+        if self.asr_pool or not self.asr_assistant_name:
+            return None
+        return get_whisper(self.asr_assistant_name, backend=self.asr_model_backend)[1]
+
     def _default_tenant_config(self) -> Dict:
         """Default tenant configuration"""
         return {
@@ -89,7 +193,8 @@ class VoiceAgentPipeline:
         self,
         audio_path: str,
         customer_id: str,
-        conversation_id: Optional[str] = None
+        conversation_id: Optional[str] = None,
+        long_audio: bool = False
     ) -> Dict:
         """
         Process complete voice call interaction
@@ -98,6 +203,8 @@ class VoiceAgentPipeline:
             audio_path: Path to audio file
             customer_id: Customer identifier
             conversation_id: Optional existing conversation ID
+            long_audio: Stream the recording block by block at constant memory
+                (archive recordings of any length); adds timestamped segments
 
         Returns:
             Full interaction result with transcription and agent response
@@ -110,7 +217,12 @@ class VoiceAgentPipeline:
 
         # Step 1: Transcribe audio
         print("Step 1: Transcribing audio...")
-        transcription = await self._transcribe_audio(audio_path)
+        segments = None
+        if long_audio:
+            segments = [segment async for segment in self.transcribe_long_audio(audio_path)]
+            transcription = " ".join(segment['text'] for segment in segments) or "[No speech detected]"
+        else:
+            transcription = await self._transcribe_audio(audio_path)
         print(f"Transcription: {transcription}")
 
         # Step 2: Process through agent
@@ -150,6 +262,9 @@ class VoiceAgentPipeline:
             }
         }
 
+        if segments is not None:
+            result['transcription']['segments'] = segments
+
         print(f"\n{'='*80}")
         print(f"Call processing complete")
         print(f"Intent: {result['metadata']['intent']}")
@@ -161,27 +276,146 @@ class VoiceAgentPipeline:
     async def _transcribe_audio(self, audio_path: str) -> str:
         """Transcribe audio using Whisper ASR"""
 
+        pcm_audio = load_audio(audio_path)
+
+        if not self.transcription_cache:
+            return await self._transcribe_pcm(pcm_audio)
+
+        cache_key = TranscriptionCache.key(pcm_audio.samples, self.transcription_cache_namespace)
+        cached = await self.transcription_cache.get(cache_key)
+        if cached is not None:
+            print("Transcription served from cache")
+            return cached
+
+        transcription = await self._transcribe_pcm(pcm_audio)
+        await self.transcription_cache.set(cache_key, transcription)
+        return transcription
+
+    async def _transcribe_pcm(self, pcm_audio: PCMAudio) -> str:
+        """VAD, Whisper and normalization of decoded 16 kHz PCM"""
+
         vad_config = self.config.get('vad', {})
-        aggressiveness = vad_config.get('aggressiveness', 3)
 
-        # Perform VAD and split
-        audio, speech_chunks = vad_split(audio_path, aggressiveness=aggressiveness)
+        if self.asr_scheduler:
+            # VAD off the loop, then the windows join the cross-request batch queue
+            loop = asyncio.get_running_loop()
+            audio, speech_chunks, report = await loop.run_in_executor(None, segment_pcm, pcm_audio, vad_config)
+            print(format_report(report))
 
+            if not speech_chunks:
+                return "[No speech detected]"
+
+            texts = await self.asr_scheduler.transcribe(
+                slice_chunks(audio, speech_chunks),
+                self.decoding_policy,
+                self.asr_assistant_name
+            )
+            transcription = " ".join(text for text in texts if text)
+        elif self.asr_pool:
+            # VAD and inference run in a worker process; the event loop stays free
+            transcription, report = await self.asr_pool.transcribe_pcm(
+                pcm_audio.samples,
+                vad_config,
+                self.decoding_policy,
+                self.asr_assistant_name
+            )
+            print(format_report(report))
+            if not report['windows']:
+                return "[No speech detected]"
+        else:
+            # VAD, window packing and batched Whisper in a thread, off the event loop
+            loop = asyncio.get_running_loop()
+            transcription, report = await loop.run_in_executor(None, self._segment_and_transcribe, pcm_audio, vad_config)
+            print(format_report(report))
+            if transcription is None:
+                return "[No speech detected]"
+
+        # Normalize
+        normalized = normalize_text(transcription)
+
+        return normalized if normalized.strip() else "[Empty transcription]"
+
+    def _segment_and_transcribe(self, pcm_audio: PCMAudio, vad_config: Dict) -> Tuple[Optional[str], Dict]:
+        """Blocking VAD and in-process Whisper; the transcription is None without speech"""
+
+        # Perform VAD, then pack the speech into Whisper-sized windows
+        audio, speech_chunks, report = segment_pcm(pcm_audio, vad_config)
         if not speech_chunks:
-            return "[No speech detected]"
+            return None, report
 
-        # Transcribe audio chunks
+        # Transcribe audio chunks in padded batches
         transcription = transcribe_audio(
             self.asr_model,
             self.asr_processor,
             audio,
-            speech_chunks
+            speech_chunks,
+            batch_size=self.asr_batch_size,
+            assistant_model=self.asr_assistant_model,
+            policy=self.decoding_policy
         )
+        return transcription, report
 
-        # Normalize
-        normalized = normalize_text(transcription)
+    async def transcribe_segments_async(self, segments: List[np.ndarray], policy: Optional[DecodingPolicy] = None) -> List[str]:
+        """Transcribe already-segmented audio off the event loop (scheduler, worker pool or thread)"""
 
-        return normalized if normalized.strip() else "[Empty transcription]"
+        policy = policy or self.decoding_policy
+        if self.asr_scheduler:
+            texts = await self.asr_scheduler.transcribe(segments, policy, self.asr_assistant_name)
+        else:
+            texts = await self._transcribe_batch(segments, policy, self.asr_assistant_name)
+        return normalize_many(texts)
+
+    async def _transcribe_batch(self, segments: List[np.ndarray], policy: DecodingPolicy, assistant_model_name: Optional[str]) -> List[str]:
+        """One padded batch of raw transcriptions, in the worker pool or a thread"""
+
+        if self.asr_pool:
+            return await self.asr_pool.transcribe_segments(segments, policy, assistant_model_name)
+
+        assistant_model = None
+        if assistant_model_name:
+            _, assistant_model = get_whisper(assistant_model_name, backend=self.asr_model_backend)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(
+            transcribe_segments,
+            self.asr_model,
+            self.asr_processor,
+            segments,
+            batch_size=self.asr_batch_size,
+            assistant_model=assistant_model,
+            policy=policy
+        ))
+
+    async def transcribe_long_audio(self, audio_path: str) -> AsyncIterator[Dict]:
+        """
+        Timestamped, normalized transcript segments of a recording of any length.
+
+        The file is read in blocks (`long_audio.block_ms`) and VAD runs
+        incrementally off the event loop; at most one batch of segments is held
+        at a time, so memory does not grow with the recording.
+        """
+        block_ms = self.config.get('long_audio', {}).get('block_ms', 1000)
+        segments = iter_speech_segments(audio_path, self.config.get('vad', {}), block_ms)
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await loop.run_in_executor(None, list, itertools.islice(segments, self.asr_batch_size))
+            if not batch:
+                return
+
+            texts = await self.transcribe_segments_async([segment['audio'] for segment in batch])
+            for segment, text in zip(batch, texts):
+                if text:
+                    yield {'start': segment['start'], 'end': segment['end'], 'text': text}
+
+    def create_stream_session(
+        self,
+        customer_id: str,
+        conversation_id: Optional[str] = None
+    ) -> VoiceStreamSession:
+        """Open a live-call session fed with PCM frames as they arrive"""
+
+        return VoiceStreamSession(self, customer_id, conversation_id)
 
     async def _process_with_agent(
         self,
@@ -228,8 +462,14 @@ class VoiceAgentPipeline:
 class BatchVoiceProcessor:
     """Process multiple voice calls from dataset"""
 
-    def __init__(self, pipeline: VoiceAgentPipeline):
+    def __init__(self, pipeline: VoiceAgentPipeline, long_audio: bool = False):
+        """
+        Args:
+            pipeline: Voice agent pipeline
+            long_audio: Stream each recording at constant memory (archive recordings of any length)
+        """
         self.pipeline = pipeline
+        self.long_audio = long_audio
 
     async def process_dataset(
         self,
@@ -264,7 +504,8 @@ class BatchVoiceProcessor:
             try:
                 result = await self.pipeline.process_voice_call(
                     audio_path=str(audio_file),
-                    customer_id=f"customer_{audio_file.stem}"
+                    customer_id=f"customer_{audio_file.stem}",
+                    long_audio=self.long_audio
                 )
                 results.append(result)
 
@@ -0,0 +1,94 @@
+"""
+ASR inference backends
+Loads Whisper as a plain torch model, a dynamically int8-quantized torch model,
+or an ONNX Runtime model, all exposing the same `generate`/`device` interface.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from src.model_registry import get_model_registry
+
+if TYPE_CHECKING:
+    from transformers import WhisperProcessor
+
+BACKENDS = ('torch', 'int8', 'onnx')
+
+
+def load_whisper(
+    model_name: str,
+    backend: str = 'torch',
+    onnx_dir: Optional[str] = None
+) -> Tuple['WhisperProcessor', object]:
+    """
+    Load a Whisper processor and model for the given backend
+
+    Args:
+        model_name: Hugging Face model name, e.g. openai/whisper-small
+        backend: 'torch', 'int8' (dynamic int8 quantization of Linear layers) or 'onnx'
+        onnx_dir: Directory holding (or receiving) ONNX exports, one subdirectory per model
+
+    Returns:
+        (processor, model)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{backend}', expected one of {BACKENDS}")
+
+    # Imported here so that importing this module stays cheap
+    import torch
+    from transformers import WhisperForConditionalGeneration, WhisperProcessor
+
+    processor = WhisperProcessor.from_pretrained(model_name)
+
+    if backend == 'onnx':
+        return processor, _load_onnx(model_name, onnx_dir)
+
+    model = WhisperForConditionalGeneration.from_pretrained(model_name)
+    model.eval()
+
+    if backend == 'int8':
+        # Weights of every Linear layer are stored as int8; activations are
+        # quantized on the fly, which suits CPU-only inference.
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return processor, model
+
+
+def get_whisper(
+    model_name: str,
+    backend: str = 'torch',
+    onnx_dir: Optional[str] = None,
+    device: str = 'cpu'
+) -> Tuple['WhisperProcessor', object]:
+    """
+    Shared (processor, model) from the process-wide model registry, loaded on
+    first use and placed on `device` (ONNX models stay on their session's device).
+    """
+    def load():
+        processor, model = load_whisper(model_name, backend=backend, onnx_dir=onnx_dir)
+        if backend != 'onnx':
+            model.to(device)
+        return processor, model
+
+    return get_model_registry().get(('whisper', model_name, backend, device), load, kind='asr')
+
+
+def _load_onnx(model_name: str, onnx_dir: Optional[str]):
+    """Load the ONNX export of a model, exporting it on first use."""
+    try:
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+    except ImportError as e:
+        raise ImportError(
+            "The 'onnx' ASR backend requires optimum with onnxruntime: "
+            "pip install 'optimum[onnxruntime]'"
+        ) from e
+
+    # One export per model, so a changed model name never reuses another model's export
+    export_dir = Path(onnx_dir) / model_name.replace('/', '_') if onnx_dir else None
+    if export_dir and export_dir.exists():
+        return ORTModelForSpeechSeq2Seq.from_pretrained(export_dir)
+
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(model_name, export=True)
+    if export_dir:
+        model.save_pretrained(export_dir)
+    return model
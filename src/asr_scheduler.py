@@ -0,0 +1,163 @@
+"""
+Cross-request ASR micro-batching
+Segments submitted by concurrent voice requests are collected for a few
+milliseconds (or until a batch is full) and transcribed in one padded batch.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.decoding import DecodingPolicy
+
+# (segments, policy, assistant model name) -> one raw text per segment
+BatchTranscriber = Callable[[List[np.ndarray], DecodingPolicy, Optional[str]], Awaitable[List[str]]]
+
+
+@dataclass
+class _PendingSegment:
+    audio: np.ndarray
+    policy: DecodingPolicy
+    assistant_model_name: Optional[str]
+    queued_at: float
+    future: asyncio.Future
+
+
+class ASRBatchScheduler:
+    """
+    Dynamic micro-batching scheduler in front of the Whisper model.
+
+    A batch is dispatched as soon as `max_batch_size` segments are waiting or
+    `max_wait_ms` has passed since its first segment arrived. Segments that need
+    different decoding settings are never mixed in one generate() call. Up to
+    `max_concurrent_batches` batches are in flight at once (one per ASR worker
+    process); beyond that, segments keep queueing into the next batch.
+    """
+
+    def __init__(
+        self,
+        transcribe_batch: BatchTranscriber,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 1
+    ):
+        self.transcribe_batch = transcribe_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Held so in-flight batches are not garbage collected
+        self._in_flight = set()
+
+        # Metrics
+        self._batch_sizes = Counter()
+        self._waits = deque(maxlen=1000)
+        self._max_queue_depth = 0
+        self._segments = 0
+
+    async def transcribe(
+        self,
+        segments: List[np.ndarray],
+        policy: DecodingPolicy,
+        assistant_model_name: Optional[str] = None
+    ) -> List[str]:
+        """Queues segments for batched transcription and waits for their texts."""
+        self._ensure_running()
+        loop = asyncio.get_running_loop()
+
+        futures = []
+        for segment in segments:
+            future = loop.create_future()
+            self._queue.put_nowait(_PendingSegment(segment, policy, assistant_model_name, time.perf_counter(), future))
+            futures.append(future)
+
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return list(await asyncio.gather(*futures))
+
+    def metrics(self) -> Dict:
+        """Queue depth, batch size distribution and queueing delay."""
+        waits = sorted(self._waits)
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self._max_queue_depth,
+            'segments': self._segments,
+            'batches': sum(self._batch_sizes.values()),
+            'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+            'mean_batch_size': self._segments / max(sum(self._batch_sizes.values()), 1),
+            'wait_ms_p50': waits[len(waits) // 2] * 1000 if waits else 0.0,
+            'wait_ms_p95': waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+            'wait_ms_max': waits[-1] * 1000 if waits else 0.0,
+        }
+
+    def _ensure_running(self):
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._slots = self._slots or asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            dispatched_at = time.perf_counter()
+            for item in batch:
+                self._waits.append(dispatched_at - item.queued_at)
+
+            for group in _group_by_settings(batch):
+                await self._slots.acquire()
+                task = loop.create_task(self._dispatch(group))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, group: List[_PendingSegment]):
+        self._batch_sizes[len(group)] += 1
+        self._segments += len(group)
+
+        try:
+            texts = await self.transcribe_batch(
+                [item.audio for item in group],
+                group[0].policy,
+                group[0].assistant_model_name
+            )
+        except Exception as e:
+            for item in group:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for item, text in zip(group, texts):
+            if not item.future.done():
+                item.future.set_result(text)
+
+
+def _group_by_settings(batch: List[_PendingSegment]) -> List[List[_PendingSegment]]:
+    """Splits a batch into runs sharing the same decoding policy and assistant model."""
+    groups: List[List[_PendingSegment]] = []
+    for item in batch:
+        for group in groups:
+            if group[0].policy == item.policy and group[0].assistant_model_name == item.assistant_model_name:
+                group.append(item)
+                break
+        else:
+            groups.append([item])
+    return groups
@@ -0,0 +1,226 @@
+"""
+Process-pool ASR workers
+Each worker process holds the Whisper model once; audio is handed over through
+shared memory and results are awaited by the calling coroutine, so VAD and
+torch inference never run on the API event loop.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.audio_io import PCMAudio, load_audio
+from src.decoding import DecodingPolicy
+
+# Model state of the current worker process, set by _init_worker
+_worker: Dict = {}
+
+# One pool per API process, shared by every tenant pipeline
+_pool: Optional['ASRWorkerPool'] = None
+
+
+class ASRWorkerPool:
+    """Pool of dedicated ASR processes"""
+
+    def __init__(self, config: Dict):
+        """
+        Args:
+            config: System configuration; `asr_workers.pool_size` and
+                `asr_workers.torch_threads` size the pool, `asr_model` selects the model
+        """
+        worker_config = config.get('asr_workers', {})
+        self.pool_size = worker_config.get('pool_size', 2)
+        self.torch_threads = worker_config.get('torch_threads', 1)
+
+        # Spawned (not forked) workers: torch thread pools do not survive fork
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.pool_size,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(config.get('asr_model', {}), self.torch_threads)
+        )
+
+    async def transcribe_file(
+        self,
+        audio_path: str,
+        vad_config: Dict,
+        policy: DecodingPolicy,
+        assistant_model_name: Optional[str] = None
+    ) -> Tuple[str, Dict]:
+        """
+        VAD, segment packing and transcription of an audio file in a worker
+
+        Returns:
+            (raw transcription, segmentation report)
+        """
+        return await self.transcribe_pcm(load_audio(audio_path).samples, vad_config, policy, assistant_model_name)
+
+    async def transcribe_pcm(
+        self,
+        samples: np.ndarray,
+        vad_config: Dict,
+        policy: DecodingPolicy,
+        assistant_model_name: Optional[str] = None
+    ) -> Tuple[str, Dict]:
+        """Same as transcribe_file, for int16 PCM already decoded at 16 kHz"""
+        with _SharedArray(samples) as shared:
+            return await self._submit(
+                _transcribe_pcm,
+                shared.name,
+                len(samples),
+                vad_config,
+                policy,
+                assistant_model_name
+            )
+
+    async def transcribe_segments(
+        self,
+        segments: List[np.ndarray],
+        policy: DecodingPolicy,
+        assistant_model_name: Optional[str] = None
+    ) -> List[str]:
+        """Transcription of already-segmented float audio in a worker, one raw text per segment"""
+        lengths = [len(segment) for segment in segments]
+        flat = np.concatenate(segments).astype(np.float32) if segments else np.zeros(0, dtype=np.float32)
+        with _SharedArray(flat) as shared:
+            return await self._submit(
+                _transcribe_segments,
+                shared.name,
+                lengths,
+                policy,
+                assistant_model_name
+            )
+
+    async def _submit(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def get_worker_pool(config: Dict) -> ASRWorkerPool:
+    """Returns the process-wide worker pool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ASRWorkerPool(config)
+    return _pool
+
+
+def shutdown_worker_pool():
+    """Stops the process-wide worker pool if it was started."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+class _SharedArray:
+    """Copies an array into a fresh shared memory block, released on exit."""
+
+    def __init__(self, array: np.ndarray):
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf)[:] = array
+        self.name = self.shm.name
+
+    def __enter__(self) -> '_SharedArray':
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a block owned by the parent without adopting it for cleanup."""
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _detach(shm: shared_memory.SharedMemory):
+    try:
+        shm.close()
+    except BufferError:
+        # A failed call still holds views into the block; they are released with the frame
+        pass
+
+
+# ============================================================================
+# WORKER PROCESS SIDE
+# ============================================================================
+
+def _init_worker(asr_config: Dict, torch_threads: int):
+    import torch
+    from src.asr_backends import load_whisper
+
+    torch.set_num_threads(torch_threads)
+
+    backend = asr_config.get('backend', 'torch')
+    processor, model = load_whisper(
+        asr_config.get('name', 'openai/whisper-small'),
+        backend=backend,
+        onnx_dir=asr_config.get('onnx_dir')
+    )
+    _worker.update({
+        'processor': processor,
+        'model': model,
+        'backend': backend,
+        'batch_size': asr_config.get('batch_size', 8)
+    })
+
+
+def _assistant(name: Optional[str]):
+    if not name:
+        return None
+    from src.asr_backends import get_whisper
+    return get_whisper(name, backend=_worker['backend'])[1]
+
+
+def _transcribe_pcm(shm_name: str, num_samples: int, vad_config: Dict, policy: DecodingPolicy, assistant_model_name: Optional[str]) -> Tuple[str, Dict]:
+    from src.inference import segment_pcm, transcribe_audio
+
+    shm = _attach(shm_name)
+    try:
+        samples = np.ndarray((num_samples,), dtype=np.int16, buffer=shm.buf)
+        audio, speech_chunks, report = segment_pcm(PCMAudio(samples), vad_config)
+        text = transcribe_audio(
+            _worker['model'],
+            _worker['processor'],
+            audio,
+            speech_chunks,
+            batch_size=_worker['batch_size'],
+            assistant_model=_assistant(assistant_model_name),
+            policy=policy
+        )
+        # Views into the block must be gone before it is closed
+        del samples, audio
+        return text, report
+    finally:
+        _detach(shm)
+
+
+def _transcribe_segments(shm_name: str, lengths: List[int], policy: DecodingPolicy, assistant_model_name: Optional[str]) -> List[str]:
+    from src.inference import transcribe_segments
+
+    shm = _attach(shm_name)
+    try:
+        flat = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        offsets = np.cumsum([0] + lengths)
+        segments = [flat[offsets[i]:offsets[i + 1]] for i in range(len(lengths))]
+        texts = transcribe_segments(
+            _worker['model'],
+            _worker['processor'],
+            segments,
+            batch_size=_worker['batch_size'],
+            assistant_model=_assistant(assistant_model_name),
+            policy=policy
+        )
+        del flat, segments
+        return texts
+    finally:
+        _detach(shm)
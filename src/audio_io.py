@@ -0,0 +1,246 @@
+"""
+Audio ingestion layer
+Memory-mapped 16-bit PCM WAV reading, resampling only when the rate differs
+"""
+
+import struct
+from functools import lru_cache
+from math import gcd
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_INT16_SCALE = 32768.0
+
+
+class FloatView:
+    """
+    Float32 view over int16 PCM.
+
+    Supports `len()` and slicing like a float array; only the requested slice is
+    converted, so the whole recording never exists as a float copy.
+    """
+
+    def __init__(self, samples: np.ndarray):
+        self.samples = samples
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return pcm_to_float(self.samples[index])
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        array = pcm_to_float(self.samples)
+        return array if dtype is None else array.astype(dtype)
+
+
+class PCMAudio:
+    """16 kHz mono int16 audio, memory-mapped from the source file when possible."""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration_ms(self) -> int:
+        return int(len(self.samples) * 1000 / self.sample_rate)
+
+    def pcm_view(self) -> memoryview:
+        """Zero-copy byte view of the int16 samples, as expected by webrtcvad."""
+        return memoryview(self.samples).cast('B')
+
+    def float_view(self) -> FloatView:
+        """Float view of the same buffer for Whisper feature extraction."""
+        return FloatView(self.samples)
+
+
+def pcm_to_float(samples: np.ndarray) -> np.ndarray:
+    """Converts int16 PCM samples to float32 in [-1, 1)."""
+    return samples.astype(np.float32) / _INT16_SCALE
+
+
+def load_audio(path: str, target_rate: int = SAMPLE_RATE) -> PCMAudio:
+    """
+    Loads an audio file as mono int16 PCM at `target_rate`.
+
+    Mono 16-bit PCM WAV files at the target rate are memory-mapped without any
+    copy. Other rates (e.g. 8 kHz telephony) go through a cached polyphase
+    resampler; other formats are decoded with soundfile, or librosa as a last resort.
+    """
+    wav = _map_pcm16_wav(path)
+    if wav is not None:
+        samples, sample_rate = wav
+    else:
+        samples, sample_rate = _decode(path)
+
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1).astype(np.int16) if samples.shape[1] > 1 else samples[:, 0]
+
+    if sample_rate != target_rate:
+        samples = resample_pcm(samples, sample_rate, target_rate)
+
+    return PCMAudio(samples, target_rate)
+
+
+def iter_pcm_blocks(path: str, block_ms: int = 1000, target_rate: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """
+    Yields the audio as consecutive mono int16 blocks of about `block_ms` at
+    `target_rate`, holding only a few blocks in memory regardless of file length.
+
+    PCM16 WAV data is read through the memory map; other formats are streamed
+    with soundfile. Resampled blocks overlap their neighbours by the filter
+    length, so the concatenated output equals `load_audio(path).samples`.
+    """
+    blocks, sample_rate = _stream_blocks(path, block_ms, target_rate)
+    if sample_rate == target_rate:
+        yield from blocks
+    else:
+        yield from _resample_blocks(blocks, sample_rate, target_rate)
+
+
+def _stream_blocks(path: str, block_ms: int, target_rate: int) -> Tuple[Iterator[np.ndarray], int]:
+    wav = _map_pcm16_wav(path)
+    if wav is not None:
+        samples, sample_rate = wav
+        frames = _block_frames(sample_rate, target_rate, block_ms)
+        return (_mono(samples[start:start + frames]) for start in range(0, len(samples), frames)), sample_rate
+
+    try:
+        import soundfile as sf
+        sample_rate = sf.info(path).samplerate
+        frames = _block_frames(sample_rate, target_rate, block_ms)
+        return (_mono(block) for block in sf.blocks(path, blocksize=frames, dtype='int16', always_2d=True)), sample_rate
+    except Exception:
+        # librosa cannot stream arbitrary formats; this last resort holds the whole file
+        samples, sample_rate = _decode(path)
+        frames = _block_frames(sample_rate, target_rate, block_ms)
+        return (samples[start:start + frames] for start in range(0, len(samples), frames)), sample_rate
+
+
+def _block_frames(sample_rate: int, target_rate: int, block_ms: int) -> int:
+    # Whole resampling `down` steps, so every block starts on an output sample, and
+    # long enough to serve as filter context for its neighbours
+    down = sample_rate // gcd(sample_rate, target_rate)
+    return max(sample_rate * block_ms // 1000 // down, 20) * down
+
+
+def _mono(samples: np.ndarray) -> np.ndarray:
+    if samples.ndim > 1:
+        return samples.mean(axis=1).astype(np.int16) if samples.shape[1] > 1 else np.asarray(samples[:, 0])
+    return np.asarray(samples)
+
+
+def _resample_blocks(blocks: Iterator[np.ndarray], orig_rate: int, target_rate: int) -> Iterator[np.ndarray]:
+    """Resamples a block stream, giving each block one neighbour of context on either side."""
+    from scipy.signal import resample_poly
+
+    factor = gcd(orig_rate, target_rate)
+    up, down = target_rate // factor, orig_rate // factor
+    taps = _polyphase_filter(up, down)
+
+    # Input samples each output sample depends on, rounded up to whole `down` steps
+    context = -(-(len(taps) // up + 1) // down) * down
+
+    previous = np.zeros(0, dtype=np.int16)
+    current = next(blocks, None)
+    while current is not None:
+        following = next(blocks, None)
+        head = previous[-context:] if context else previous[:0]
+        tail = following[:context] if following is not None else current[:0]
+
+        padded = np.concatenate([head, current, tail]).astype(np.float32)
+        resampled = resample_poly(padded, up, down, window=taps)
+
+        start = len(head) * up // down
+        length = -(-len(current) * up // down)
+        yield np.clip(np.round(resampled[start:start + length]), -32768, 32767).astype(np.int16)
+
+        previous, current = current, following
+
+
+def resample_pcm(samples: np.ndarray, orig_rate: int, target_rate: int) -> np.ndarray:
+    """Polyphase resampling of int16 PCM between integer sample rates."""
+    from scipy.signal import resample_poly
+
+    factor = gcd(orig_rate, target_rate)
+    up, down = target_rate // factor, orig_rate // factor
+
+    resampled = resample_poly(samples.astype(np.float32), up, down, window=_polyphase_filter(up, down))
+    return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+
+
+@lru_cache(maxsize=8)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing FIR taps for an up/down ratio (same design as scipy's default), built once."""
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    taps = firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', 5.0))
+    taps.setflags(write=False)
+    return taps
+
+
+def _map_pcm16_wav(path: str) -> Optional[Tuple[np.ndarray, int]]:
+    """Memory-maps the data chunk of a 16-bit PCM WAV file, or returns None for anything else."""
+    fmt = None
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            return None
+
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+
+            if chunk_id == b'fmt ':
+                body = f.read(chunk_size)
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                    format_tag = struct.unpack('<H', body[24:26])[0]
+                fmt = (format_tag, channels, sample_rate, bits)
+                f.seek(chunk_size % 2, 1)
+            elif chunk_id == b'data':
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+        f.seek(0, 2)
+        file_size = f.tell()
+
+    if fmt is None:
+        return None
+    format_tag, channels, sample_rate, bits = fmt
+    if format_tag != _WAVE_FORMAT_PCM or bits != 16:
+        return None
+
+    # Streamed WAVs may declare a bogus data size; trust the file length instead
+    data_size = min(chunk_size, file_size - data_offset)
+    frames = data_size // (2 * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=np.int16), sample_rate
+
+    samples = np.memmap(path, dtype='<i2', mode='r', offset=data_offset, shape=(frames, channels))
+    return samples, sample_rate
+
+
+def _decode(path: str) -> Tuple[np.ndarray, int]:
+    """Decodes non-PCM16 or compressed audio to int16."""
+    try:
+        import soundfile as sf
+        samples, sample_rate = sf.read(path, dtype='int16', always_2d=True)
+        return samples, sample_rate
+    except Exception:
+        import librosa
+        audio, sample_rate = librosa.load(path, sr=None, mono=True)
+        return np.clip(np.round(audio * _INT16_SCALE), -32768, 32767).astype(np.int16), sample_rate
@@ -1,41 +1,62 @@
-
 import re
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
+from src.lexicon_engine import LexiconAutomaton, load_lexicon
+from src.normalization import normalize
 from src.models import LanguageContext, Intent, ConversationContext, Language, IntentType
 
+DEFAULT_LEXICON_DIR = "data/lexicons"
+
+# Lexicon file per language; a word listed twice keeps the label of the later file
+LANGUAGE_LEXICONS = (
+    (Language.MSA, 'msa.txt'),
+    (Language.FRENCH, 'french.txt'),
+    (Language.DARIJA, 'darija.txt'),
+)
+
 class AlgerianLanguageDetector:
     """Detects language mix in Algerian conversations"""
 
-    DARIJA_PATTERNS = {
-        'نحب': 'want', 'نحوس': 'search', 'بغيت': 'want', 'واش': 'what/question',
-        'كاين': 'is_there', 'شحال': 'how_much', 'بزاف': 'much/many',
-    }
-
-    FRENCH_COMMON = {
-        'internet', 'connexion', 'modem', 'facture', 'carte', 'compte',
-        'service', 'problème', 'rendez-vous', 'réservation', 'urgent',
-    }
+    def __init__(self, lexicon_dir: str = DEFAULT_LEXICON_DIR):
+        # Shared by every detector using the same lexicons
+        self.automaton = _language_automaton(lexicon_dir)
 
     def detect(self, text: str) -> LanguageContext:
-        text_lower = text.lower()
-        tokens = re.findall(r'\b\w+\b', text_lower)
+        tokens = normalize(text).split()
 
-        darija_count = sum(1 for word in self.DARIJA_PATTERNS if word in text_lower)
-        french_count = sum(1 for word in self.FRENCH_COMMON if word in text_lower)
+        words = {language: [] for language, _ in LANGUAGE_LEXICONS}
+        for term, language in self.automaton.scan(tokens):
+            words[language].append(term)
+        darija_count = len(words[Language.DARIJA])
+        french_count = len(words[Language.FRENCH])
+        msa_count = len(words[Language.MSA])
 
         has_arabic = bool(re.search(r'[\u0600-\u06FF]', text))
 
+        # Arabic script defaults to Darija unless only MSA words were found
         primary = Language.MSA
         if darija_count > 0 and french_count > 0:
             primary = Language.MIXED
-        elif darija_count > 0 or has_arabic:
+        elif darija_count > 0 or (has_arabic and (french_count > 0 or msa_count == 0)):
             primary = Language.DARIJA
         elif french_count > 0:
             primary = Language.FRENCH
 
         return LanguageContext(
             primary=primary,
-            contains_darija=darija_count > 0 or has_arabic,
+            contains_darija=darija_count > 0 or primary == Language.DARIJA,
             contains_french=french_count > 0,
-            confidence=min((darija_count + french_count) / max(len(tokens), 1), 1.0)
+            contains_msa=msa_count > 0,
+            darija_words=words[Language.DARIJA],
+            french_words=words[Language.FRENCH],
+            confidence=min((darija_count + french_count + msa_count) / max(len(tokens), 1), 1.0)
         )
+
+
+@lru_cache(maxsize=None)
+def _language_automaton(lexicon_dir: str) -> LexiconAutomaton:
+    terms = {}
+    for language, filename in LANGUAGE_LEXICONS:
+        terms.update({term: language for term in load_lexicon(str(Path(lexicon_dir) / filename))})
+    return LexiconAutomaton(terms)
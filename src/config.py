@@ -0,0 +1,19 @@
+"""
+Configuration loading
+Kept free of heavy imports so text-only workers can read config.yml without
+pulling in the audio stack.
+"""
+
+from typing import Dict
+
+import yaml
+
+
+def load_config(config_path: str = "config.yml") -> Dict:
+    """Loads the YAML configuration file."""
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    except FileNotFoundError:
+        print(f"Error: Configuration file not found at {config_path}")
+        return {}
@@ -0,0 +1,98 @@
+"""
+Whisper decoding policy
+Forces language/task, bounds generated tokens by audio duration and decides
+when a greedy hypothesis must be re-decoded with beam search or sampling.
+"""
+
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+# Whisper decodes at most 448 positions, a few of which hold the task prompt.
+WHISPER_MAX_NEW_TOKENS = 440
+
+# Conversation languages (models.Language values) to Whisper language codes
+LANGUAGE_CODES = {
+    'darija': 'ar',
+    'msa': 'ar',
+    'french': 'fr',
+}
+
+
+@dataclass
+class DecodingPolicy:
+    """
+    Per-request Whisper decoding settings.
+
+    Greedy decoding is tried first. A hypothesis whose gzip compression ratio is
+    above `compression_ratio_threshold` (repetition loop) or whose average token
+    log-probability is below `logprob_threshold` is decoded again with each of
+    `fallbacks` in turn until one passes.
+    """
+    language: Optional[str] = None
+    task: str = 'transcribe'
+    tokens_per_second: float = 10.0
+    token_margin: int = 16
+    max_new_tokens: int = WHISPER_MAX_NEW_TOKENS
+    compression_ratio_threshold: float = 2.4
+    logprob_threshold: float = -1.0
+    fallbacks: List[Dict] = field(default_factory=lambda: [
+        {'num_beams': 5},
+        {'do_sample': True, 'temperature': 0.4},
+        {'do_sample': True, 'temperature': 0.8},
+    ])
+
+    @classmethod
+    def from_config(cls, asr_config: Dict) -> 'DecodingPolicy':
+        """Builds the policy from the `asr_model` section of config.yml."""
+        policy_config = asr_config.get('decoding_policy', {})
+        policy = cls(language=asr_config.get('language'), task=asr_config.get('task', 'transcribe'))
+        for key, value in policy_config.items():
+            if not hasattr(policy, key):
+                raise ValueError(f"Unknown decoding policy setting '{key}'")
+            setattr(policy, key, value)
+        return policy
+
+    def for_language(self, language: Optional[str]) -> 'DecodingPolicy':
+        """
+        Returns a copy forcing the Whisper language matching a conversation language
+        ('darija', 'french', ...) or a Whisper code. Unknown or mixed languages keep the current one.
+        """
+        code = LANGUAGE_CODES.get(language, language if language and len(language) == 2 else None)
+        if not code or code == self.language:
+            return self
+        return replace(self, language=code)
+
+    def max_tokens_for(self, duration_s: float) -> int:
+        """Upper bound on generated tokens for audio of the given duration."""
+        return min(self.max_new_tokens, int(duration_s * self.tokens_per_second) + self.token_margin)
+
+    def generate_kwargs(self, duration_s: float, attempt: Optional[Dict] = None) -> Dict:
+        """Keyword arguments for `model.generate` on audio lasting `duration_s` seconds."""
+        kwargs = {
+            'task': self.task,
+            'max_new_tokens': self.max_tokens_for(duration_s),
+            'num_beams': 1,
+            'do_sample': False,
+            'return_dict_in_generate': True,
+            'output_scores': True,
+        }
+        if self.language:
+            kwargs['language'] = self.language
+        if attempt:
+            kwargs.update(attempt)
+        return kwargs
+
+    def needs_fallback(self, text: str, avg_logprob: Optional[float]) -> bool:
+        """True when a hypothesis looks like a repetition loop or a low-confidence guess."""
+        if compression_ratio(text) > self.compression_ratio_threshold:
+            return True
+        return avg_logprob is not None and avg_logprob < self.logprob_threshold
+
+
+def compression_ratio(text: str) -> float:
+    """Ratio of raw to zlib-compressed UTF-8 size; repetitive text compresses well."""
+    data = text.encode('utf-8')
+    if not data:
+        return 0.0
+    return len(data) / len(zlib.compress(data))
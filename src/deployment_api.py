@@ -3,20 +3,31 @@ Production API Server for Algerian Voice Agent System
 FastAPI-based REST API with WhatsApp integration
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import asyncio
-import aioredis
+import redis.asyncio
 import uuid
 from datetime import datetime
 import io
 import json
 import os
+import sys
 
-from src.orchestrator import AlgerianAgentOrchestrator
-from src.asr_agent_integration import VoiceAgentPipeline
+from src.config import load_config
+from src.orchestrator import AlgerianAgentOrchestrator, get_stage_executor
+from src.model_registry import configure_model_registry, get_model_registry
+from src.nlu_service import NLUBatchService
+from src.intent_cache import IntentCache
+from src.session_cache import SessionCache
+from src.session_store import SessionStore
+
+# The ASR stack (torch audio path, librosa, webrtcvad, Whisper) is imported on
+# first voice use, never at import time; text-only workers never import it.
+WORKER_PROFILES = ('full', 'text')
+PRELOAD_MODES = ('eager', 'lazy', 'background')
 
 
 # ============================================================================
@@ -103,56 +114,155 @@ class ApplicationState:
     """Global application state"""
 
     def __init__(self):
+        self.config: Dict[str, Any] = {}
         self.redis_client = None
         self.voice_pipelines: Dict[str, Any] = {}
         self.agent_orchestrators: Dict[str, Any] = {}
+        self.profile = 'full'
+        self.preload = 'eager'
+        self.tenant_configs: Dict[str, Dict] = {}
+        self._voice_lock = asyncio.Lock()
+        self._preload_task: Optional[asyncio.Task] = None
+        self.nlu_service: Optional[NLUBatchService] = None
+        self.intent_cache: Optional[IntentCache] = None
+        self.sessions = None
 
     async def initialize(self):
         """Initialize application state"""
+        self.config = load_config(os.environ.get("CONFIG_PATH", "config.yml"))
+        configure_model_registry(self.config.get('model_registry', {}))
+
+        # Environment overrides let one image run as either profile
+        startup_config = self.config.get('startup', {})
+        self.profile = os.environ.get("WORKER_PROFILE", startup_config.get('profile', 'full'))
+        self.preload = os.environ.get("MODEL_PRELOAD", startup_config.get('preload', 'eager'))
+        if self.profile not in WORKER_PROFILES:
+            raise ValueError(f"Unknown worker profile '{self.profile}', expected one of {WORKER_PROFILES}")
+        if self.preload not in PRELOAD_MODES:
+            raise ValueError(f"Unknown preload mode '{self.preload}', expected one of {PRELOAD_MODES}")
+        print(f"Worker profile: {self.profile}, model preload: {self.preload}")
+
+        # Blocking orchestrator stages (model loading, inline classification) run on a bounded pool
+        get_stage_executor(self.config.get('orchestrator', {}).get('stage_workers', 4))
+
+        # One batching service for the orchestrators of every tenant
+        nlu_batching_config = self.config.get('nlu_batching', {})
+        if nlu_batching_config.get('enabled', False):
+            self.nlu_service = NLUBatchService.from_config(nlu_batching_config)
+        intent_cache_config = self.config.get('intent_cache', {})
+        if intent_cache_config.get('enabled', False):
+            self.intent_cache = IntentCache.from_config(intent_cache_config)
+
         # Connect to Redis
         redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379")
         try:
-            self.redis_client = await aioredis.create_redis_pool(
-                redis_url,
-                encoding='utf-8'
-            )
+            # Binary replies: sessions are msgpack-encoded by src.session_store
+            self.redis_client = redis.asyncio.Redis.from_url(redis_url)
+            await self.redis_client.ping()
             print("✓ Connected to Redis")
         except Exception as e:
             print(f"⚠ Redis connection failed: {e}")
             self.redis_client = None
 
+        # Sessions of every tenant, through this worker's cache when enabled
+        session_cache_config = self.config.get('session_cache', {})
+        if self.redis_client:
+            if session_cache_config.get('enabled', False):
+                self.sessions = SessionCache.from_config(session_cache_config, self.redis_client)
+                await self.sessions.start()
+            else:
+                self.sessions = SessionStore(self.redis_client, ttl_s=session_cache_config.get('redis_ttl_s', 3600))
+
         # Initialize default tenant
         await self.load_tenant('demo_tenant')
 
     async def load_tenant(self, tenant_id: str):
         """Load tenant configuration and initialize services"""
 
+        templates_config = dict(self.config.get('response_templates', {}))
+        if templates_config.get('path'):
+            templates_config['path'] = templates_config['path'].format(tenant_id=tenant_id)
+
         # In production, load from database
         tenant_config = {
             'tenant_id': tenant_id,
             'business_name': 'Demo Business',
             'business_type': 'service',
-            'language_preference': 'darija'
+            'language_preference': 'darija',
+            'lexicon_fast_path': self.config.get('lexicon_fast_path', {}),
+            'response_templates': templates_config
         }
 
-        # Initialize voice pipeline for tenant
-        self.voice_pipelines[tenant_id] = VoiceAgentPipeline(
-            tenant_config=tenant_config
-        )
+        self.tenant_configs[tenant_id] = tenant_config
 
         # Initialize agent orchestrator
         self.agent_orchestrators[tenant_id] = AlgerianAgentOrchestrator(
             tenant_config=tenant_config,
-            redis_client=self.redis_client
+            redis_client=self.redis_client,
+            nlu_service=self.nlu_service,
+            intent_cache=self.intent_cache,
+            sessions=self.sessions
         )
 
+        # Models are loaded here only in eager mode; otherwise on first use or by start_background_preload
+        if self.preload == 'eager':
+            self.agent_orchestrators[tenant_id].preload_models()
+            if self.profile == 'full':
+                await self.get_voice_pipeline(tenant_id)
+
         print(f"✓ Loaded tenant: {tenant_id}")
 
+    async def get_voice_pipeline(self, tenant_id: str):
+        """Voice pipeline of a tenant, importing the ASR stack and loading Whisper on first use"""
+        if self.profile == 'text':
+            raise HTTPException(status_code=503, detail="Voice is not served by text-only workers")
+
+        if tenant_id not in self.agent_orchestrators:
+            await self.load_tenant(tenant_id)
+
+        async with self._voice_lock:
+            if tenant_id not in self.voice_pipelines:
+                from src.asr_agent_integration import VoiceAgentPipeline
+
+                # Model loading blocks for seconds; keep the event loop serving text traffic
+                loop = asyncio.get_running_loop()
+                self.voice_pipelines[tenant_id] = await loop.run_in_executor(
+                    None,
+                    lambda: VoiceAgentPipeline(config=self.config, tenant_config=self.tenant_configs[tenant_id])
+                )
+        return self.voice_pipelines[tenant_id]
+
+    def start_background_preload(self):
+        """After readiness, load the models of the tenants loaded so far without delaying startup"""
+        if self.preload == 'background':
+            self._preload_task = asyncio.get_running_loop().create_task(self._preload_models())
+
+    async def _preload_models(self):
+        loop = asyncio.get_running_loop()
+        for tenant_id, agent in list(self.agent_orchestrators.items()):
+            await loop.run_in_executor(None, agent.preload_models)
+            if self.profile == 'full':
+                await self.get_voice_pipeline(tenant_id)
+        print("✓ Background model preload complete")
+
     async def cleanup(self):
         """Cleanup resources"""
+        if self._preload_task:
+            self._preload_task.cancel()
+
+        if 'src.asr_workers' in sys.modules:
+            from src.asr_workers import shutdown_worker_pool
+            shutdown_worker_pool()
+
+        if self.nlu_service:
+            self.nlu_service.shutdown()
+
+        if isinstance(self.sessions, SessionCache):
+            # Writes the saves still waiting behind
+            await self.sessions.close()
+
         if self.redis_client:
-            self.redis_client.close()
-            await self.redis_client.wait_closed()
+            await self.redis_client.close()
 
 
 # Global state instance
@@ -170,6 +280,7 @@ async def startup_event():
     print("Starting Algerian Voice Agent API")
     print("="*80)
     await state.initialize()
+    state.start_background_preload()
     print("✓ Application ready")
     print("="*80 + "\n")
 
@@ -205,12 +316,55 @@ async def health_check():
         services={
             "api": "up",
             "redis": "up" if state.redis_client else "down",
-            "asr": "up",
+            "asr": "disabled" if state.profile == 'text' else ("up" if state.voice_pipelines else "not loaded"),
             "agent": "up"
         }
     )
 
 
+@app.get("/api/v1/metrics/asr")
+async def get_asr_metrics():
+    """ASR batch scheduler metrics (queue depth, batch sizes, queueing delay) and transcription cache hit rate"""
+    if 'src.asr_agent_integration' not in sys.modules:
+        return {"scheduler": "not loaded", "transcription_cache": "not loaded"}
+
+    from src.asr_agent_integration import get_asr_scheduler_metrics, get_transcription_cache_stats
+    metrics = get_asr_scheduler_metrics()
+    scheduler = {"scheduler": "disabled"} if metrics is None else {"scheduler": "enabled", "models": metrics}
+    return {**scheduler, "transcription_cache": get_transcription_cache_stats() or "disabled"}
+
+
+@app.get("/api/v1/metrics/nlu")
+async def get_nlu_metrics():
+    """NLU batching metrics (queue depth, batch size histogram, queueing delay, batch inference time), intent cache hit rate and lexicon fast path share per tenant"""
+    batching = {"batching": "disabled"} if state.nlu_service is None else {"batching": "enabled", **state.nlu_service.metrics()}
+    return {
+        **batching,
+        "intent_cache": state.intent_cache.stats() if state.intent_cache else "disabled",
+        "lexicon_fast_path": {
+            tenant_id: orchestrator.lexicon_classifier.stats()
+            for tenant_id, orchestrator in state.agent_orchestrators.items()
+            if orchestrator.lexicon_classifier
+        }
+    }
+
+
+@app.get("/api/v1/metrics/sessions")
+async def get_session_metrics():
+    """Session cache hit rate, coalesced write-behind saves and Redis round trips per turn of this worker"""
+    if state.sessions is None:
+        return {"sessions": "disabled"}
+    if isinstance(state.sessions, SessionCache):
+        return {"cache": "enabled", **state.sessions.stats()}
+    return {"cache": "disabled", "store": state.sessions.stats()}
+
+
+@app.get("/api/v1/admin/models")
+async def get_loaded_models():
+    """Models held by the process-wide registry, with resident memory and the budget"""
+    return get_model_registry().snapshot()
+
+
 @app.post("/api/v1/message/text", response_model=AgentResponse)
 async def process_text_message(request: TextMessageRequest):
     """
@@ -263,10 +417,7 @@ async def process_voice_message(
             f.write(audio_bytes)
 
         # Get voice pipeline for tenant
-        pipeline = state.voice_pipelines.get(tenant_id)
-        if not pipeline:
-            await state.load_tenant(tenant_id)
-            pipeline = state.voice_pipelines[tenant_id]
+        pipeline = await state.get_voice_pipeline(tenant_id)
 
         # Process voice call
         result = await pipeline.process_voice_call(
@@ -277,6 +428,8 @@ async def process_voice_message(
 
         return result
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -285,6 +438,55 @@ async def process_voice_message(
             os.remove(temp_audio_path)
 
 
+@app.websocket("/api/v1/stream/voice")
+async def stream_voice_call(
+    websocket: WebSocket,
+    customer_id: str = "default",
+    tenant_id: str = "demo_tenant",
+    conversation_id: Optional[str] = None
+):
+    """
+    Stream a live call
+
+    Binary frames carry 16 kHz mono 16-bit little-endian PCM as it is captured.
+    The server answers with JSON events: `partial` and `final` transcripts per
+    speech segment, the agent `response` to each final transcript, and `end`
+    once the client sends {"event": "end"}.
+    """
+    if state.profile == 'text':
+        # 1013: try again later, on a worker that serves voice
+        await websocket.close(code=1013)
+        return
+
+    await websocket.accept()
+
+    pipeline = await state.get_voice_pipeline(tenant_id)
+
+    session = pipeline.create_stream_session(customer_id, conversation_id)
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes"):
+                events = await session.feed(message["bytes"])
+            elif message.get("text") and json.loads(message["text"]).get("event") == "end":
+                for event in await session.finish():
+                    await websocket.send_json(event)
+                await websocket.close()
+                break
+            else:
+                continue
+
+            for event in events:
+                await websocket.send_json(event)
+
+    except WebSocketDisconnect:
+        pass
+
+
 @app.post("/api/v1/reservation/create")
 async def create_reservation(
     conversation_id: str,
@@ -320,17 +522,16 @@ async def get_conversation_history(tenant_id: str, conversation_id: str):
         if not agent:
              raise HTTPException(status_code=404, detail=f"Agent for tenant '{tenant_id}' not found")
 
-        history = await agent.get_conversation_history(conversation_id)
-        if not history:
+        # One session lookup, served by the worker's session cache when enabled
+        context = await agent.get_context(conversation_id)
+        if not context or not context.conversation_history:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        context = await agent._get_or_create_context(conversation_id, tenant_id, "")
-
         history_data = {
             "conversation_id": conversation_id,
             "customer_id": context.customer_id,
             "tenant_id": context.tenant_id,
-            "messages": history,
+            "messages": context.conversation_history,
             "created_at": context.created_at.isoformat(),
             "updated_at": context.updated_at.isoformat()
         }
@@ -0,0 +1,203 @@
+"""
+Embedding-based intent classifier
+The message is embedded once and scored by cosine similarity against
+precomputed label and exemplar embeddings, instead of one NLI pass per label.
+Exemplars are the customer queries of the call-centre dataset (AR/FR/EN),
+mapped from their Topic to an IntentType.
+"""
+
+import csv
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.model_registry import get_model_registry
+from src.models import Intent, IntentType
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-m3"
+DEFAULT_DATASET_PATH = "data/algerian_call_center_dataset.csv"
+DEFAULT_TOPIC_INTENTS_PATH = "data/topic_intents.csv"
+DEFAULT_CACHE_DIR = "models/embeddings"
+
+QUERY_COLUMNS = ('Customer_Query_AR', 'Customer_Query_FR', 'Customer_Query_EN')
+
+# One description per intent, embedded as the label vector
+LABEL_DESCRIPTIONS = {
+    IntentType.RESERVATION: "I want to book, reserve or schedule an appointment, an installation or an order.",
+    IntentType.INQUIRY: "I have a question and would like information about a service, a product or a procedure.",
+    IntentType.COMPLAINT: "I am unhappy and want to complain about a bad service, a damaged or wrong item.",
+    IntentType.TECHNICAL_SUPPORT: "Something does not work: my internet, card, device or account has a technical problem.",
+    IntentType.BILLING: "I have a problem with my bill, a payment, a charge, a refund amount or pricing.",
+    IntentType.CANCEL_REQUEST: "I want to cancel my subscription, my order or my reservation.",
+    IntentType.STATUS_CHECK: "Where is my delivery, order, refund or request? I want to know its status.",
+    IntentType.TOXIC: "An insulting, hateful, abusive or vulgar message.",
+}
+
+
+class EmbeddingIntentClassifier:
+    """
+    Single-pass intent classifier over sentence embeddings.
+    Same `classify()` interface as MLIntentClassifier.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+        dataset_path: str = DEFAULT_DATASET_PATH,
+        topic_intents_path: str = DEFAULT_TOPIC_INTENTS_PATH,
+        toxic_exemplars_path: Optional[str] = None,
+        toxic_exemplars: int = 0,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        exclude_texts: Iterable[str] = (),
+        temperature: float = 0.05
+    ):
+        """
+        Args:
+            model_name: Sentence embedding model (CLS pooling, e.g. BAAI/bge-m3)
+            dataset_path: Call-centre dataset providing the exemplar queries
+            topic_intents_path: CSV mapping each dataset Topic to an IntentType value
+            toxic_exemplars_path: Optional file of toxic comments, one per line
+            toxic_exemplars: Number of toxic comments used as exemplars
+            cache_dir: Where the exemplar matrix is cached (None disables the cache)
+            exclude_texts: Queries left out of the exemplars (held-out evaluation)
+            temperature: Softmax temperature turning similarities into a confidence
+        """
+        from transformers import AutoModel, AutoTokenizer
+
+        self.model_name = model_name
+        self.temperature = temperature
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+
+        self.intent_types = list(IntentType)
+        self.exemplars = _load_exemplars(dataset_path, topic_intents_path, toxic_exemplars_path, toxic_exemplars, set(exclude_texts))
+        self.label_matrix, self.exemplar_matrix = self._load_matrices(cache_dir)
+
+        # Exemplar columns of each intent, for the per-intent max
+        self.exemplar_intents = np.array([self.intent_types.index(IntentType(e['intent'])) for e in self.exemplars], dtype=np.int64)
+
+    def classify(self, text: str) -> Intent:
+        """
+        Classifies the intent of the given text.
+        The closest dataset topic and sector are returned in `parameters`.
+        """
+        return self._classify_embedding(self.embed([text])[0])
+
+    def classify_batch(self, texts: List[str]) -> List[Intent]:
+        """Classifies several texts with one forward pass."""
+        return [self._classify_embedding(vector) for vector in self.embed(texts)]
+
+    def embed(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """L2-normalized CLS embeddings, one row per text."""
+        import torch
+
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=256,
+                return_tensors='pt'
+            )
+            with torch.no_grad():
+                cls = self.model(**inputs).last_hidden_state[:, 0]
+            vectors.append(torch.nn.functional.normalize(cls, dim=-1).numpy())
+
+        if not vectors:
+            return np.zeros((0, self.model.config.hidden_size), dtype=np.float32)
+        return np.concatenate(vectors).astype(np.float32)
+
+    def _classify_embedding(self, vector: np.ndarray) -> Intent:
+        label_scores = self.label_matrix @ vector
+        exemplar_scores = self.exemplar_matrix @ vector
+
+        # Score of an intent: its label, or its closest exemplar if that is closer
+        scores = label_scores.copy()
+        np.maximum.at(scores, self.exemplar_intents, exemplar_scores)
+
+        best = int(np.argmax(scores))
+        weights = np.exp((scores - scores[best]) / self.temperature)
+        confidence = float(weights[best] / weights.sum())
+
+        parameters: Dict = {'similarity': float(scores[best])}
+        matching = np.flatnonzero(self.exemplar_intents == best)
+        if matching.size:
+            closest = self.exemplars[int(matching[np.argmax(exemplar_scores[matching])])]
+            parameters.update({'topic': closest['topic'], 'sector': closest['sector']})
+
+        return Intent(type=self.intent_types[best], confidence=confidence, parameters=parameters)
+
+    def _load_matrices(self, cache_dir: Optional[str]):
+        labels = [LABEL_DESCRIPTIONS[intent] for intent in self.intent_types]
+        texts = [e['text'] for e in self.exemplars]
+
+        cache_path = None
+        if cache_dir:
+            # Any change to the model, labels or exemplars yields a new file
+            fingerprint = hashlib.sha256(
+                json.dumps([self.model_name, labels, self.exemplars], ensure_ascii=False).encode('utf-8')
+            ).hexdigest()[:16]
+            cache_path = Path(cache_dir) / f"{self.model_name.replace('/', '_')}-{fingerprint}.npz"
+            if cache_path.exists():
+                cached = np.load(cache_path)
+                return cached['labels'], cached['exemplars']
+
+        label_matrix = self.embed(labels)
+        exemplar_matrix = self.embed(texts)
+
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(cache_path, labels=label_matrix, exemplars=exemplar_matrix)
+        return label_matrix, exemplar_matrix
+
+
+def get_embedding_classifier(
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+    dataset_path: str = DEFAULT_DATASET_PATH,
+    **kwargs
+) -> EmbeddingIntentClassifier:
+    """Shared embedding classifier from the process-wide model registry."""
+    key = ('nlu-embedding', model_name, dataset_path, json.dumps(kwargs, sort_keys=True))
+    return get_model_registry().get(
+        key,
+        lambda: EmbeddingIntentClassifier(model_name, dataset_path, **kwargs),
+        kind='nlu'
+    )
+
+
+def load_topic_intents(topic_intents_path: str = DEFAULT_TOPIC_INTENTS_PATH) -> Dict[str, str]:
+    """Topic -> IntentType value mapping of the call-centre dataset."""
+    with open(topic_intents_path, 'r', encoding='utf-8') as f:
+        return {row['Topic']: row['Intent'] for row in csv.DictReader(f)}
+
+
+def _load_exemplars(
+    dataset_path: str,
+    topic_intents_path: str,
+    toxic_exemplars_path: Optional[str],
+    toxic_exemplars: int,
+    exclude_texts: set
+) -> List[Dict]:
+    topic_intents = load_topic_intents(topic_intents_path)
+
+    exemplars = []
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            intent = topic_intents.get(row['Topic'], IntentType.INQUIRY.value)
+            for column in QUERY_COLUMNS:
+                text = (row.get(column) or '').strip()
+                if text and text not in exclude_texts:
+                    exemplars.append({'text': text, 'intent': intent, 'topic': row['Topic'], 'sector': row['Sector']})
+
+    if toxic_exemplars_path and toxic_exemplars:
+        with open(toxic_exemplars_path, 'r', encoding='utf-8') as f:
+            comments = [line.strip() for line in f if line.strip() and line.strip() not in exclude_texts]
+        for text in comments[:toxic_exemplars]:
+            exemplars.append({'text': text, 'intent': IntentType.TOXIC.value, 'topic': 'Toxic Comment', 'sector': 'General'})
+
+    return exemplars
@@ -1,25 +1,57 @@
 
+import itertools
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 from src.models import Entity, Intent
 
+# Arabic-Indic (٠-٩) and Extended Arabic-Indic (۰-۹) digits to ASCII; one character
+# for one, so match offsets in the translated text are offsets in the original
+_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹', '01234567890123456789')
+_NON_ASCII_DIGIT = re.compile(r'[٠-٩۰-۹]')
+
+# Every entity has a digit or an @; most messages have neither and are skipped at C speed
+_CANDIDATE = re.compile(r'[\d@]')
+
+_SEPARATORS = re.compile(r'[\s.\-]')
+
 class EntityExtractor:
     """Extracts entities from text (dates, times, phones, etc.)"""
 
+    # Phones, dates and times are tried in this order at each position of one scan, so a
+    # span is one of them only ("05.51.23.45.67" is a phone, not also the time "05.51").
+    # Emails are scanned apart: a phone or date inside an email is reported too.
     PATTERNS = {
-        'phone': r'0[567]\d{8}',
-        'date': r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-        'time': r'\d{1,2}[:.]\d{2}',
+        # Mobile numbers, national (0X...) or international (+213 / 00213), digits optionally spaced in groups
+        'phone': r'(?<!\d)(?:(?:\+|00)213[\s.\-]?|0)[567](?:[\s.\-]?\d){8}(?!\d)',
+        'date': r'(?<!\d)\d{1,2}[-/]\d{1,2}[-/]\d{2,4}(?!\d)',
+        'time': r'(?<!\d)\d{1,2}[:.]\d{2}(?!\d)',
         'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
     }
 
-    def extract(self, text: str, intent: Intent) -> Dict[str, List[Entity]]:
-        entities = {}
-        for entity_type, pattern in self.PATTERNS.items():
-            matches = [
-                Entity(type=entity_type, value=match.group(0), raw_text=match.group(0), confidence=0.8)
-                for match in re.finditer(pattern, text, re.IGNORECASE)
-            ]
-            if matches:
-                entities[entity_type] = matches
+    _NUMERIC_SCANNER = re.compile('|'.join(f'(?P<{entity_type}>{pattern})' for entity_type, pattern in PATTERNS.items() if entity_type != 'email'))
+    _EMAIL_SCANNER = re.compile(f"(?P<email>{PATTERNS['email']})")
+
+    def extract(self, text: str, intent: Optional[Intent] = None) -> Dict[str, List[Entity]]:
+        entities: Dict[str, List[Entity]] = {}
+        if not _CANDIDATE.search(text):
+            return entities
+
+        scanned = text.translate(_DIGITS) if _NON_ASCII_DIGIT.search(text) else text
+        matches = self._NUMERIC_SCANNER.finditer(scanned)
+        if '@' in text:
+            # Without an @ the email pattern, tried at every letter, cannot match
+            matches = itertools.chain(matches, self._EMAIL_SCANNER.finditer(scanned))
+        for match in matches:
+            entity_type = match.lastgroup
+            value = match.group()
+            if entity_type == 'phone':
+                value = '0' + _SEPARATORS.sub('', value)[-9:]
+            entities.setdefault(entity_type, []).append(
+                Entity(type=entity_type, value=value, raw_text=text[match.start():match.end()], confidence=0.8)
+            )
         return entities
+
+    def extract_many(self, texts: List[str], intents: Optional[List[Intent]] = None) -> List[Dict[str, List[Entity]]]:
+        """Extracts the entities of several messages, one dict per message."""
+        intents = intents or [None] * len(texts)
+        return [self.extract(text, intent) for text, intent in zip(texts, intents)]
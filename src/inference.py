@@ -0,0 +1,305 @@
+"""
+Functional ASR inference helpers shared by the `ASR` class and the voice pipeline.
+Voice activity detection, (batched) Whisper transcription and text normalization.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import webrtcvad
+
+from src.audio_io import SAMPLE_RATE, FloatView, PCMAudio, iter_pcm_blocks, load_audio
+from src.decoding import DecodingPolicy
+from src.normalization import normalize
+from src.segmentation import WHISPER_WINDOW_MS, postprocess_segments
+from src.streaming import StreamingVAD
+
+# Number of speech chunks sent to `model.generate` in a single call.
+DEFAULT_BATCH_SIZE = 8
+
+
+def read_wave(path: str) -> Tuple[FloatView, int]:
+    """
+    Reads an audio file and returns the 16 kHz mono audio data and sample rate.
+    The audio is a float view over the (memory-mapped) int16 samples.
+    """
+    audio = load_audio(path)
+    return audio.float_view(), audio.sample_rate
+
+
+def vad_split(audio_path: str, aggressiveness: int = 3) -> Tuple[FloatView, List[Dict[str, int]]]:
+    """
+    Performs Voice Activity Detection (VAD) on an audio file and splits it into speech chunks.
+    VAD frames are zero-copy slices of the int16 buffer; the returned audio is a float view of it.
+    """
+    return vad_split_pcm(load_audio(audio_path), aggressiveness=aggressiveness)
+
+
+def vad_split_pcm(pcm_audio: PCMAudio, aggressiveness: int = 3) -> Tuple[FloatView, List[Dict[str, int]]]:
+    """Same as `vad_split` for audio that is already in memory."""
+    sample_rate = pcm_audio.sample_rate
+    pcm_data = pcm_audio.pcm_view()
+
+    vad = webrtcvad.Vad(aggressiveness)
+
+    frame_duration_ms = 30  # ms
+    frame_samples = int(sample_rate * frame_duration_ms / 1000)
+
+    speech_chunks = []
+    is_speech = False
+    start_frame = 0
+
+    for i in range(0, len(pcm_data), frame_samples * 2): # *2 because it's 16-bit
+        frame = pcm_data[i:i + frame_samples * 2]
+        if len(frame) < frame_samples * 2:
+            break
+
+        current_frame_is_speech = vad.is_speech(frame, sample_rate)
+
+        if not is_speech and current_frame_is_speech:
+            start_frame = i // (frame_samples * 2)
+            is_speech = True
+        elif is_speech and not current_frame_is_speech:
+            end_frame = i // (frame_samples * 2)
+            speech_chunks.append({
+                "start": start_frame * frame_duration_ms,
+                "end": end_frame * frame_duration_ms
+            })
+            is_speech = False
+
+    if is_speech: # If the audio ends on a speech segment
+        end_frame = len(pcm_data) // (frame_samples * 2)
+        speech_chunks.append({
+            "start": start_frame * frame_duration_ms,
+            "end": end_frame * frame_duration_ms
+        })
+
+    return pcm_audio.float_view(), speech_chunks
+
+
+def segment_audio(audio_path: str, vad_config: Optional[Dict] = None) -> Tuple[FloatView, List[Dict[str, int]], Dict]:
+    """
+    Runs VAD and packs the raw speech chunks into Whisper-sized windows.
+
+    `vad_config` is the `vad` section of config.yml (aggressiveness, padding_ms,
+    min_segment_ms, max_window_s). Returns the audio, the packed windows and a
+    report of how many encoder windows packing saved.
+    """
+    return segment_pcm(load_audio(audio_path), vad_config)
+
+
+def segment_pcm(pcm_audio: PCMAudio, vad_config: Optional[Dict] = None) -> Tuple[FloatView, List[Dict[str, int]], Dict]:
+    """Same as `segment_audio` for audio that is already in memory."""
+    vad_config = vad_config or {}
+    audio, speech_chunks = vad_split_pcm(pcm_audio, aggressiveness=vad_config.get('aggressiveness', 3))
+
+    windows, report = postprocess_segments(
+        speech_chunks,
+        padding_ms=vad_config.get('padding_ms', 200),
+        min_segment_ms=vad_config.get('min_segment_ms', 250),
+        max_window_ms=int(vad_config.get('max_window_s', WHISPER_WINDOW_MS / 1000) * 1000),
+        audio_duration_ms=int(len(audio) / SAMPLE_RATE * 1000)
+    )
+    return audio, windows, report
+
+
+def slice_chunks(audio: np.ndarray, speech_chunks: List[Dict[str, int]], sample_rate: int = SAMPLE_RATE) -> List[np.ndarray]:
+    """Cuts the audio into one (possibly empty) segment per speech chunk."""
+    segments = []
+    for chunk in speech_chunks:
+        start_sample = int(chunk["start"] / 1000 * sample_rate)
+        end_sample = int(chunk["end"] / 1000 * sample_rate)
+        segments.append(audio[start_sample:end_sample])
+    return segments
+
+
+def transcribe_segments(
+    model,
+    processor,
+    segments: List[np.ndarray],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    assistant_model=None,
+    policy: Optional[DecodingPolicy] = None
+) -> List[str]:
+    """
+    Transcribes audio segments in padded batches and returns one text per segment, in input order.
+
+    Segments are grouped by duration so that each batch decodes outputs of similar
+    length, then the decoded texts are mapped back to their original positions.
+    Empty segments yield an empty string without reaching the model.
+
+    With an `assistant_model` (a smaller Whisper sharing the tokenizer), decoding is
+    speculative: the assistant drafts tokens and `model` verifies them in one pass.
+    Assisted generation works on one sequence at a time, so batching is disabled.
+
+    `policy` forces language/task, caps new tokens by segment duration and
+    re-decodes hypotheses that fail its compression-ratio or log-prob checks.
+    """
+    policy = policy or DecodingPolicy()
+    texts = [""] * len(segments)
+    order = sorted(
+        (i for i, segment in enumerate(segments) if len(segment) > 0),
+        key=lambda i: len(segments[i])
+    )
+    batch_size = max(1, int(batch_size))
+
+    assistant_kwargs = {}
+    if assistant_model is not None:
+        assistant_kwargs['assistant_model'] = assistant_model
+        batch_size = 1
+
+    for offset in range(0, len(order), batch_size):
+        batch_indices = order[offset:offset + batch_size]
+        batch = [segments[i] for i in batch_indices]
+
+        input_features = processor(batch, sampling_rate=SAMPLE_RATE, return_tensors="pt").input_features.to(model.device)
+
+        # Segments are sorted, so the last one bounds the token budget of the batch
+        duration_s = len(batch[-1]) / SAMPLE_RATE
+        decoded = _generate_with_fallback(model, processor, input_features, duration_s, policy, assistant_kwargs)
+        for i, text in zip(batch_indices, decoded):
+            texts[i] = text
+
+    return texts
+
+
+def _generate_with_fallback(model, processor, input_features, duration_s: float, policy: DecodingPolicy, assistant_kwargs: Dict) -> List[str]:
+    """Greedy decoding of a batch, then fallback decoding of the hypotheses the policy rejects."""
+    # One encoder+decoder pass for the whole batch
+    texts, logprobs = _generate(model, processor, input_features, policy.generate_kwargs(duration_s, assistant_kwargs))
+    failed = [k for k, (text, logprob) in enumerate(zip(texts, logprobs)) if policy.needs_fallback(text, logprob)]
+
+    for attempt in policy.fallbacks:
+        if not failed:
+            break
+        retry_texts, retry_logprobs = _generate(model, processor, input_features[failed], policy.generate_kwargs(duration_s, attempt))
+
+        still_failing = []
+        for k, text, logprob in zip(failed, retry_texts, retry_logprobs):
+            texts[k] = text
+            if policy.needs_fallback(text, logprob):
+                still_failing.append(k)
+        failed = still_failing
+
+    return texts
+
+
+def _generate(model, processor, input_features, generate_kwargs: Dict) -> Tuple[List[str], List[Optional[float]]]:
+    """Runs generate() and returns decoded texts with their average token log-probabilities."""
+    # Imported here so that importing this module stays cheap
+    import torch
+
+    with torch.no_grad():
+        outputs = model.generate(input_features, **generate_kwargs)
+
+    texts = processor.batch_decode(outputs.sequences, skip_special_tokens=True)
+
+    if getattr(outputs, 'sequences_scores', None) is not None:
+        # Beam search already reports length-normalized sequence log-probabilities
+        return texts, outputs.sequences_scores.tolist()
+    if not getattr(outputs, 'scores', None):
+        return texts, [None] * len(texts)
+
+    scores = model.compute_transition_scores(outputs.sequences, outputs.scores, normalize_logits=True)
+    generated = outputs.sequences[:, -scores.shape[1]:]
+    mask = (generated != processor.tokenizer.pad_token_id) & torch.isfinite(scores)
+    totals = torch.where(mask, scores, torch.zeros_like(scores)).sum(dim=1)
+    logprobs = (totals / mask.sum(dim=1).clamp(min=1)).tolist()
+    return texts, logprobs
+
+
+def transcribe_audio(
+    model,
+    processor,
+    audio: np.ndarray,
+    speech_chunks: List[Dict[str, int]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    assistant_model=None,
+    policy: Optional[DecodingPolicy] = None
+) -> str:
+    """
+    Transcribes audio chunks using the Whisper ASR model.
+
+    All chunks are feature-extracted and decoded in batches of at most `batch_size`;
+    `batch_size=1` reproduces one `generate` call per chunk. See `transcribe_segments`
+    for `assistant_model` and `policy`.
+    """
+    if not speech_chunks:
+        return ""
+
+    texts = transcribe_segments(
+        model,
+        processor,
+        slice_chunks(audio, speech_chunks),
+        batch_size=batch_size,
+        assistant_model=assistant_model,
+        policy=policy
+    )
+    return " ".join(text for text in texts if text).strip()
+
+
+def iter_speech_segments(audio_path: str, vad_config: Optional[Dict] = None, block_ms: int = 1000) -> Iterator[Dict]:
+    """
+    Long-audio VAD: reads the file in blocks and yields speech segments
+    (`start`/`end` in ms, float `audio`) as they close.
+
+    Memory stays constant in the recording length: one block plus one open
+    segment, which is capped at `max_window_s` of the `vad` config.
+    """
+    vad_config = vad_config or {}
+    vad = StreamingVAD(
+        aggressiveness=vad_config.get('aggressiveness', 3),
+        frame_duration_ms=vad_config.get('frame_duration_ms', 30),
+        hangover_ms=vad_config.get('padding_ms', 200),
+        min_segment_ms=vad_config.get('min_segment_ms', 250),
+        max_segment_ms=int(vad_config.get('max_window_s', WHISPER_WINDOW_MS / 1000) * 1000)
+    )
+    for block in iter_pcm_blocks(audio_path, block_ms=block_ms):
+        yield from vad.feed(memoryview(block).cast('B'))
+    yield from vad.flush()
+
+
+def transcribe_long_audio(
+    model,
+    processor,
+    audio_path: str,
+    vad_config: Optional[Dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    assistant_model=None,
+    policy: Optional[DecodingPolicy] = None,
+    block_ms: int = 1000
+) -> Iterator[Dict]:
+    """
+    Transcribes a recording of any length at constant memory, yielding
+    `{'start', 'end', 'text'}` per speech segment in order. At most `batch_size`
+    segments are buffered before they are decoded together.
+    """
+    batch: List[Dict] = []
+    for segment in iter_speech_segments(audio_path, vad_config, block_ms):
+        batch.append(segment)
+        if len(batch) == batch_size:
+            yield from _transcribe_timed(model, processor, batch, assistant_model, policy)
+            batch = []
+    if batch:
+        yield from _transcribe_timed(model, processor, batch, assistant_model, policy)
+
+
+def _transcribe_timed(model, processor, segments: List[Dict], assistant_model, policy: Optional[DecodingPolicy]) -> Iterator[Dict]:
+    texts = transcribe_segments(
+        model,
+        processor,
+        [segment['audio'] for segment in segments],
+        batch_size=len(segments),
+        assistant_model=assistant_model,
+        policy=policy
+    )
+    for segment, text in zip(segments, texts):
+        if text:
+            yield {'start': segment['start'], 'end': segment['end'], 'text': text}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Advanced text normalization for multilingual ASR, especially for Arabic dialects.
+    """
+    return normalize(text)
@@ -0,0 +1,142 @@
+"""
+Intent result cache
+Classified intents keyed by the normalized message text and the classifier
+that produced them, in a bounded in-memory LRU with per-entry expiry and an
+optional Redis tier shared by every API worker.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from src.models import Intent, IntentType
+from src.normalization import normalize
+
+# Bump when the meaning of a cached intent changes (labels, normalization...)
+CACHE_VERSION = 1
+
+
+class IntentCache:
+    """LRU+TTL cache of intents with an optional Redis tier"""
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_s: Optional[float] = 3600,
+        redis_client=None,
+        redis_ttl_s: Optional[int] = None
+    ):
+        """
+        Args:
+            max_entries: Capacity of the in-memory LRU
+            ttl_s: Lifetime of in-memory entries (None keeps them until evicted)
+            redis_client: Asynchronous Redis client for a tier shared between workers
+            redis_ttl_s: Expiry of Redis entries (defaults to ttl_s)
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.redis_client = redis_client
+        self.redis_ttl_s = redis_ttl_s if redis_ttl_s is not None else ttl_s
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+
+        self.hits = {'memory': 0, 'redis': 0}
+        self.misses = 0
+        self.expired = 0
+        # Classification time that hits did not spend
+        self.saved_latency_s = 0.0
+
+    @classmethod
+    def from_config(cls, cache_config: Dict) -> 'IntentCache':
+        """Builds the cache from the `intent_cache` section of config.yml."""
+        redis_client = None
+        if cache_config.get('redis_url'):
+            import redis.asyncio
+            redis_client = redis.asyncio.Redis.from_url(cache_config['redis_url'])
+
+        return cls(
+            max_entries=cache_config.get('max_entries', 4096),
+            ttl_s=cache_config.get('ttl_s', 3600),
+            redis_client=redis_client,
+            redis_ttl_s=cache_config.get('redis_ttl_s')
+        )
+
+    @staticmethod
+    def model_version(classifier_key: Hashable) -> str:
+        """Fingerprint of the classifier (type, model, configuration) behind a cached intent."""
+        encoded = json.dumps([CACHE_VERSION, classifier_key], sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    @staticmethod
+    def key(text: str, model_version: str) -> str:
+        """Cache key of a message: case, punctuation, diacritics and elongations do not matter."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(model_version.encode('ascii'))
+        digest.update(normalize(text).encode('utf-8'))
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Intent]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits['memory'] += 1
+                self.saved_latency_s += payload['latency_s']
+                return _to_intent(payload)
+            del self._entries[key]
+            self.expired += 1
+
+        if self.redis_client is not None:
+            value = await self.redis_client.get(f"nlu:intent:{key}")
+            if value is not None:
+                payload = json.loads(value)
+                self._remember(key, payload)
+                self.hits['redis'] += 1
+                self.saved_latency_s += payload['latency_s']
+                return _to_intent(payload)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, intent: Intent, latency_s: float):
+        """Stores an intent along with the time it took to classify, which every later hit saves."""
+        payload = {
+            'type': intent.type.value,
+            'confidence': intent.confidence,
+            'parameters': intent.parameters,
+            'latency_s': latency_s
+        }
+        self._remember(key, payload)
+
+        if self.redis_client is not None:
+            ex = int(self.redis_ttl_s) if self.redis_ttl_s else None
+            await self.redis_client.set(f"nlu:intent:{key}", json.dumps(payload, ensure_ascii=False, default=str), ex=ex)
+
+    def stats(self) -> Dict:
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': dict(self.hits),
+            'misses': self.misses,
+            'expired': self.expired,
+            'hit_rate': sum(self.hits.values()) / lookups if lookups else 0.0,
+            'saved_latency_s': self.saved_latency_s
+        }
+
+    def _remember(self, key: str, payload: Dict):
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else float('inf')
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _to_intent(payload: Dict) -> Intent:
+    # A fresh Intent per hit, so callers may keep or modify it
+    return Intent(
+        type=IntentType(payload['type']),
+        confidence=payload['confidence'],
+        parameters=dict(payload['parameters'])
+    )
@@ -0,0 +1,146 @@
+"""
+Lexicon fast path for intent classification
+One compiled lexicon automaton over the normalized message decides the
+obvious cases (toxic terms, messages dominated by a single intent's keywords)
+in microseconds. Anything else is left to the transformer classifier.
+"""
+
+import csv
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.lexicon_engine import LexiconAutomaton, load_lexicon
+from src.models import Intent, IntentType
+from src.normalization import normalize
+
+DEFAULT_TOXIC_LEXICON_PATH = "data/lexicons/toxic.txt"
+DEFAULT_MILD_TOXIC_LEXICON_PATH = "data/lexicons/toxic_mild.txt"
+DEFAULT_INTENT_KEYWORDS_PATH = "data/lexicons/intent_keywords.csv"
+
+# Labels of toxic-lexicon matches inside the automaton
+_TOXIC = IntentType.TOXIC.value
+_MILD_TOXIC = 'toxic_mild'
+
+
+class LexiconIntentClassifier:
+    """
+    Decides toxic and keyword-dominant messages without a model.
+
+    A message is toxic as soon as it contains an unambiguous insult, or two
+    terms of the toxic and mild lexicons. A single mild term (an ordinary word
+    also used as an insult) leaves the message to the model. A message gets a
+    keyword intent when it has at most `max_tokens` tokens and all its keyword
+    matches point to that one intent. `classify` returns None for everything else.
+    """
+
+    def __init__(
+        self,
+        intent_keywords: Optional[Dict[str, Iterable[str]]] = None,
+        toxic_lexicon_path: str = DEFAULT_TOXIC_LEXICON_PATH,
+        mild_toxic_lexicon_path: str = DEFAULT_MILD_TOXIC_LEXICON_PATH,
+        intent_keywords_path: str = DEFAULT_INTENT_KEYWORDS_PATH,
+        max_tokens: int = 12,
+        confidence: float = 0.9,
+        shadow_rate: float = 0.0
+    ):
+        """
+        Args:
+            intent_keywords: Tenant keywords per IntentType value, added to the shared lists
+            toxic_lexicon_path: Toxic terms, one per line
+            mild_toxic_lexicon_path: Terms deciding TOXIC only along with another toxic term
+            intent_keywords_path: CSV of Intent,Keyword rows
+            max_tokens: Longest message a keyword match may decide
+            confidence: Confidence reported for lexicon decisions
+            shadow_rate: Share of decided messages also sent to the model to measure agreement
+        """
+        terms = dict(load_intent_keywords(intent_keywords_path))
+        for intent, keywords in (intent_keywords or {}).items():
+            IntentType(intent)
+            terms.update({keyword: intent for keyword in keywords})
+        # Toxic terms win over a keyword spelled the same way
+        terms.update({term: _MILD_TOXIC for term in load_toxic_lexicon(mild_toxic_lexicon_path)})
+        terms.update({term: _TOXIC for term in load_toxic_lexicon(toxic_lexicon_path)})
+
+        self.automaton = LexiconAutomaton(terms)
+        self.max_tokens = max_tokens
+        self.confidence = confidence
+        self.shadow_rate = shadow_rate
+
+        # Metrics
+        self.messages = 0
+        self.decisions = Counter()
+        self.shadowed = 0
+        self.agreements = 0
+
+    @classmethod
+    def from_config(cls, fast_path_config: Dict, intent_keywords: Optional[Dict[str, Iterable[str]]] = None) -> 'LexiconIntentClassifier':
+        """Builds the classifier from the `lexicon_fast_path` section of a tenant config."""
+        return cls(
+            intent_keywords=intent_keywords,
+            toxic_lexicon_path=fast_path_config.get('toxic_lexicon_path', DEFAULT_TOXIC_LEXICON_PATH),
+            mild_toxic_lexicon_path=fast_path_config.get('mild_toxic_lexicon_path', DEFAULT_MILD_TOXIC_LEXICON_PATH),
+            intent_keywords_path=fast_path_config.get('intent_keywords_path', DEFAULT_INTENT_KEYWORDS_PATH),
+            max_tokens=fast_path_config.get('max_tokens', 12),
+            confidence=fast_path_config.get('confidence', 0.9),
+            shadow_rate=fast_path_config.get('shadow_rate', 0.0)
+        )
+
+    def classify(self, text: str) -> Optional[Intent]:
+        """The intent of an obvious message, or None when the model has to decide."""
+        self.messages += 1
+        tokens = normalize(text).split()
+        matches = self.automaton.scan(tokens)
+        if not matches:
+            return None
+
+        toxic_terms = [term for term, label in matches if label in (_TOXIC, _MILD_TOXIC)]
+        if len(toxic_terms) > 1 or any(label == _TOXIC for _, label in matches):
+            self.decisions[_TOXIC] += 1
+            return Intent(type=IntentType.TOXIC, confidence=self.confidence, parameters={'source': 'lexicon', 'matched': toxic_terms})
+        if toxic_terms:
+            # A complaint or an insult: the model sees the whole message
+            return None
+
+        intents = {label for _, label in matches}
+        if len(intents) == 1 and len(tokens) <= self.max_tokens:
+            intent = intents.pop()
+            self.decisions[intent] += 1
+            return Intent(
+                type=IntentType(intent),
+                confidence=self.confidence,
+                parameters={'source': 'lexicon', 'matched': [term for term, _ in matches]}
+            )
+        return None
+
+    def should_shadow(self) -> bool:
+        """Whether this decision should also be checked against the model."""
+        return self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def record_agreement(self, lexicon_intent: Intent, model_intent: Intent):
+        self.shadowed += 1
+        self.agreements += lexicon_intent.type == model_intent.type
+
+    def stats(self) -> Dict:
+        decided = sum(self.decisions.values())
+        return {
+            'messages': self.messages,
+            'short_circuited': decided,
+            'short_circuit_rate': decided / self.messages if self.messages else 0.0,
+            'decisions': dict(self.decisions),
+            'shadowed': self.shadowed,
+            'agreement_rate': self.agreements / self.shadowed if self.shadowed else None
+        }
+
+
+def load_toxic_lexicon(toxic_lexicon_path: str = DEFAULT_TOXIC_LEXICON_PATH) -> Tuple[str, ...]:
+    """Toxic terms, one per line."""
+    return load_lexicon(toxic_lexicon_path)
+
+
+@lru_cache(maxsize=None)
+def load_intent_keywords(intent_keywords_path: str = DEFAULT_INTENT_KEYWORDS_PATH) -> Tuple[Tuple[str, str], ...]:
+    """(keyword, IntentType value) pairs shared by every tenant."""
+    with open(intent_keywords_path, 'r', encoding='utf-8') as f:
+        return tuple((row['Keyword'], IntentType(row['Intent']).value) for row in csv.DictReader(f))
@@ -0,0 +1,84 @@
+"""
+Lexicon engine
+Word and phrase lists compiled into one Aho-Corasick automaton over tokens of
+normalized text. A message is scanned once, whatever the size of the lexicons,
+and only whole tokens match ("نحب" is found in "نحب ندير", not in "نحبو").
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+from src.normalization import normalize
+
+
+class LexiconAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is normalized tokens. Each term is a
+    word or phrase with a label; scanning reports every (term, label) whose
+    tokens appear consecutively in the message, overlapping matches included.
+    """
+
+    def __init__(self, terms: Dict[str, str]):
+        """
+        Args:
+            terms: Term or phrase -> label; terms are normalized like the messages
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[str, str], ...]] = [()]
+        self.size = 0
+
+        for term, label in terms.items():
+            tokens = normalize(term).split()
+            if not tokens:
+                continue
+            node = 0
+            for token in tokens:
+                child = self._goto[node].get(token)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][token] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = child
+            if not self._output[node]:
+                self.size += 1
+            self._output[node] = ((' '.join(tokens), label),)
+
+        self._link()
+
+    def _link(self):
+        # Breadth-first, so a node's failure target is complete before the node itself
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, tokens: Iterable[str]) -> List[Tuple[str, str]]:
+        """(term, label) of every match in the tokens of a normalized message, in order of their end."""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches: List[Tuple[str, str]] = []
+        node = 0
+        for token in tokens:
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if output[node]:
+                matches.extend(output[node])
+        return matches
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(lexicon_path: str) -> Tuple[str, ...]:
+    """Terms of a lexicon file, one per line, skipping blank lines and # comments."""
+    with open(lexicon_path, 'r', encoding='utf-8') as f:
+        return tuple(line.strip() for line in f if line.strip() and not line.startswith('#'))
@@ -1,16 +1,22 @@
+from typing import List
 
-from transformers import pipeline
 from src.models import Intent, IntentType
+from src.model_registry import get_model_registry
+
+DEFAULT_NLU_MODEL = "MoritzLaurer/bge-m3-zeroshot-v2.0"
 
 class MLIntentClassifier:
     """
     ML-based intent classifier using a zero-shot classification model.
     """
 
-    def __init__(self, model_name="MoritzLaurer/bge-m3-zeroshot-v2.0"):
+    def __init__(self, model_name=DEFAULT_NLU_MODEL):
         """
         Initializes the zero-shot classification pipeline.
         """
+        # Imported here so that importing this module stays cheap
+        from transformers import pipeline
+
         self.classifier = pipeline("zero-shot-classification", model=model_name)
         self.intent_labels = [intent.value for intent in IntentType]
 
@@ -18,14 +24,34 @@ class MLIntentClassifier:
         """
         Classifies the intent of the given text.
         """
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: List[str]) -> List[Intent]:
+        """
+        Classifies several texts; all (text, label) pairs go through the model
+        in one batched forward pass.
+        """
+        if not texts:
+            return []
+
         hypothesis_template = "The user's message is expressing a {}."
-        result = self.classifier(text, self.intent_labels, hypothesis_template=hypothesis_template, multi_label=False)
+        results = self.classifier(
+            texts,
+            self.intent_labels,
+            hypothesis_template=hypothesis_template,
+            multi_label=False,
+            batch_size=len(texts) * len(self.intent_labels)
+        )
+        if isinstance(results, dict):
+            results = [results]
 
-        # The top label is the predicted intent
-        top_label = result['labels'][0]
-        confidence = result['scores'][0]
+        # The top label of each result is the predicted intent, converted back to an IntentType enum
+        return [Intent(type=IntentType(result['labels'][0]), confidence=result['scores'][0]) for result in results]
 
-        # Convert the label back to an IntentType enum
-        intent_type = IntentType(top_label)
 
-        return Intent(type=intent_type, confidence=confidence)
+def get_intent_classifier(model_name: str = DEFAULT_NLU_MODEL) -> MLIntentClassifier:
+    """
+    Shared intent classifier from the process-wide model registry, so every
+    tenant's orchestrator uses the same model instance.
+    """
+    return get_model_registry().get(('nlu', model_name), lambda: MLIntentClassifier(model_name), kind='nlu')
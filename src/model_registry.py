@@ -0,0 +1,187 @@
+"""
+Process-wide model registry
+Every Whisper and NLU model is obtained through one registry, so tenants and
+pipelines share a single instance per model. Resident memory is tracked per
+model and a configurable budget is enforced by evicting the least recently
+used models.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+@dataclass
+class _RegisteredModel:
+    key: Hashable
+    kind: str
+    value: Any
+    memory_bytes: int
+    load_seconds: float
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class ModelRegistry:
+    """LRU registry of loaded models under a memory budget"""
+
+    def __init__(self, memory_budget_mb: Optional[float] = None):
+        """
+        Args:
+            memory_budget_mb: Total resident memory allowed for models; None disables eviction
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self._models: 'OrderedDict[Hashable, _RegisteredModel]' = OrderedDict()
+        # Guards the registered models and the budget, never held while a model loads
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any], kind: str = 'model') -> Any:
+        """
+        Returns the model registered under `key`, loading it with `loader` on
+        first use. Loading a model may evict least recently used ones.
+        """
+        with self._lock:
+            value = self._hit(key)
+            if value is not None:
+                return value
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Loads take seconds: only callers of the same key wait, lookups of loaded models do not
+        with load_lock:
+            with self._lock:
+                value = self._hit(key)
+                if value is not None:
+                    return value
+
+            try:
+                rss_before = _resident_bytes()
+                start = time.perf_counter()
+                value = loader()
+                load_seconds = time.perf_counter() - start
+                # Concurrent loads of other keys inflate the delta; parameter sizes bound it from below
+                rss_delta = max(_resident_bytes() - rss_before, 0)
+
+                with self._lock:
+                    self._models[key] = _RegisteredModel(
+                        key=key,
+                        kind=kind,
+                        value=value,
+                        memory_bytes=max(rss_delta, _parameter_bytes(value)),
+                        load_seconds=load_seconds
+                    )
+                    self._enforce_budget(keep=key)
+                return value
+            finally:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+
+    def _hit(self, key: Hashable) -> Any:
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        self._models.move_to_end(key)
+        entry.last_used = time.time()
+        entry.hits += 1
+        return entry.value
+
+    def evict(self, key: Hashable) -> bool:
+        """Drops a model from the registry. Callers still holding it keep it alive until they let go."""
+        with self._lock:
+            if self._models.pop(key, None) is None:
+                return False
+            self.evictions += 1
+        gc.collect()
+        return True
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(entry.memory_bytes for entry in self._models.values())
+
+    def snapshot(self) -> Dict:
+        """Loaded models, least recently used first, with their memory and usage."""
+        with self._lock:
+            models: List[Dict] = [
+                {
+                    'key': list(entry.key) if isinstance(entry.key, tuple) else entry.key,
+                    'kind': entry.kind,
+                    'memory_mb': entry.memory_bytes / 2**20,
+                    'load_seconds': entry.load_seconds,
+                    'loaded_at': entry.loaded_at,
+                    'last_used': entry.last_used,
+                    'hits': entry.hits
+                }
+                for entry in self._models.values()
+            ]
+            return {
+                'memory_budget_mb': self.memory_budget_mb,
+                'memory_mb': self.memory_bytes / 2**20,
+                'evictions': self.evictions,
+                'models': models
+            }
+
+    def _enforce_budget(self, keep: Hashable):
+        if self.memory_budget_mb is None:
+            return
+
+        budget = self.memory_budget_mb * 2**20
+        evicted = False
+        for key in list(self._models):
+            if self.memory_bytes <= budget:
+                break
+            if key == keep:
+                continue
+            del self._models[key]
+            self.evictions += 1
+            evicted = True
+
+        if self.memory_bytes > budget:
+            print(f"Warning: models use {self.memory_bytes / 2**20:.0f} MB, over the {self.memory_budget_mb} MB budget")
+        if evicted:
+            gc.collect()
+
+
+# One registry per process
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Returns the process-wide model registry."""
+    return _registry
+
+
+def configure_model_registry(registry_config: Dict):
+    """Applies the `model_registry` section of config.yml to the process-wide registry."""
+    budget = registry_config.get('memory_budget_mb')
+    with _registry._lock:
+        _registry.memory_budget_mb = budget
+        _registry._enforce_budget(keep=None)
+
+
+def _resident_bytes() -> int:
+    """Current resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def _parameter_bytes(value: Any, depth: int = 2) -> int:
+    """Size of the torch parameters and buffers reachable from a model, processor tuple or wrapper."""
+    if isinstance(value, (tuple, list)):
+        return sum(_parameter_bytes(item, depth) for item in value)
+
+    if callable(getattr(value, 'parameters', None)) and callable(getattr(value, 'buffers', None)):
+        tensors = list(value.parameters()) + list(value.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+    if depth > 0 and hasattr(value, '__dict__'):
+        return sum(_parameter_bytes(attr, depth - 1) for attr in vars(value).values())
+    return 0
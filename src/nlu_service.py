@@ -0,0 +1,174 @@
+"""
+Cross-tenant NLU micro-batching
+Messages of concurrent conversations, whatever their tenant, are collected for a
+few milliseconds (or until a batch is full) and classified in one forward pass
+on a worker thread, so the event loop never runs the model.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from src.models import Intent
+
+# Returns the classifier of a batch; called per batch so models evicted from the registry are reloaded
+ClassifierLoader = Callable[[], Any]
+
+
+@dataclass
+class _PendingMessage:
+    text: str
+    classifier_key: Hashable
+    load_classifier: ClassifierLoader
+    queued_at: float
+    future: asyncio.Future
+
+
+class NLUBatchService:
+    """
+    Dynamic micro-batching service in front of the intent classifiers.
+
+    A batch is dispatched as soon as `max_batch_size` messages are waiting or
+    `max_wait_ms` has passed since its first message arrived. Messages routed to
+    different classifiers are never mixed in one `classify_batch()` call. One
+    batch per worker thread is in flight at once; beyond that, messages keep
+    queueing into the next batch.
+    """
+
+    def __init__(self, max_batch_size: int = 16, max_wait_ms: float = 5.0, workers: int = 1):
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        # Forward passes run here; one worker keeps them from competing for the same cores
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nlu')
+        self.workers = workers
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Held so in-flight batches are not garbage collected
+        self._in_flight = set()
+        # Futures of every message not answered yet: queued, being batched or in flight
+        self._pending = set()
+
+        # Metrics
+        self._batch_sizes = Counter()
+        self._waits = deque(maxlen=1000)
+        self._inference_times = deque(maxlen=1000)
+        self._max_queue_depth = 0
+        self._messages = 0
+
+    @classmethod
+    def from_config(cls, batching_config: Dict) -> 'NLUBatchService':
+        """Builds the service from the `nlu_batching` section of config.yml."""
+        return cls(
+            max_batch_size=batching_config.get('max_batch_size', 16),
+            max_wait_ms=batching_config.get('max_wait_ms', 5),
+            workers=batching_config.get('workers', 1)
+        )
+
+    async def classify(self, text: str, classifier_key: Hashable, load_classifier: ClassifierLoader) -> Intent:
+        """Queues a message for batched classification and waits for its intent."""
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        self._queue.put_nowait(_PendingMessage(text, classifier_key, load_classifier, time.perf_counter(), future))
+
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return await future
+
+    def metrics(self) -> Dict:
+        """Queue depth, batch size distribution, queueing delay and batch inference time."""
+        waits = sorted(self._waits)
+        inference_times = sorted(self._inference_times)
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self._max_queue_depth,
+            'messages': self._messages,
+            'batches': sum(self._batch_sizes.values()),
+            'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+            'mean_batch_size': self._messages / max(sum(self._batch_sizes.values()), 1),
+            'wait_ms_p50': waits[len(waits) // 2] * 1000 if waits else 0.0,
+            'wait_ms_p95': waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+            'wait_ms_max': waits[-1] * 1000 if waits else 0.0,
+            'batch_ms_p50': inference_times[len(inference_times) // 2] * 1000 if inference_times else 0.0,
+            'batch_ms_p95': inference_times[int(len(inference_times) * 0.95)] * 1000 if inference_times else 0.0,
+        }
+
+    def shutdown(self):
+        """Stops batching; callers still waiting for an intent get an error rather than hang."""
+        if self._worker is not None:
+            self._worker.cancel()
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait()
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("NLU service shut down before classifying the message"))
+        self._executor.shutdown(wait=False)
+
+    def _ensure_running(self):
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._slots = self._slots or asyncio.Semaphore(self.workers)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_s
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            dispatched_at = time.perf_counter()
+            for item in batch:
+                self._waits.append(dispatched_at - item.queued_at)
+
+            for group in _group_by_classifier(batch):
+                await self._slots.acquire()
+                task = loop.create_task(self._dispatch(group))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, group: List[_PendingMessage]):
+        self._batch_sizes[len(group)] += 1
+        self._messages += len(group)
+
+        texts = [item.text for item in group]
+        load_classifier = group[0].load_classifier
+        start = time.perf_counter()
+        try:
+            intents = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                lambda: load_classifier().classify_batch(texts)
+            )
+        except Exception as e:
+            for item in group:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        finally:
+            self._inference_times.append(time.perf_counter() - start)
+            self._slots.release()
+
+        for item, intent in zip(group, intents):
+            if not item.future.done():
+                item.future.set_result(intent)
+
+
+def _group_by_classifier(batch: List[_PendingMessage]) -> List[List[_PendingMessage]]:
+    """Splits a batch into runs sharing the same classifier."""
+    groups: Dict[Hashable, List[_PendingMessage]] = {}
+    for item in batch:
+        groups.setdefault(item.classifier_key, []).append(item)
+    return list(groups.values())
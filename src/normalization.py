@@ -0,0 +1,60 @@
+"""
+Multilingual text normalization
+One precompiled normalizer shared by ASR post-processing, call routing,
+language detection and evaluation, so every component compares text in the
+same canonical form.
+"""
+
+import re
+from typing import Iterable, List, Union
+
+# Character-level rules: alef/ta-marbuta/ya variants folded to their basic forms
+# and tatweel dropped. Applied with str.replace, which stays in C on non-ASCII
+# text where str.translate falls back to a per-character table lookup.
+_CHAR_FOLDS = (
+    ('أ', 'ا'), ('إ', 'ا'), ('آ', 'ا'),
+    ('ة', 'ه'),
+    ('ى', 'ي'),
+    ('ـ', ''),
+)
+
+# Combining marks, dropped inside their word: Arabic diacritics (tanween, harakat,
+# shadda, sukun, dagger alef, Quranic marks) and decomposed Latin accents
+_DIACRITICS = re.compile(r'[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06dc\u06df-\u06e8\u06ea-\u06ed]+')
+
+# Anything else that is neither a word character nor whitespace: punctuation and
+# emoji separate words ("bonjour,je" is two tokens)
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+# Latin or Arabic letters stretched for emphasis ("بزااااف", "merciii");
+# double letters and digit runs (phone numbers) are kept
+_ELONGATION = re.compile(r'([a-zà-ÿء-ي])\1\1+')
+
+
+def _fold(text: str) -> str:
+    for variant, base in _CHAR_FOLDS:
+        text = text.replace(variant, base)
+    return text
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form of a transcript or customer message: lowercased, Arabic
+    diacritics stripped and letters folded, punctuation turned into spaces,
+    elongations collapsed and whitespace squeezed to single spaces.
+    """
+    text = _PUNCTUATION.sub(' ', _DIACRITICS.sub('', _fold(text.lower())))
+    text = _ELONGATION.sub(r'\1', text)
+    return ' '.join(text.split())
+
+
+def normalize_many(texts: Union[Iterable[str], 'pandas.Series']) -> Union[List[str], 'pandas.Series']:
+    """
+    Normalizes a batch of texts. A pandas Series comes back as a Series with
+    the same index; missing values become empty strings.
+    """
+    values = [normalize(text) if isinstance(text, str) else '' for text in texts]
+
+    if hasattr(texts, 'index') and hasattr(texts, 'to_numpy'):
+        return type(texts)(values, index=texts.index, name=texts.name)
+    return values
@@ -1,64 +1,210 @@
 
 import asyncio
+import functools
 import json
+import time
 import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from dataclasses import asdict
 import redis
-from src.models import ConversationContext, LanguageContext, Language
+from src.models import ConversationContext, Intent, IntentType, LanguageContext, Language
 from src.classifiers import AlgerianLanguageDetector
-from src.ml_classifier import MLIntentClassifier
+from src.ml_classifier import MLIntentClassifier, get_intent_classifier, DEFAULT_NLU_MODEL
+from src.embedding_classifier import EmbeddingIntentClassifier, get_embedding_classifier
+from src.student_classifier import DEFAULT_STUDENT_MODEL_PATH, StudentIntentClassifier, get_student_classifier
+from src.nlu_service import NLUBatchService
+from src.intent_cache import IntentCache
+from src.lexicon_classifier import LexiconIntentClassifier
 from src.entity_extractor import EntityExtractor
 from src.response_generator import ResponseGenerator
+from src.session_store import SessionStore
+from src.session_cache import SessionCache
+
+# Bounded pool for blocking stages of every orchestrator that was not given one
+_stage_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_stage_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """Returns the process-wide executor running blocking orchestrator stages."""
+    global _stage_executor
+    if _stage_executor is None:
+        _stage_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='orchestrator')
+    return _stage_executor
+
 
 class AlgerianAgentOrchestrator:
     """Main orchestrator for the conversational agent system"""
 
-    def __init__(self, tenant_config: Dict, redis_client=None):
+    def __init__(
+        self,
+        tenant_config: Dict,
+        redis_client=None,
+        nlu_service: Optional[NLUBatchService] = None,
+        intent_cache: Optional[IntentCache] = None,
+        executor: Optional[Executor] = None,
+        sessions: Optional[Union[SessionStore, SessionCache]] = None
+    ):
         self.tenant_config = tenant_config
         self.language_detector = AlgerianLanguageDetector()
-        self.intent_classifier = MLIntentClassifier()
+        self.nlu_model_name = tenant_config.get('nlu_model', DEFAULT_NLU_MODEL)
+        # 'zero_shot' (one NLI pass per label), 'embedding' (one pass, exemplar similarity)
+        # or 'student' (char n-gram model distilled from zero_shot, CPU only)
+        self.intent_classifier_type = tenant_config.get('intent_classifier', 'zero_shot')
+        self.student_model_path = tenant_config.get('student_model_path', DEFAULT_STUDENT_MODEL_PATH)
+        if self.intent_classifier_type not in ('zero_shot', 'embedding', 'student'):
+            raise ValueError(f"Unknown intent classifier '{self.intent_classifier_type}'")
         self.entity_extractor = EntityExtractor()
         self.response_generator = ResponseGenerator(tenant_config)
         self.redis_client = redis_client
+        # Shared worker session cache, or this tenant's own store without one
+        self.sessions = sessions
+        if self.sessions is None and redis_client:
+            self.sessions = SessionStore(redis_client, ttl_s=tenant_config.get('session_ttl_s', 3600))
+        # Shared by every tenant's orchestrator; None classifies on the stage executor
+        self.nlu_service = nlu_service
+        self.executor = executor or get_stage_executor()
+        self.intent_cache = intent_cache
+        self.intent_model_version = IntentCache.model_version(self.intent_classifier_key)
+
+        # Toxic and keyword-dominant messages are decided before the model
+        fast_path_config = tenant_config.get('lexicon_fast_path', {})
+        self.lexicon_classifier = None
+        # Held so background shadow classifications are not garbage collected
+        self._shadow_tasks = set()
+        if fast_path_config.get('enabled', False):
+            self.lexicon_classifier = LexiconIntentClassifier.from_config(fast_path_config, tenant_config.get('intent_keywords'))
+
+    @property
+    def intent_classifier(self) -> Union[MLIntentClassifier, EmbeddingIntentClassifier, StudentIntentClassifier]:
+        # Looked up per message so this tenant never pins a model the registry evicted
+        return self._load_intent_classifier()
+
+    def preload_models(self):
+        """Loads the NLU model now rather than on the first message."""
+        self._load_intent_classifier()
+
+    @property
+    def intent_classifier_key(self) -> tuple:
+        """Identifies this tenant's classifier, so the NLU service only batches messages sharing a model."""
+        if self.intent_classifier_type == 'embedding':
+            return ('embedding', json.dumps(self.tenant_config.get('embedding_classifier', {}), sort_keys=True))
+        if self.intent_classifier_type == 'student':
+            return ('student', self.student_model_path)
+        return ('zero_shot', self.nlu_model_name)
+
+    def _load_intent_classifier(self) -> Union[MLIntentClassifier, EmbeddingIntentClassifier, StudentIntentClassifier]:
+        if self.intent_classifier_type == 'embedding':
+            return get_embedding_classifier(**self.tenant_config.get('embedding_classifier', {}))
+        if self.intent_classifier_type == 'student':
+            return get_student_classifier(self.student_model_path)
+        return get_intent_classifier(self.nlu_model_name)
 
     async def process_message(self, message: str, customer_id: str, tenant_id: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
-        context = await self._get_or_create_context(conversation_id, tenant_id, customer_id)
-        conversation_id = context.conversation_id
+        started = time.perf_counter()
+        stage_ms: Dict[str, float] = {}
 
+        # Session fetch (Redis) and intent classification (model) wait on I/O or the
+        # executor; the microsecond-scale analyzers run on the loop in the meantime
+        context_task = asyncio.ensure_future(self._timed(stage_ms, 'context', self._get_or_create_context(conversation_id, tenant_id, customer_id)))
+        intent_task = asyncio.ensure_future(self._timed(stage_ms, 'intent', self._classify_intent(message)))
+
+        stage_start = time.perf_counter()
         lang_ctx = self.language_detector.detect(message)
-        context.language_context = lang_ctx
+        stage_ms['language'] = (time.perf_counter() - stage_start) * 1000
 
-        intent = self.intent_classifier.classify(message)
-        context.intent_history.append(intent)
+        stage_start = time.perf_counter()
+        entities = self.entity_extractor.extract(message)
+        stage_ms['entities'] = (time.perf_counter() - stage_start) * 1000
 
-        entities = self.entity_extractor.extract(message, intent)
+        context, intent = await asyncio.gather(context_task, intent_task)
+        conversation_id = context.conversation_id
+
+        context.language_context = lang_ctx
+        context.intent_history.append(intent)
         context.entities.update(entities)
 
+        stage_start = time.perf_counter()
         response = self.response_generator.generate(intent, entities, context)
+        stage_ms['response'] = (time.perf_counter() - stage_start) * 1000
 
         context.conversation_history.append({'role': 'customer', 'message': message})
         context.conversation_history.append({'role': 'agent', 'message': response['text']})
 
-        await self._save_context(context)
+        await self._timed(stage_ms, 'save', self._save_context(context, [intent], context.conversation_history[-2:]))
+        stage_ms['total'] = (time.perf_counter() - started) * 1000
 
         return {
             'conversation_id': conversation_id,
             'response': response['text'],
             'intent': intent.type.value,
+            'intent_confidence': intent.confidence,
             'language': lang_ctx.primary.value,
+            'entities': {entity_type: [asdict(entity) for entity in found] for entity_type, found in entities.items()},
+            'actions': response.get('action'),
+            'requires_input': response.get('requires_input', False),
+            'metadata': {
+                'timestamp': datetime.now().isoformat(),
+                'toxic_detected': intent.type == IntentType.TOXIC,
+                'intent_source': intent.parameters.get('source', 'model'),
+                'stage_ms': stage_ms
+            },
             **response
         }
 
+    @staticmethod
+    async def _timed(stage_ms: Dict[str, float], stage: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            stage_ms[stage] = (time.perf_counter() - start) * 1000
+
+    async def _classify_intent(self, message: str) -> Intent:
+        if self.lexicon_classifier:
+            intent = self.lexicon_classifier.classify(message)
+            if intent is not None:
+                if self.lexicon_classifier.should_shadow():
+                    # Agreement is measured in the background; the response never waits for the model
+                    shadow = asyncio.ensure_future(self._classify_with_model(message))
+                    self._shadow_tasks.add(shadow)
+                    shadow.add_done_callback(functools.partial(self._record_shadow, intent))
+                return intent
+        return await self._classify_with_model(message)
+
+    def _record_shadow(self, lexicon_intent: Intent, shadow: asyncio.Future):
+        self._shadow_tasks.discard(shadow)
+        if not shadow.cancelled() and shadow.exception() is None:
+            self.lexicon_classifier.record_agreement(lexicon_intent, shadow.result())
+
+    async def _classify_with_model(self, message: str) -> Intent:
+        cache_key = None
+        if self.intent_cache:
+            cache_key = IntentCache.key(message, self.intent_model_version)
+            intent = await self.intent_cache.get(cache_key)
+            if intent is not None:
+                return intent
+
+        start = time.perf_counter()
+        if self.nlu_service:
+            intent = await self.nlu_service.classify(message, self.intent_classifier_key, self._load_intent_classifier)
+        else:
+            # Off the event loop; loading the model on first use happens there too
+            intent = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                lambda: self._load_intent_classifier().classify(message)
+            )
+
+        if self.intent_cache:
+            await self.intent_cache.set(cache_key, intent, time.perf_counter() - start)
+        return intent
+
     async def _get_or_create_context(self, conversation_id: Optional[str], tenant_id: str, customer_id: str) -> ConversationContext:
-        if conversation_id and self.redis_client:
-            context_json = await self.redis_client.get(f"session:{conversation_id}")
-            if context_json:
-                data = json.loads(context_json)
-                data['created_at'] = datetime.fromisoformat(data['created_at'])
-                data['updated_at'] = datetime.fromisoformat(data['updated_at'])
-                return ConversationContext(**data)
+        if conversation_id:
+            context = await self.get_context(conversation_id)
+            if context:
+                return context
 
         return ConversationContext(
             conversation_id=str(uuid.uuid4()),
@@ -67,7 +213,21 @@ class AlgerianAgentOrchestrator:
             language_context=LanguageContext(primary=Language.DARIJA)
         )
 
-    async def _save_context(self, context: ConversationContext):
+    async def _save_context(self, context: ConversationContext, new_intents: List[Intent], new_history: List[Dict]):
         context.updated_at = datetime.now()
-        if self.redis_client:
-            await self.redis_client.set(f"session:{context.conversation_id}", json.dumps(asdict(context), default=str), ex=3600)
+        if self.sessions:
+            await self.sessions.save(context, new_intents, new_history)
+
+    async def get_context(self, conversation_id: str) -> Optional[ConversationContext]:
+        """Saved context of a conversation, None if unknown."""
+        if not self.sessions:
+            return None
+        return await self.sessions.load(conversation_id)
+
+    async def get_conversation_history(self, conversation_id: str) -> List[Dict]:
+        context = await self.get_context(conversation_id)
+        return context.conversation_history if context else []
+
+    async def end_conversation(self, conversation_id: str):
+        if self.sessions:
+            await self.sessions.delete(conversation_id)
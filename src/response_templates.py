@@ -0,0 +1,252 @@
+"""
+Response template engine
+Agent responses compiled once per tenant into a table keyed by (intent,
+language, topic): the tenant's own templates, the curated AR/FR responses of
+the call-centre dataset per Topic, and Darija, French and English defaults. Entity slots such as
+{phone} or {date} are parsed at compile time, so rendering is a few dict
+lookups and a join whatever the number of templates.
+"""
+
+import csv
+import os
+import string
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.embedding_classifier import DEFAULT_DATASET_PATH, DEFAULT_TOPIC_INTENTS_PATH, load_topic_intents
+from src.models import Entity, Intent, IntentType, Language, LanguageContext
+
+# Dataset response column per template language
+RESPONSE_COLUMNS = {'ar': 'Agent_Response_AR', 'fr': 'Agent_Response_FR'}
+
+# Template language of a detected language; MSA is handled apart
+_TEMPLATE_LANGUAGES = {Language.DARIJA: 'ar', Language.MIXED: 'ar', Language.FRENCH: 'fr'}
+
+# English fallbacks: (text, action, requires_input, end_conversation)
+DEFAULT_TEMPLATES = {
+    IntentType.TOXIC: ("Please be respectful.", 'flag_for_moderation', False, True),
+    IntentType.RESERVATION: ("When would you like to book?", 'request_reservation_details', True, False),
+    IntentType.COMPLAINT: ("I'm sorry to hear that. Please provide more details.", 'open_complaint_ticket', True, False),
+}
+_DEFAULT_TEMPLATE = ("How can I help you?", 'provide_information', True, False)
+
+# Default texts per template language, with the action and flags of the English defaults
+LOCALIZED_DEFAULT_TEXTS = {
+    'ar': {
+        IntentType.TOXIC: "من فضلك، احترم الحديث.",
+        IntentType.RESERVATION: "وقتاش تحب تحجز؟",
+        IntentType.COMPLAINT: "سمحلنا على الإزعاج. ممكن تعطينا تفاصيل أكثر؟",
+        None: "كيفاش نقدر نعاونك؟",
+    },
+    'fr': {
+        IntentType.TOXIC: "Merci de rester respectueux.",
+        IntentType.RESERVATION: "Pour quand souhaitez-vous réserver ?",
+        IntentType.COMPLAINT: "Je suis désolé de l'apprendre. Pouvez-vous me donner plus de détails ?",
+        None: "Comment puis-je vous aider ?",
+    },
+}
+
+# Topic of the default templates of an intent, tried after the tenant's topic-less templates
+DEFAULT_TOPIC = '*'
+
+
+def _format_phone(value: str) -> str:
+    # 0551234567 -> 05 51 23 45 67
+    return ' '.join(value[i:i + 2] for i in range(0, len(value), 2)) if len(value) == 10 else value
+
+
+# Formatting of entity values filling a slot of the same name
+SLOT_FORMATTERS: Dict[str, Callable[[str], str]] = {
+    'phone': _format_phone,
+}
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template split into literals and slots once, at compile time."""
+    parts: Tuple[Tuple[str, Optional[str]], ...]
+    slots: frozenset
+    action: str
+    requires_input: bool
+    end_conversation: bool
+    extra: Dict = field(default_factory=dict)
+
+    def render(self, values: Dict[str, str]) -> str:
+        return ''.join(literal + (values[slot] if slot else '') for literal, slot in self.parts)
+
+
+def compile_template(text: str, action: str, requires_input: bool, end_conversation: bool, **extra) -> CompiledTemplate:
+    parts = [(literal, slot or None) for literal, slot, _, _ in string.Formatter().parse(text)]
+    return CompiledTemplate(
+        parts=tuple(parts),
+        slots=frozenset(slot for _, slot in parts if slot),
+        action=action,
+        requires_input=requires_input,
+        end_conversation=end_conversation,
+        extra=extra
+    )
+
+
+class ResponseTemplateEngine:
+    """
+    Per-tenant lookup table of compiled templates.
+
+    The most specific template whose slots can all be filled wins:
+    (intent, language, topic), (intent, language), (intent, topic), (intent),
+    then the default of the intent in the language and in English; within a
+    key, templates filling more slots come first. The tenant's template file is checked for changes at
+    most every `reload_interval_s` and recompiled when it changed.
+    """
+
+    def __init__(
+        self,
+        tenant_config: Dict,
+        dataset_path: str = DEFAULT_DATASET_PATH,
+        topic_intents_path: str = DEFAULT_TOPIC_INTENTS_PATH
+    ):
+        """
+        Args:
+            tenant_config: Tenant settings; `response_templates.path` points to a CSV of
+                Intent,Language,Topic,Text,Action rows (Language ar/fr; Language, Topic and Action
+                optional) and `response_templates.reload_interval_s` is the minimum time between
+                two checks of that file
+            dataset_path: Call-centre dataset providing AR/FR responses per Topic
+            topic_intents_path: CSV mapping each dataset Topic to an IntentType value
+        """
+        templates_config = tenant_config.get('response_templates') or {}
+        self.tenant_config = tenant_config
+        self.templates_path = templates_config.get('path')
+        self.reload_interval_s = templates_config.get('reload_interval_s', 2.0)
+        self.dataset_path = dataset_path
+        self.topic_intents_path = topic_intents_path
+
+        self._table: Dict[Tuple, Tuple[CompiledTemplate, ...]] = {}
+        self._templates_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        # Raises on a broken template file: tenant load fails rather than serving without it
+        self.reload()
+
+    def reload(self):
+        """Recompiles the table from the defaults, the dataset and the tenant's templates."""
+        table: Dict[Tuple, Tuple[CompiledTemplate, ...]] = {}
+        for intent in IntentType:
+            text, action, requires_input, end_conversation = DEFAULT_TEMPLATES.get(intent, _DEFAULT_TEMPLATE)
+            table[(intent, None, DEFAULT_TOPIC)] = (compile_template(text, action, requires_input, end_conversation),)
+            for language, texts in LOCALIZED_DEFAULT_TEXTS.items():
+                table[(intent, language, DEFAULT_TOPIC)] = (
+                    compile_template(texts.get(intent, texts[None]), action, requires_input, end_conversation),
+                )
+
+        for key, (text, agent_action) in _dataset_responses(self.dataset_path, self.topic_intents_path).items():
+            default = table[(key[0], None, DEFAULT_TOPIC)][-1]
+            table[key] = (compile_template(text, default.action, default.requires_input, default.end_conversation, agent_action=agent_action),)
+
+        templates_mtime = None
+        if self.templates_path and os.path.exists(self.templates_path):
+            templates_mtime = os.path.getmtime(self.templates_path)
+            tenant_templates: Dict[Tuple, List[CompiledTemplate]] = {}
+            with open(self.templates_path, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    intent = IntentType(row['Intent'])
+                    default = table[(intent, None, DEFAULT_TOPIC)][-1]
+                    tenant_templates.setdefault((intent, row.get('Language') or None, row.get('Topic') or None), []).append(
+                        compile_template(row['Text'], row.get('Action') or default.action, default.requires_input, default.end_conversation)
+                    )
+            for key, templates in tenant_templates.items():
+                # Templates filling more slots first (file order among equals), the key's previous templates last
+                table[key] = tuple(sorted(templates, key=lambda template: -len(template.slots))) + table.get(key, ())
+
+        # Swapped in one assignment, so concurrent renders see the old or the new table
+        self._table = table
+        self._templates_mtime = templates_mtime
+        self.reloads += 1
+
+    def render(self, intent: Intent, language_context: Optional[LanguageContext], entities: Dict[str, List[Entity]]) -> Dict:
+        self._check_for_changes()
+
+        language = _template_language(language_context)
+        topic = intent.parameters.get('topic')
+        values = self._slot_values(intent, entities)
+
+        for key in (
+            (intent.type, language, topic), (intent.type, language, None), (intent.type, None, topic), (intent.type, None, None),
+            (intent.type, language, DEFAULT_TOPIC), (intent.type, None, DEFAULT_TOPIC)
+        ):
+            for template in self._table.get(key, ()):
+                if template.slots <= values.keys():
+                    return {
+                        'text': template.render(values),
+                        'action': template.action,
+                        'requires_input': template.requires_input,
+                        'end_conversation': template.end_conversation,
+                        **template.extra
+                    }
+        raise KeyError(f"No template for {intent.type}")
+
+    def _slot_values(self, intent: Intent, entities: Dict[str, List[Entity]]) -> Dict[str, str]:
+        values = {'business_name': self.tenant_config.get('business_name', '')}
+        if intent.parameters.get('topic'):
+            values['topic'] = intent.parameters['topic']
+        for entity_type, found in entities.items():
+            if found:
+                values[entity_type] = SLOT_FORMATTERS.get(entity_type, str)(found[0].value)
+        return values
+
+    def _check_for_changes(self):
+        if not self.templates_path:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval_s
+
+        mtime = os.path.getmtime(self.templates_path) if os.path.exists(self.templates_path) else None
+        if mtime != self._templates_mtime:
+            try:
+                self.reload()
+            except Exception as e:
+                # Messages keep the previous table; the broken file is not re-read until it changes again
+                self._templates_mtime = mtime
+                self.reload_errors += 1
+                print(f"⚠ Response templates {self.templates_path} not reloaded, keeping the previous ones: {e}")
+
+
+def _template_language(language_context: Optional[LanguageContext]) -> Optional[str]:
+    if language_context is None:
+        return None
+    if language_context.primary == Language.MSA:
+        # MSA is also the detector's answer for text it does not recognize
+        return 'ar' if language_context.contains_msa else None
+    return _TEMPLATE_LANGUAGES.get(language_context.primary)
+
+
+@lru_cache(maxsize=None)
+def _dataset_responses(dataset_path: str, topic_intents_path: str) -> Dict[Tuple, Tuple[str, str]]:
+    """
+    (intent, language, topic) -> (response text, agent action) from the call-centre dataset.
+    A response shared by several Topics of an intent is also its default in that language,
+    (intent, language, DEFAULT_TOPIC); a response given to one Topic only is too specific.
+    """
+    topic_intents = load_topic_intents(topic_intents_path)
+    responses = {}
+    shared: Dict[Tuple, Counter] = {}
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            intent = IntentType(topic_intents.get(row['Topic'], IntentType.INQUIRY.value))
+            for language, column in RESPONSE_COLUMNS.items():
+                text = (row.get(column) or '').strip()
+                if text:
+                    # Literal braces in curated responses are not slots
+                    response = (text.replace('{', '{{').replace('}', '}}'), row.get('Agent_Action') or '')
+                    responses[(intent, language, row['Topic'])] = response
+                    shared.setdefault((intent, language, DEFAULT_TOPIC), Counter())[response] += 1
+    for key, counts in shared.items():
+        response, count = counts.most_common(1)[0]
+        if count > 1:
+            responses[key] = response
+    return responses
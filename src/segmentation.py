@@ -0,0 +1,92 @@
+"""
+VAD segment post-processing
+Smooths raw speech chunks and packs them into Whisper-sized encoder windows
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Whisper's encoder always sees 30 s of audio; shorter inputs are padded.
+WHISPER_WINDOW_MS = 30000
+
+
+def postprocess_segments(
+    speech_chunks: List[Dict[str, int]],
+    padding_ms: int = 200,
+    min_segment_ms: int = 250,
+    max_window_ms: int = WHISPER_WINDOW_MS,
+    audio_duration_ms: Optional[int] = None
+) -> Tuple[List[Dict[str, int]], Dict]:
+    """
+    Turns raw VAD chunks into fewer, fuller transcription windows.
+
+    1. Each chunk is padded by `padding_ms` on both sides (hangover), so chunks
+       separated by less than twice the padding merge into one segment.
+    2. Merged segments containing less than `min_segment_ms` of detected speech
+       are dropped as noise.
+    3. Adjacent segments are greedily packed into windows spanning at most
+       `max_window_ms`; a single segment longer than that is split.
+
+    Args:
+        speech_chunks: Raw chunks with `start`/`end` in ms, in time order
+        padding_ms: Padding added before and after every chunk
+        min_segment_ms: Minimum speech per segment after merging
+        max_window_ms: Maximum span of a packed window
+        audio_duration_ms: Clamp padded segments to the audio length when given
+
+    Returns:
+        Packed windows (`start`/`end` in ms) and a report comparing them with the raw chunks
+    """
+    end_limit = audio_duration_ms if audio_duration_ms is not None else float('inf')
+
+    # Pad and merge overlapping chunks, tracking the speech they contain
+    merged = []
+    for chunk in speech_chunks:
+        start = max(0, chunk["start"] - padding_ms)
+        end = min(end_limit, chunk["end"] + padding_ms)
+        speech_ms = chunk["end"] - chunk["start"]
+
+        if merged and start <= merged[-1]["end"]:
+            merged[-1]["end"] = max(merged[-1]["end"], end)
+            merged[-1]["speech_ms"] += speech_ms
+        else:
+            merged.append({"start": start, "end": end, "speech_ms": speech_ms})
+
+    segments = [s for s in merged if s["speech_ms"] >= min_segment_ms]
+
+    # Greedy packing into windows of at most max_window_ms
+    windows: List[Dict[str, int]] = []
+    for segment in segments:
+        start, end = segment["start"], segment["end"]
+
+        if windows and end - windows[-1]["start"] <= max_window_ms:
+            windows[-1]["end"] = end
+            continue
+
+        while end - start > max_window_ms:
+            windows.append({"start": start, "end": start + max_window_ms})
+            start += max_window_ms
+        windows.append({"start": start, "end": end})
+
+    report = {
+        "raw_segments": len(speech_chunks),
+        "merged_segments": len(merged),
+        "dropped_segments": len(merged) - len(segments),
+        "windows": len(windows),
+        "windows_saved": len(speech_chunks) - len(windows),
+        "speech_ms": sum(chunk["end"] - chunk["start"] for chunk in speech_chunks),
+        "window_fill": (
+            sum(w["end"] - w["start"] for w in windows) / (len(windows) * max_window_ms)
+            if windows else 0.0
+        )
+    }
+
+    return windows, report
+
+
+def format_report(report: Dict) -> str:
+    """One-line human readable summary of a segmentation report."""
+    return (
+        f"VAD: {report['raw_segments']} raw segments -> {report['windows']} windows "
+        f"({report['windows_saved']} saved, {report['dropped_segments']} dropped, "
+        f"fill {report['window_fill']:.0%})"
+    )
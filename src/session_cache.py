@@ -0,0 +1,307 @@
+"""
+Session cache
+Per-worker LRU+TTL of conversation contexts in front of the session store.
+A cached context is served only while no other worker has written it: either
+its version is checked against Redis (one small GET), or other workers' saves
+evict it through pub/sub and hits need no Redis read at all. Saves are
+written behind: the turns of the next few milliseconds, across
+conversations, are coalesced into one pipelined write, each conditional on
+the version the turn was based on. Callers get copies of the cached contexts.
+"""
+
+import asyncio
+import copy
+import dataclasses
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from src.models import ConversationContext, Intent
+from src.session_store import SessionStore
+
+INVALIDATION_CHANNEL = 'session:invalidate'
+
+
+@dataclass
+class _Entry:
+    context: ConversationContext
+    # Version in Redis when last loaded or flushed by this worker, which pending turns are
+    # based on; None for a context first seen in a save, whose state is written unconditionally
+    version: Optional[int]
+    expires_at: float
+    # Saved locally, not yet written to Redis
+    pending_intents: List[Intent] = field(default_factory=list)
+    pending_history: List[Dict] = field(default_factory=list)
+    dirty: bool = False
+
+
+class SessionCache:
+    """LRU+TTL cache of conversation contexts with write-behind saves"""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        max_entries: int = 10000,
+        ttl_s: float = 300,
+        write_behind_ms: float = 50.0,
+        invalidation: str = 'version'
+    ):
+        """
+        Args:
+            store: Redis session store the cache reads through and writes behind
+            max_entries: Capacity of the in-memory LRU
+            ttl_s: Lifetime of an entry since its last use
+            write_behind_ms: Delay coalescing saves into one write (0 writes each save through)
+            invalidation: 'version' checks the version of each hit; 'pubsub' relies on
+                invalidation messages from other workers and reads nothing on hits while subscribed,
+                which is only safe when the turns of a conversation reach the same worker
+        """
+        if invalidation not in ('version', 'pubsub'):
+            raise ValueError(f"Unknown session invalidation '{invalidation}'")
+        self.store = store
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.write_behind_s = write_behind_ms / 1000
+        self.invalidation = invalidation
+        self.worker_id = uuid.uuid4().hex[:12]
+        if invalidation == 'pubsub':
+            store.invalidation_channel = store.invalidation_channel or INVALIDATION_CHANNEL
+
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._dirty: Dict[str, _Entry] = {}
+        # One flush at a time, so each is based on the versions written by the previous one
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._listening = False
+
+        self.hits = {'unchecked': 0, 'version_checked': 0}
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.conflicts = 0
+        self.turns = 0
+        self.coalesced_saves = 0
+        self.flushes = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Dict, redis_client) -> 'SessionCache':
+        """Builds the cache and its store from the `session_cache` section of config.yml."""
+        store = SessionStore(redis_client, ttl_s=cache_config.get('redis_ttl_s', 3600))
+        return cls(
+            store,
+            max_entries=cache_config.get('max_entries', 10000),
+            ttl_s=cache_config.get('ttl_s', 300),
+            write_behind_ms=cache_config.get('write_behind_ms', 50.0),
+            invalidation=cache_config.get('invalidation', 'version')
+        )
+
+    async def start(self):
+        """Subscribes to invalidation messages in pubsub mode."""
+        if self.invalidation == 'pubsub' and self._listener_task is None:
+            self._listener_task = asyncio.ensure_future(self._listen())
+
+    async def close(self):
+        """Stops listening and writes pending saves."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            self._listener_task = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def load(self, conversation_id: str) -> Optional[ConversationContext]:
+        # A pending save evicted from the LRU before its flush is newer than Redis
+        entry = self._entries.get(conversation_id) or self._dirty.get(conversation_id)
+        if entry is not None:
+            if entry.expires_at < time.monotonic() and not entry.dirty:
+                del self._entries[conversation_id]
+                self.expired += 1
+            elif self._listening:
+                # With pub/sub, writes by others evict the entry
+                self.hits['unchecked'] += 1
+                return self._hit(conversation_id, entry)
+            elif await self._unchanged(conversation_id, entry):
+                self.hits['version_checked'] += 1
+                return self._hit(conversation_id, entry)
+            else:
+                self._entries.pop(conversation_id, None)
+                self.stale += 1
+
+        context, version = await self.store.load_with_version(conversation_id)
+        self.misses += 1
+        if context is not None:
+            self._remember(conversation_id, _Entry(context=context, version=version, expires_at=0.0))
+        return _copy(context) if context is not None else None
+
+    async def save(self, context: ConversationContext, new_intents: Iterable[Intent] = (), new_history: Iterable[Dict] = ()):
+        """Saves a context now, or within `write_behind_ms` along with the other saves of that window."""
+        self.turns += 1
+        conversation_id = context.conversation_id
+        entry = self._dirty.get(conversation_id) or self._entries.get(conversation_id)
+        if entry is None:
+            entry = _Entry(context=context, version=None, expires_at=0.0)
+        # The caller keeps its context; later changes to it are not cached
+        entry.context = _copy(context)
+        self._remember(conversation_id, entry)
+
+        if self.write_behind_s <= 0:
+            async with self._flush_lock:
+                turns = [(entry.context, list(new_intents), list(new_history))]
+                [(version, unchanged)] = await self.store.save_many_if_unchanged(turns, [entry.version], writer=self.worker_id)
+                self._written(conversation_id, entry, version, unchanged)
+            return
+
+        if entry.dirty:
+            self.coalesced_saves += 1
+        entry.pending_intents.extend(new_intents)
+        entry.pending_history.extend(new_history)
+        entry.dirty = True
+        self._dirty[conversation_id] = entry
+        self._schedule_flush()
+
+    async def flush(self):
+        """
+        Writes every pending save in one round trip. A conversation another worker wrote
+        since its pending turns were based on it keeps that worker's state: the turns are
+        appended and the entry is evicted, so the next load reads both from Redis.
+        """
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, {}
+            turns, expected_versions = [], []
+            for entry in dirty.values():
+                turns.append((entry.context, entry.pending_intents, entry.pending_history))
+                expected_versions.append(entry.version)
+                entry.pending_intents, entry.pending_history, entry.dirty = [], [], False
+
+            try:
+                written = await self.store.save_many_if_unchanged(turns, expected_versions, writer=self.worker_id)
+            except Exception:
+                # Kept for the next flush, ahead of anything saved meanwhile
+                for (conversation_id, entry), (_, intents, history) in zip(dirty.items(), turns):
+                    entry.pending_intents[:0] = intents
+                    entry.pending_history[:0] = history
+                    entry.dirty = True
+                    self._dirty.setdefault(conversation_id, entry)
+                raise
+
+            for (conversation_id, entry), (version, unchanged) in zip(dirty.items(), written):
+                self._written(conversation_id, entry, version, unchanged)
+            self.flushes += 1
+
+    async def delete(self, conversation_id: str):
+        self._entries.pop(conversation_id, None)
+        self._dirty.pop(conversation_id, None)
+        await self.store.delete(conversation_id)
+
+    def stats(self) -> Dict:
+        hits = sum(self.hits.values())
+        lookups = hits + self.misses + self.stale
+        return {
+            'entries': len(self._entries),
+            'pending_writes': len(self._dirty),
+            'invalidation': self.invalidation,
+            'subscribed': self._listening,
+            'hits': dict(self.hits),
+            'misses': self.misses,
+            'stale': self.stale,
+            'expired': self.expired,
+            'invalidated': self.invalidated,
+            'conflicts': self.conflicts,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'turns': self.turns,
+            'coalesced_saves': self.coalesced_saves,
+            'flushes': self.flushes,
+            'redis_round_trips_per_turn': self.store.round_trips / self.turns if self.turns else 0.0,
+            'store': self.store.stats()
+        }
+
+    async def _unchanged(self, conversation_id: str, entry: _Entry) -> bool:
+        """Whether no other worker wrote the conversation since this entry was based on Redis."""
+        if await self.store.version(conversation_id) == entry.version:
+            return True
+        if not entry.dirty and not self._flush_lock.locked():
+            return False
+        # The difference may be this worker's flush in flight; conflicting turns are evicted by it
+        await self.flush()
+        return self._entries.get(conversation_id) is entry and await self.store.version(conversation_id) == entry.version
+
+    def _written(self, conversation_id: str, entry: _Entry, version: int, unchanged: bool):
+        if unchanged:
+            entry.version = version
+            return
+        self.conflicts += 1
+        if not entry.dirty and self._entries.get(conversation_id) is entry:
+            del self._entries[conversation_id]
+
+    def _hit(self, conversation_id: str, entry: _Entry) -> ConversationContext:
+        if conversation_id in self._entries:
+            self._touch(conversation_id, entry)
+        else:
+            self._remember(conversation_id, entry)
+        return _copy(entry.context)
+
+    def _touch(self, conversation_id: str, entry: _Entry):
+        entry.expires_at = time.monotonic() + self.ttl_s
+        self._entries.move_to_end(conversation_id)
+
+    def _remember(self, conversation_id: str, entry: _Entry):
+        self._entries[conversation_id] = entry
+        self._touch(conversation_id, entry)
+        # Dirty entries evicted here are still flushed, and loaded, from self._dirty
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_flush(self):
+        if self._dirty and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.write_behind_s)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"⚠ Session write-behind failed, retrying: {e}")
+        self._flush_task = None
+        # Saves made during the flush, or retried after a failure
+        self._schedule_flush()
+
+    async def _listen(self):
+        pubsub = self.store.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(self.store.invalidation_channel)
+            self._listening = True
+            async for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                writer, _, conversation_id = message['data'].decode('utf-8').partition(' ')
+                entry = self._entries.get(conversation_id)
+                if writer != self.worker_id and entry is not None and not entry.dirty:
+                    del self._entries[conversation_id]
+                    self.invalidated += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠ Session invalidation listener stopped, checking versions instead: {e}")
+        finally:
+            # Hits are version-checked again from here on
+            self._listening = False
+            await pubsub.close()
+
+
+def _copy(context: ConversationContext) -> ConversationContext:
+    """A context whose histories, entities and dicts can be changed without changing the cache."""
+    return dataclasses.replace(
+        context,
+        intent_history=list(context.intent_history),
+        entities={entity_type: list(found) for entity_type, found in context.entities.items()},
+        pending_reservation=copy.deepcopy(context.pending_reservation),
+        conversation_history=list(context.conversation_history),
+        metadata=copy.deepcopy(context.metadata)
+    )
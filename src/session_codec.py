@@ -0,0 +1,180 @@
+"""
+Session codec
+Compact, versioned msgpack encoding of ConversationContext and its nested
+dataclasses. Dataclasses are positional arrays (no field names on the wire)
+and datetimes are integer microseconds, so decoding rebuilds the exact
+objects that were encoded. The context is split into its small mutable state
+and the per-turn intents and history messages, which are encoded one by one
+so a turn can be appended without rewriting the conversation.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import msgpack
+
+from src.models import ConversationContext, Entity, Intent, IntentType, Language, LanguageContext
+
+# Bumped whenever the layout of an encoded object changes
+CODEC_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _default(value: Any):
+    # numpy scalars and arrays in intent parameters
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a session")
+
+
+def _pack(value) -> bytes:
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def _unpack(data: bytes):
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _encode_datetime(value: datetime):
+    # Naive datetimes (datetime.now()) as exact microseconds; aware ones keep their offset
+    return (value - _EPOCH) // _MICROSECOND if value.tzinfo is None else value.isoformat()
+
+
+def _decode_datetime(value) -> datetime:
+    return _EPOCH + timedelta(microseconds=value) if isinstance(value, int) else datetime.fromisoformat(value)
+
+
+def _language_context_fields(language_context: LanguageContext) -> List:
+    return [
+        language_context.primary.value, language_context.contains_darija, language_context.contains_french,
+        language_context.contains_msa, language_context.darija_words, language_context.french_words,
+        language_context.confidence
+    ]
+
+
+def _language_context(fields: List) -> LanguageContext:
+    primary, contains_darija, contains_french, contains_msa, darija_words, french_words, confidence = fields
+    return LanguageContext(
+        primary=Language(primary), contains_darija=contains_darija, contains_french=contains_french,
+        contains_msa=contains_msa, darija_words=darija_words, french_words=french_words, confidence=confidence
+    )
+
+
+def _intent_fields(intent: Intent) -> List:
+    return [intent.type.value, intent.confidence, intent.parameters]
+
+
+def _intent(fields: List) -> Intent:
+    intent_type, confidence, parameters = fields
+    return Intent(type=IntentType(intent_type), confidence=confidence, parameters=parameters)
+
+
+def _entities_fields(entities: Dict[str, List[Entity]]) -> Dict:
+    return {
+        entity_type: [[entity.type, entity.value, entity.raw_text, entity.confidence] for entity in found]
+        for entity_type, found in entities.items()
+    }
+
+
+def _entities(fields: Dict) -> Dict[str, List[Entity]]:
+    return {
+        entity_type: [Entity(type=t, value=value, raw_text=raw_text, confidence=confidence) for t, value, raw_text, confidence in found]
+        for entity_type, found in fields.items()
+    }
+
+
+def _check_version(version: int):
+    if version != CODEC_VERSION:
+        raise ValueError(f"Unsupported session codec version {version} (expected {CODEC_VERSION})")
+
+
+def encode_state(context: ConversationContext) -> bytes:
+    """Everything but the intent and conversation histories."""
+    return _pack([
+        CODEC_VERSION,
+        context.conversation_id,
+        context.tenant_id,
+        context.customer_id,
+        _language_context_fields(context.language_context),
+        _entities_fields(context.entities),
+        context.pending_reservation,
+        context.metadata,
+        _encode_datetime(context.created_at),
+        _encode_datetime(context.updated_at),
+    ])
+
+
+def encode_intent(intent: Intent) -> bytes:
+    return _pack([CODEC_VERSION, *_intent_fields(intent)])
+
+
+def encode_message(message: Dict) -> bytes:
+    return _pack([CODEC_VERSION, message])
+
+
+def decode_intent(data: bytes) -> Intent:
+    version, *fields = _unpack(data)
+    _check_version(version)
+    return _intent(fields)
+
+
+def decode_message(data: bytes) -> Dict:
+    version, message = _unpack(data)
+    _check_version(version)
+    return message
+
+
+def decode_context(state: bytes, intents: List[bytes] = (), history: List[bytes] = ()) -> ConversationContext:
+    """Rebuilds a context from its encoded state and its encoded intents and messages, in order."""
+    (
+        version, conversation_id, tenant_id, customer_id, language_context,
+        entities, pending_reservation, metadata, created_at, updated_at
+    ) = _unpack(state)
+    _check_version(version)
+    return ConversationContext(
+        conversation_id=conversation_id,
+        tenant_id=tenant_id,
+        customer_id=customer_id,
+        language_context=_language_context(language_context),
+        intent_history=[decode_intent(intent) for intent in intents],
+        entities=_entities(entities),
+        pending_reservation=pending_reservation,
+        conversation_history=[decode_message(message) for message in history],
+        metadata=metadata,
+        created_at=_decode_datetime(created_at),
+        updated_at=_decode_datetime(updated_at)
+    )
+
+
+def is_legacy_json(data: bytes) -> bool:
+    """Sessions saved before this codec were `json.dumps(asdict(context))`."""
+    return data[:1] == b'{'
+
+
+def decode_legacy_json(data: bytes) -> ConversationContext:
+    """Rebuilds a context, nested dataclasses included, from a legacy JSON session."""
+    fields = json.loads(data)
+    language_context = fields['language_context']
+    # Enums were saved with default=str, as "Language.DARIJA"
+    language_context['primary'] = Language[language_context['primary'].split('.')[-1]]
+    return ConversationContext(
+        conversation_id=fields['conversation_id'],
+        tenant_id=fields['tenant_id'],
+        customer_id=fields['customer_id'],
+        language_context=LanguageContext(**language_context),
+        intent_history=[
+            Intent(type=IntentType[intent['type'].split('.')[-1]], confidence=intent['confidence'], parameters=intent['parameters'])
+            for intent in fields['intent_history']
+        ],
+        entities={entity_type: [Entity(**entity) for entity in found] for entity_type, found in fields['entities'].items()},
+        pending_reservation=fields['pending_reservation'],
+        conversation_history=fields['conversation_history'],
+        metadata=fields['metadata'],
+        created_at=datetime.fromisoformat(fields['created_at']),
+        updated_at=datetime.fromisoformat(fields['updated_at'])
+    )
@@ -0,0 +1,201 @@
+"""
+Session store
+Conversation contexts in Redis with the session codec: the small mutable
+state under `session:{id}`, and the intents and history messages of each turn
+appended to the lists `session:{id}:intents` and `session:{id}:history`.
+A turn writes the state and its own entries, not the whole conversation, and
+loading or saving a session is one pipelined round trip. Every save bumps
+`session:{id}:version`, which lets worker caches detect writes by others, and
+a save can be made conditional on that version (compare-and-set).
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.models import ConversationContext, Intent
+from src.session_codec import (
+    decode_context,
+    decode_legacy_json,
+    encode_intent,
+    encode_message,
+    encode_state,
+    is_legacy_json,
+)
+
+# Compare-and-set save of one turn. The state is written only if the version is still the
+# expected one ('' writes it anyway); the turn's intents and messages are appended either
+# way, so an acknowledged turn is never lost. KEYS: state, intents, history, version.
+# ARGV: expected version, ttl, state, number of intents, intents..., messages...,
+# channel ('' for none), message.
+_SAVE_IF_UNCHANGED = """
+local ttl = tonumber(ARGV[2])
+local unchanged = ARGV[1] == '' or tonumber(redis.call('GET', KEYS[4]) or '0') == tonumber(ARGV[1])
+if unchanged then
+    redis.call('SET', KEYS[1], ARGV[3], 'EX', ttl)
+end
+local intents = tonumber(ARGV[4])
+for i = 5, 4 + intents do
+    redis.call('RPUSH', KEYS[2], ARGV[i])
+end
+for i = 5 + intents, #ARGV - 2 do
+    redis.call('RPUSH', KEYS[3], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('EXPIRE', KEYS[3], ttl)
+local version = redis.call('INCR', KEYS[4])
+redis.call('EXPIRE', KEYS[4], ttl)
+if ARGV[#ARGV - 1] ~= '' then
+    redis.call('PUBLISH', ARGV[#ARGV - 1], ARGV[#ARGV])
+end
+return {version, unchanged and 1 or 0}
+"""
+
+
+class SessionStore:
+    """Loads and saves conversation contexts in Redis"""
+
+    def __init__(
+        self,
+        redis_client,
+        ttl_s: int = 3600,
+        key_prefix: str = 'session',
+        invalidation_channel: Optional[str] = None
+    ):
+        """
+        Args:
+            redis_client: Asynchronous Redis client (redis.asyncio) returning bytes
+            ttl_s: Expiry of a session, refreshed by every turn
+            key_prefix: Prefix of the session keys
+            invalidation_channel: Pub/sub channel announcing each save as `{writer} {conversation_id}`
+        """
+        self.redis_client = redis_client
+        self.ttl_s = ttl_s
+        self.key_prefix = key_prefix
+        self.invalidation_channel = invalidation_channel
+        self.bytes_written = 0
+        self.saves = 0
+        self.round_trips = 0
+
+    def _keys(self, conversation_id: str):
+        state_key = f"{self.key_prefix}:{conversation_id}"
+        return state_key, f"{state_key}:intents", f"{state_key}:history", f"{state_key}:version"
+
+    async def load(self, conversation_id: str) -> Optional[ConversationContext]:
+        context, _ = await self.load_with_version(conversation_id)
+        return context
+
+    async def load_with_version(self, conversation_id: str) -> Tuple[Optional[ConversationContext], int]:
+        """The context of a conversation (None if unknown) and its version."""
+        state_key, intents_key, history_key, version_key = self._keys(conversation_id)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(state_key)
+            pipe.lrange(intents_key, 0, -1)
+            pipe.lrange(history_key, 0, -1)
+            pipe.get(version_key)
+            state, intents, history, version = await pipe.execute()
+        self.round_trips += 1
+
+        if not state:
+            return None, 0
+        if is_legacy_json(state):
+            # Rewritten in the current layout so later turns can be appended
+            context = decode_legacy_json(state)
+            version = await self.save(context, context.intent_history, context.conversation_history)
+            return context, version
+        return decode_context(state, intents, history), int(version or 0)
+
+    async def version(self, conversation_id: str) -> int:
+        """Current version of a conversation, 0 if it was never saved."""
+        value = await self.redis_client.get(self._keys(conversation_id)[3])
+        self.round_trips += 1
+        return int(value or 0)
+
+    async def save(self, context: ConversationContext, new_intents: Iterable[Intent] = (), new_history: Iterable[Dict] = (), writer: str = '') -> int:
+        """
+        Saves the state of a context and appends this turn's entries.
+
+        Args:
+            context: Context whose state is saved
+            new_intents: Intents appended to `context.intent_history` since it was loaded
+            new_history: Messages appended to `context.conversation_history` since it was loaded
+            writer: Identifies the saving worker in invalidation messages
+
+        Returns:
+            The new version of the conversation
+        """
+        versions = await self.save_many([(context, list(new_intents), list(new_history))], writer)
+        return versions[0]
+
+    async def save_many(self, turns: Sequence[Tuple[ConversationContext, List[Intent], List[Dict]]], writer: str = '') -> List[int]:
+        """Saves several contexts with their new entries in one round trip; returns their new versions."""
+        version_replies = []
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            commands = 0
+            for context, new_intents, new_history in turns:
+                state_key, intents_key, history_key, version_key = self._keys(context.conversation_id)
+                state = encode_state(context)
+                intents = [encode_intent(intent) for intent in new_intents]
+                history = [encode_message(message) for message in new_history]
+
+                pipe.set(state_key, state, ex=self.ttl_s)
+                if intents:
+                    pipe.rpush(intents_key, *intents)
+                if history:
+                    pipe.rpush(history_key, *history)
+                pipe.expire(intents_key, self.ttl_s)
+                pipe.expire(history_key, self.ttl_s)
+                pipe.incr(version_key)
+                pipe.expire(version_key, self.ttl_s)
+                commands += 5 + bool(intents) + bool(history)
+                # Reply of the INCR, second to last command of this turn
+                version_replies.append(commands - 2)
+                if self.invalidation_channel:
+                    pipe.publish(self.invalidation_channel, f"{writer} {context.conversation_id}")
+                    commands += 1
+                self.bytes_written += len(state) + sum(map(len, intents)) + sum(map(len, history))
+            results = await pipe.execute()
+        self.round_trips += 1
+        self.saves += len(turns)
+
+        return [int(results[i]) for i in version_replies]
+
+    async def save_many_if_unchanged(
+        self,
+        turns: Sequence[Tuple[ConversationContext, List[Intent], List[Dict]]],
+        expected_versions: Sequence[Optional[int]],
+        writer: str = ''
+    ) -> List[Tuple[int, bool]]:
+        """
+        Saves several turns in one round trip, each state only if its conversation is still at
+        the expected version (None: unconditionally). The intents and messages of a turn are
+        appended in any case.
+
+        Returns:
+            (new version, whether the state was written) per turn
+        """
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for (context, new_intents, new_history), expected_version in zip(turns, expected_versions):
+                state = encode_state(context)
+                intents = [encode_intent(intent) for intent in new_intents]
+                history = [encode_message(message) for message in new_history]
+                pipe.eval(
+                    _SAVE_IF_UNCHANGED, 4, *self._keys(context.conversation_id),
+                    '' if expected_version is None else expected_version, self.ttl_s, state, len(intents), *intents, *history,
+                    self.invalidation_channel or '', f"{writer} {context.conversation_id}"
+                )
+                self.bytes_written += len(state) + sum(map(len, intents)) + sum(map(len, history))
+            results = await pipe.execute()
+        self.round_trips += 1
+        self.saves += len(turns)
+
+        return [(int(version), bool(unchanged)) for version, unchanged in results]
+
+    async def delete(self, conversation_id: str):
+        await self.redis_client.delete(*self._keys(conversation_id))
+        self.round_trips += 1
+
+    def stats(self) -> Dict:
+        return {
+            'saves': self.saves,
+            'bytes_per_save': self.bytes_written / self.saves if self.saves else 0.0,
+            'redis_round_trips': self.round_trips,
+        }
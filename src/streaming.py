@@ -0,0 +1,230 @@
+"""
+Live-call streaming ASR
+Incremental VAD over arriving PCM frames and per-segment transcription
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import webrtcvad
+
+from src.audio_io import SAMPLE_RATE, pcm_to_float
+
+BYTES_PER_SAMPLE = 2  # 16-bit PCM
+
+
+class StreamingVAD:
+    """
+    Incremental voice activity detector.
+
+    Accepts 16 kHz mono 16-bit PCM in blocks of any size, runs webrtcvad frame by
+    frame as data arrives and returns each speech segment as soon as it closes.
+    A segment stays open through up to `hangover_ms` of non-speech, and segments
+    with less than `min_segment_ms` of speech are dropped. With both at 0 the
+    boundaries are the same as `inference.vad_split`. A `max_segment_ms` caps the
+    open segment buffer: longer speech is closed and continued in a new segment.
+    """
+
+    def __init__(
+        self,
+        aggressiveness: int = 3,
+        frame_duration_ms: int = 30,
+        sample_rate: int = SAMPLE_RATE,
+        hangover_ms: int = 0,
+        min_segment_ms: int = 0,
+        max_segment_ms: int = 0
+    ):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_duration_ms = frame_duration_ms
+        self.frame_bytes = int(sample_rate * frame_duration_ms / 1000) * BYTES_PER_SAMPLE
+        self.hangover_frames = hangover_ms // frame_duration_ms
+        self.min_segment_ms = min_segment_ms
+        self.max_segment_bytes = max_segment_ms // frame_duration_ms * self.frame_bytes
+
+        self._pending = bytearray()   # bytes not yet forming a full frame
+        self._speech = bytearray()    # frames of the currently open segment
+        self._frame_index = 0
+        self._start_frame = 0
+        self._speech_frames = 0       # voiced frames in the open segment
+        self._silence_frames = 0      # trailing non-speech frames in the open segment
+        self.is_speech = False
+
+    @property
+    def open_segment_ms(self) -> int:
+        """Duration of the speech segment currently being accumulated."""
+        return len(self._speech) // self.frame_bytes * self.frame_duration_ms
+
+    def open_segment_audio(self) -> np.ndarray:
+        """Float audio of the speech segment currently being accumulated."""
+        return _pcm_to_float(self._speech)
+
+    def feed(self, pcm: bytes) -> List[Dict]:
+        """
+        Consumes a block of PCM bytes.
+
+        Returns:
+            Segments closed by this block, each with `start`/`end` in ms and float `audio`
+        """
+        self._pending.extend(pcm)
+        closed = []
+
+        offset = 0
+        while len(self._pending) - offset >= self.frame_bytes:
+            frame = bytes(self._pending[offset:offset + self.frame_bytes])
+            offset += self.frame_bytes
+
+            segment = self._process_frame(frame)
+            if segment:
+                closed.append(segment)
+
+        del self._pending[:offset]
+        return closed
+
+    def flush(self) -> List[Dict]:
+        """Closes the open segment at end of stream. Trailing partial frames are dropped."""
+        self._pending.clear()
+        if not self.is_speech:
+            return []
+        segment = self._close_segment()
+        return [segment] if segment else []
+
+    def _process_frame(self, frame: bytes) -> Optional[Dict]:
+        frame_is_speech = self.vad.is_speech(frame, self.sample_rate)
+        segment = None
+
+        if frame_is_speech:
+            if not self.is_speech:
+                self._start_frame = self._frame_index
+                self.is_speech = True
+            self._speech.extend(frame)
+            self._speech_frames += 1
+            self._silence_frames = 0
+        elif self.is_speech:
+            if self._silence_frames < self.hangover_frames:
+                self._speech.extend(frame)
+                self._silence_frames += 1
+            else:
+                segment = self._close_segment()
+
+        if self.is_speech and self.max_segment_bytes and len(self._speech) >= self.max_segment_bytes:
+            segment = self._close_segment(end_frame=self._frame_index + 1)
+
+        self._frame_index += 1
+        return segment
+
+    def _close_segment(self, end_frame: Optional[int] = None) -> Optional[Dict]:
+        segment = None
+        if self._speech_frames * self.frame_duration_ms >= self.min_segment_ms:
+            segment = {
+                "start": self._start_frame * self.frame_duration_ms,
+                "end": (self._frame_index if end_frame is None else end_frame) * self.frame_duration_ms,
+                "audio": _pcm_to_float(self._speech)
+            }
+        self._speech = bytearray()
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self.is_speech = False
+        return segment
+
+
+def _pcm_to_float(pcm: bytes) -> np.ndarray:
+    return pcm_to_float(np.frombuffer(bytes(pcm), dtype=np.int16))
+
+
+class VoiceStreamSession:
+    """
+    One live call streamed over a socket.
+
+    Emits events as dictionaries:
+        partial  - interim transcript of the segment still being spoken
+        final    - transcript of a closed speech segment
+        response - agent response to a final transcript
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        customer_id: str,
+        conversation_id: Optional[str] = None,
+        partial_interval_ms: Optional[int] = None
+    ):
+        """
+        Args:
+            pipeline: VoiceAgentPipeline providing the ASR model and the agent
+            customer_id: Customer identifier
+            conversation_id: Optional existing conversation ID
+            partial_interval_ms: Speech duration between interim transcripts (0 disables them)
+        """
+        streaming_config = pipeline.config.get('streaming', {})
+        vad_config = pipeline.config.get('vad', {})
+
+        self.pipeline = pipeline
+        self.customer_id = customer_id
+        self.conversation_id = conversation_id
+        self.partial_interval_ms = (
+            partial_interval_ms if partial_interval_ms is not None
+            else streaming_config.get('partial_interval_ms', 1000)
+        )
+        self.vad = StreamingVAD(
+            aggressiveness=vad_config.get('aggressiveness', 3),
+            frame_duration_ms=vad_config.get('frame_duration_ms', 30),
+            hangover_ms=vad_config.get('padding_ms', 200),
+            min_segment_ms=vad_config.get('min_segment_ms', 250),
+            # Long speech is closed and continued at one Whisper window, bounding partials too
+            max_segment_ms=int(vad_config.get('max_window_s', 30) * 1000)
+        )
+        self._last_partial_ms = 0
+        self._transcripts: List[str] = []
+
+        # Whisper language follows the language the agent detects in the conversation
+        self.decoding_policy = pipeline.decoding_policy
+
+    async def feed(self, pcm: bytes) -> List[Dict]:
+        """Processes a block of PCM bytes and returns the resulting events."""
+        events = []
+        for segment in self.vad.feed(pcm):
+            events.extend(await self._finalize_segment(segment))
+            # Partials of a segment continued past max_segment_ms restart with it
+            self._last_partial_ms = 0
+
+        if not self.vad.is_speech:
+            self._last_partial_ms = 0
+        elif self.partial_interval_ms and self.vad.open_segment_ms - self._last_partial_ms >= self.partial_interval_ms:
+            self._last_partial_ms = self.vad.open_segment_ms
+            text = await self._transcribe(self.vad.open_segment_audio())
+            if text:
+                events.append({'type': 'partial', 'text': text})
+
+        return events
+
+    async def finish(self) -> List[Dict]:
+        """Flushes the stream and returns the remaining events plus the full transcript."""
+        events = []
+        for segment in self.vad.flush():
+            events.extend(await self._finalize_segment(segment))
+
+        events.append({
+            'type': 'end',
+            'conversation_id': self.conversation_id,
+            'transcription': ' '.join(self._transcripts)
+        })
+        return events
+
+    async def _finalize_segment(self, segment: Dict) -> List[Dict]:
+        text = await self._transcribe(segment['audio'])
+        if not text:
+            return []
+
+        self._transcripts.append(text)
+        events = [{'type': 'final', 'text': text, 'start': segment['start'], 'end': segment['end']}]
+
+        agent_response = await self.pipeline._process_with_agent(text, self.customer_id, self.conversation_id)
+        self.conversation_id = agent_response['conversation_id']
+        self.decoding_policy = self.decoding_policy.for_language(agent_response.get('language'))
+        events.append({'type': 'response', **agent_response})
+        return events
+
+    async def _transcribe(self, audio: np.ndarray) -> str:
+        texts = await self.pipeline.transcribe_segments_async([audio], self.decoding_policy)
+        return texts[0]
@@ -0,0 +1,55 @@
+"""
+Distilled student intent classifier
+A character n-gram linear model trained offline on the labels of the
+zero-shot teacher (data_processing/distill_intent_model.py). Same `classify()`
+interface as MLIntentClassifier at a fraction of the cost, on CPU.
+"""
+
+from typing import List
+
+from src.model_registry import get_model_registry
+from src.models import Intent, IntentType
+
+DEFAULT_STUDENT_MODEL_PATH = "models/intent_student.joblib"
+
+
+class StudentIntentClassifier:
+    """Intent classifier loaded from a distilled student artifact."""
+
+    def __init__(self, model_path: str = DEFAULT_STUDENT_MODEL_PATH):
+        """
+        Args:
+            model_path: Artifact written by data_processing/distill_intent_model.py
+        """
+        # Imported here so that importing this module stays cheap
+        import joblib
+
+        artifact = joblib.load(model_path)
+        self.model_path = model_path
+        self.pipeline = artifact['pipeline']
+        self.teacher_model = artifact.get('teacher_model')
+        self.heldout_agreement = artifact.get('heldout_agreement')
+        self.intent_types = [IntentType(label) for label in self.pipeline.classes_]
+
+    def classify(self, text: str) -> Intent:
+        """
+        Classifies the intent of the given text.
+        """
+        return self.classify_batch([text])[0]
+
+    def classify_batch(self, texts: List[str]) -> List[Intent]:
+        """Classifies several texts with one vectorization and one matrix product."""
+        if not texts:
+            return []
+
+        probabilities = self.pipeline.predict_proba(texts)
+        best = probabilities.argmax(axis=1)
+        return [
+            Intent(type=self.intent_types[k], confidence=float(row[k]))
+            for row, k in zip(probabilities, best)
+        ]
+
+
+def get_student_classifier(model_path: str = DEFAULT_STUDENT_MODEL_PATH) -> StudentIntentClassifier:
+    """Shared student classifier from the process-wide model registry."""
+    return get_model_registry().get(('nlu-student', model_path), lambda: StudentIntentClassifier(model_path), kind='nlu')
@@ -0,0 +1,174 @@
+"""
+Content-addressed transcription cache
+Transcriptions keyed by a hash of the decoded PCM plus a namespace derived from
+the model and decoding configuration, in a bounded in-memory LRU with an
+optional on-disk or Redis tier. Tier I/O never runs on the event loop: disk
+reads and writes go to a thread and Redis is asynchronous.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+# Bump when the meaning of a cached transcription changes (e.g. normalization)
+CACHE_VERSION = 2
+
+
+class TranscriptionCache:
+    """Bounded LRU of transcriptions with an optional persistent tier"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        disk_dir: Optional[str] = None,
+        redis_client=None,
+        ttl_s: Optional[int] = None,
+        disk_max_entries: int = 100000
+    ):
+        """
+        Args:
+            max_entries: Capacity of the in-memory LRU
+            disk_dir: Directory for the on-disk tier
+            redis_client: Asynchronous Redis client (redis.asyncio) for a tier shared between workers
+            ttl_s: Expiry of Redis entries
+            disk_max_entries: Files kept in the on-disk tier; the oldest are deleted beyond it
+        """
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.redis_client = redis_client
+        self.ttl_s = ttl_s
+        self.disk_max_entries = disk_max_entries
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+
+        self.hits = {'memory': 0, 'disk': 0, 'redis': 0}
+        self.misses = 0
+        self.disk_evictions = 0
+
+        # Disk tier files, oldest first; touched from executor threads
+        self._disk_files: 'OrderedDict[str, None]' = OrderedDict()
+        self._disk_lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            for path in sorted(self.disk_dir.glob('*.txt'), key=lambda path: path.stat().st_mtime):
+                self._disk_files[path.stem] = None
+            self._evict_disk()
+
+    @classmethod
+    def from_config(cls, cache_config: Dict) -> 'TranscriptionCache':
+        """Builds the cache from the `transcription_cache` section of config.yml."""
+        redis_client = None
+        if cache_config.get('redis_url'):
+            import redis.asyncio
+            redis_client = redis.asyncio.Redis.from_url(cache_config['redis_url'])
+
+        return cls(
+            max_entries=cache_config.get('max_entries', 1024),
+            disk_dir=cache_config.get('disk_dir'),
+            redis_client=redis_client,
+            ttl_s=cache_config.get('ttl_s'),
+            disk_max_entries=cache_config.get('disk_max_entries', 100000)
+        )
+
+    @staticmethod
+    def namespace(*settings) -> str:
+        """
+        Fingerprint of everything that affects a transcription (model, backend,
+        decoding policy, VAD settings...). A change yields new keys, so stale
+        entries are never read again.
+        """
+        payload = [asdict(s) if is_dataclass(s) else s for s in settings]
+        encoded = json.dumps([CACHE_VERSION, payload], sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    @staticmethod
+    def key(samples: np.ndarray, namespace: str) -> str:
+        """Content key of decoded PCM samples within a namespace."""
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(namespace.encode('ascii'))
+        digest.update(memoryview(np.ascontiguousarray(samples)).cast('B'))
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits['memory'] += 1
+            return self._entries[key]
+
+        text = await self._get_persistent(key)
+        if text is not None:
+            self._remember(key, text)
+            return text
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, text: str):
+        self._remember(key, text)
+
+        if self.disk_dir:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, text)
+        if self.redis_client is not None:
+            await self.redis_client.set(f"asr:transcript:{key}", text.encode('utf-8'), ex=self.ttl_s)
+
+    def stats(self) -> Dict:
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': dict(self.hits),
+            'misses': self.misses,
+            'hit_rate': sum(self.hits.values()) / lookups if lookups else 0.0,
+            'disk_entries': len(self._disk_files),
+            'disk_evictions': self.disk_evictions
+        }
+
+    async def _get_persistent(self, key: str) -> Optional[str]:
+        if self.disk_dir:
+            # Also finds files written by other workers sharing the directory
+            text = await asyncio.get_running_loop().run_in_executor(None, self._read_disk, key)
+            if text is not None:
+                self.hits['disk'] += 1
+                return text
+
+        if self.redis_client is not None:
+            value = await self.redis_client.get(f"asr:transcript:{key}")
+            if value is not None:
+                self.hits['redis'] += 1
+                return value.decode('utf-8') if isinstance(value, bytes) else value
+
+        return None
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        try:
+            return (self.disk_dir / f"{key}.txt").read_text(encoding='utf-8')
+        except FileNotFoundError:
+            # Evicted meanwhile
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        (self.disk_dir / f"{key}.txt").write_text(text, encoding='utf-8')
+        with self._disk_lock:
+            self._disk_files[key] = None
+            self._disk_files.move_to_end(key)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while True:
+            with self._disk_lock:
+                if len(self._disk_files) <= self.disk_max_entries:
+                    return
+                key, _ = self._disk_files.popitem(last=False)
+                self.disk_evictions += 1
+            (self.disk_dir / f"{key}.txt").unlink(missing_ok=True)
+
+    def _remember(self, key: str, text: str):
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
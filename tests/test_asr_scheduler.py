@@ -0,0 +1,61 @@
+import asyncio
+import numpy as np
+import pytest
+from src.asr_scheduler import ASRBatchScheduler
+from src.decoding import DecodingPolicy
+
+def test_concurrent_requests_share_batches():
+    batches = []
+
+    async def transcribe_batch(segments, policy, assistant_model_name):
+        batches.append((len(segments), policy.language))
+        return [f"{policy.language}:{len(segment)}" for segment in segments]
+
+    async def run():
+        scheduler = ASRBatchScheduler(transcribe_batch, max_batch_size=4, max_wait_ms=20)
+        arabic, french = DecodingPolicy(language='ar'), DecodingPolicy(language='fr')
+
+        results = await asyncio.gather(
+            scheduler.transcribe([np.zeros(1), np.zeros(2)], arabic),
+            scheduler.transcribe([np.zeros(3)], arabic),
+            scheduler.transcribe([np.zeros(4)], french),
+        )
+        return results, scheduler.metrics()
+
+    results, metrics = asyncio.run(run())
+
+    # Each caller gets its own texts back, in order
+    assert results == [['ar:1', 'ar:2'], ['ar:3'], ['fr:4']]
+    # One batch per decoding setting, never mixed
+    assert sorted(batches) == [(1, 'fr'), (3, 'ar')]
+    assert metrics['segments'] == 4
+    assert metrics['batch_size_histogram'] == {1: 1, 3: 1}
+
+def test_batch_failure_reaches_every_caller():
+    async def transcribe_batch(segments, policy, assistant_model_name):
+        raise RuntimeError("model unavailable")
+
+    async def run():
+        scheduler = ASRBatchScheduler(transcribe_batch, max_wait_ms=1)
+        await scheduler.transcribe([np.zeros(1)], DecodingPolicy())
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+def test_batches_run_concurrently_up_to_the_limit():
+    running, peak = 0, 0
+
+    async def transcribe_batch(segments, policy, assistant_model_name):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return ['' for _ in segments]
+
+    async def run():
+        scheduler = ASRBatchScheduler(transcribe_batch, max_batch_size=1, max_wait_ms=1, max_concurrent_batches=2)
+        await asyncio.gather(*(scheduler.transcribe([np.zeros(1)], DecodingPolicy()) for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
@@ -0,0 +1,34 @@
+import pytest
+from src.decoding import DecodingPolicy, compression_ratio
+
+def test_forced_language_and_token_cap():
+    policy = DecodingPolicy.from_config({'language': 'ar', 'decoding_policy': {'tokens_per_second': 10, 'token_margin': 16}})
+
+    kwargs = policy.generate_kwargs(2.0)
+    assert kwargs['language'] == 'ar'
+    assert kwargs['task'] == 'transcribe'
+    assert kwargs['max_new_tokens'] == 36
+    assert kwargs['num_beams'] == 1 and kwargs['do_sample'] is False
+
+    # Never above Whisper's decoder length
+    assert policy.generate_kwargs(600.0)['max_new_tokens'] == 440
+
+def test_language_from_conversation_context():
+    policy = DecodingPolicy(language='ar')
+
+    assert policy.for_language('french').language == 'fr'
+    assert policy.for_language('mixed') is policy
+    assert policy.language == 'ar'
+
+def test_repetition_loop_triggers_fallback():
+    policy = DecodingPolicy()
+
+    loop = 'شكرا ' * 60
+    assert compression_ratio(loop) > policy.compression_ratio_threshold
+    assert policy.needs_fallback(loop, -0.2)
+    assert policy.needs_fallback('راني مقطوع من الإنترنت', -2.5)
+    assert not policy.needs_fallback('راني مقطوع من الإنترنت من البارح', -0.3)
+
+def test_unknown_setting_is_rejected():
+    with pytest.raises(ValueError):
+        DecodingPolicy.from_config({'decoding_policy': {'beam_size': 5}})
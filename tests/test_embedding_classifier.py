@@ -0,0 +1,26 @@
+import csv
+import pytest
+from src.embedding_classifier import DEFAULT_DATASET_PATH, EmbeddingIntentClassifier, load_topic_intents
+from src.models import IntentType
+
+def test_every_dataset_topic_maps_to_an_intent():
+    topic_intents = load_topic_intents()
+    intents = {intent.value for intent in IntentType}
+
+    with open(DEFAULT_DATASET_PATH, 'r', encoding='utf-8') as f:
+        topics = {row['Topic'] for row in csv.DictReader(f)}
+
+    assert topics <= set(topic_intents)
+    assert set(topic_intents.values()) <= intents
+
+def test_embedding_intent_classification():
+    pytest.importorskip("transformers")
+    classifier = EmbeddingIntentClassifier(cache_dir=None)
+
+    intent = classifier.classify("I want to book a table")
+    assert intent.type == IntentType.RESERVATION
+
+    # Closest dataset exemplar supplies the topic
+    intent = classifier.classify("الكونيكسيون ثقيلة بزاف، ما نقدر ندير والو")
+    assert intent.type == IntentType.TECHNICAL_SUPPORT
+    assert intent.parameters['topic'] == 'Slow Speed'
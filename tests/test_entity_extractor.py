@@ -0,0 +1,38 @@
+from src.entity_extractor import EntityExtractor
+from src.models import Entity
+
+def test_single_scan_matches_previous_entities():
+    entities = EntityExtractor().extract("Appelez-moi au 0551234567 le 12/05/2024 à 14:30, ou écrivez à client@algerie-telecom.dz")
+
+    assert entities == {
+        'phone': [Entity(type='phone', value='0551234567', raw_text='0551234567', confidence=0.8)],
+        'date': [Entity(type='date', value='12/05/2024', raw_text='12/05/2024', confidence=0.8)],
+        'time': [Entity(type='time', value='14:30', raw_text='14:30', confidence=0.8)],
+        'email': [Entity(type='email', value='client@algerie-telecom.dz', raw_text='client@algerie-telecom.dz', confidence=0.8)],
+    }
+
+def test_arabic_indic_digits_and_spaced_phone_groups():
+    extractor = EntityExtractor()
+
+    entities = extractor.extract("رقمي ٠٥٥١٢٣٤٥٦٧ والموعد ۱۲/۰۵/۲۰۲۴")
+    assert entities['phone'][0].value == '0551234567' and entities['phone'][0].raw_text == '٠٥٥١٢٣٤٥٦٧'
+    assert entities['date'][0].value == '12/05/2024'
+
+    phones = extractor.extract("05 51 23 45 67 ou +213 661-23-45-67")['phone']
+    assert [phone.value for phone in phones] == ['0551234567', '0661234567']
+
+    # Digits inside a longer number are not a phone
+    assert extractor.extract("commande 100551234567") == {}
+
+def test_overlapping_entities():
+    entities = EntityExtractor().extract("écrivez à 0551234567@gmail.com ou appelez le 05.51.23.45.67")
+
+    # A phone inside an email is reported with the email
+    assert [email.value for email in entities['email']] == ['0551234567@gmail.com']
+    assert [phone.value for phone in entities['phone']] == ['0551234567', '0551234567']
+    # Dotted phone groups are not also times
+    assert 'time' not in entities
+
+def test_extract_many():
+    results = EntityExtractor().extract_many(["à 9:30", "merci"])
+    assert [list(entities) for entities in results] == [['time'], []]
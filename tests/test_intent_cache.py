@@ -0,0 +1,35 @@
+import asyncio
+from src.intent_cache import IntentCache
+from src.models import Intent, IntentType
+
+def test_normalized_text_hits_and_model_change_misses():
+    async def run():
+        cache = IntentCache(max_entries=2)
+        version = IntentCache.model_version(('zero_shot', 'MoritzLaurer/bge-m3-zeroshot-v2.0'))
+        other = IntentCache.model_version(('embedding', '{}'))
+
+        await cache.set(IntentCache.key("La connexion ne marche pas", version), Intent(IntentType.TECHNICAL_SUPPORT, 0.9), latency_s=0.25)
+
+        # Case, punctuation and elongation do not matter
+        hit = await cache.get(IntentCache.key("la connexion ne marche pas!!!", version))
+        # Another classifier never sees the entry
+        miss = await cache.get(IntentCache.key("La connexion ne marche pas", other))
+        return hit, miss, cache.stats()
+
+    hit, miss, stats = asyncio.run(run())
+
+    assert hit.type == IntentType.TECHNICAL_SUPPORT and hit.confidence == 0.9
+    assert miss is None
+    assert stats['hits']['memory'] == 1 and stats['misses'] == 1
+    assert stats['saved_latency_s'] == 0.25
+
+def test_entries_expire():
+    async def run():
+        cache = IntentCache(ttl_s=1e-9)
+        await cache.set('merci', Intent(IntentType.INQUIRY, 0.5), latency_s=0.1)
+        await asyncio.sleep(0.001)
+        return await cache.get('merci'), cache.stats()
+
+    intent, stats = asyncio.run(run())
+    assert intent is None
+    assert stats['expired'] == 1 and stats['entries'] == 0
@@ -0,0 +1,28 @@
+from src.lexicon_classifier import LexiconIntentClassifier
+from src.models import IntentType
+
+def test_fast_path_decides_only_obvious_messages():
+    classifier = LexiconIntentClassifier(intent_keywords={'reservation': ['طاولة']})
+
+    assert classifier.classify("you are an asshole").type == IntentType.TOXIC
+    assert classifier.classify("نحب نحجز طاولة").type == IntentType.RESERVATION
+    assert classifier.classify("La connexion NE MARCHE PAS !!").type == IntentType.TECHNICAL_SUPPORT
+
+    # Competing intents, or no keyword at all, go to the model
+    assert classifier.classify("je veux annuler ma réservation") is None
+    assert classifier.classify("واش كاين") is None
+
+    stats = classifier.stats()
+    assert stats['messages'] == 5 and stats['short_circuited'] == 3
+    assert stats['decisions'] == {'toxic': 1, 'reservation': 1, 'technical_support': 1}
+
+def test_single_ambiguous_term_is_left_to_the_model():
+    classifier = LexiconIntentClassifier()
+
+    # Complaints mentioning an animal or venting frustration
+    assert classifier.classify("عندي مشكل مع الحيوان تاعي، ما يخدمش الفيزا") is None
+    assert classifier.classify("this idiot app does not work") is None
+
+    # Two of them are an insult
+    assert classifier.classify("يا حمار يا حيوان").type == IntentType.TOXIC
+    assert classifier.classify("stupid idiot").type == IntentType.TOXIC
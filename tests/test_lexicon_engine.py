@@ -0,0 +1,15 @@
+from src.lexicon_engine import LexiconAutomaton
+
+def test_matches_whole_normalized_tokens():
+    automaton = LexiconAutomaton({'ne marche pas': 'technical_support', 'bill': 'billing', 'نحب': 'darija'})
+
+    assert automaton.scan('la connexion ne marche pas'.split()) == [('ne marche pas', 'technical_support')]
+    # "billet" is not "bill", "نحبو" is not "نحب"
+    assert automaton.scan('un billet de train'.split()) == []
+    assert automaton.scan('نحبو'.split()) == []
+
+def test_overlapping_phrases_use_failure_links():
+    automaton = LexiconAutomaton({'a b c': 'long', 'b c d': 'overlap', 'c': 'single', 'b': 'single'})
+
+    assert automaton.scan('a b c d'.split()) == [('b', 'single'), ('a b c', 'long'), ('c', 'single'), ('b c d', 'overlap')]
+    assert automaton.size == 4
@@ -0,0 +1,23 @@
+import numpy as np
+from src.audio_io import iter_pcm_blocks, load_audio
+from src.streaming import StreamingVAD
+
+def test_blocks_reassemble_the_resampled_recording():
+    # sample_audio.wav is 8 kHz stereo: exercises mixdown and block-wise resampling
+    blocks = list(iter_pcm_blocks('sample_audio.wav', block_ms=250))
+
+    assert max(len(block) for block in blocks) <= 16000 * 250 // 1000
+    assert np.array_equal(np.concatenate(blocks), load_audio('sample_audio.wav').samples)
+
+def test_open_segment_is_capped():
+    vad = StreamingVAD(aggressiveness=0, max_segment_ms=300)
+
+    segments = []
+    for block in iter_pcm_blocks('sample_audio.wav', block_ms=250):
+        segments.extend(vad.feed(memoryview(block).cast('B')))
+    segments.extend(vad.flush())
+
+    assert len(segments) > 1
+    assert all(segment['end'] - segment['start'] <= 300 for segment in segments)
+    # Split segments are contiguous: nothing is lost at the cut
+    assert all(a['end'] == b['start'] for a, b in zip(segments, segments[1:]))
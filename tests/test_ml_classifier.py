@@ -17,3 +17,10 @@ def test_ml_intent_classification():
     # Test toxic intent
     intent = classifier.classify("you are stupid")
     assert intent.type == IntentType.TOXIC
+
+def test_ml_intent_classification_batch():
+    classifier = MLIntentClassifier()
+
+    intents = classifier.classify_batch(["I want to book a table", "you are stupid"])
+    assert [intent.type for intent in intents] == [IntentType.RESERVATION, IntentType.TOXIC]
+    assert classifier.classify_batch([]) == []
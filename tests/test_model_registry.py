@@ -0,0 +1,82 @@
+from src.model_registry import ModelRegistry
+
+class _Tensor:
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+    def numel(self):
+        return self.nbytes
+
+    def element_size(self):
+        return 1
+
+class _Model:
+    """Stands in for a torch module with `mb` megabytes of weights."""
+
+    def __init__(self, mb):
+        self.weights = [_Tensor(mb * 2**20)]
+
+    def parameters(self):
+        return self.weights
+
+    def buffers(self):
+        return []
+
+def test_models_are_shared_and_loaded_once():
+    registry = ModelRegistry()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return _Model(10)
+
+    first = registry.get(('nlu', 'bge-m3'), load, kind='nlu')
+    second = registry.get(('nlu', 'bge-m3'), load, kind='nlu')
+
+    assert first is second
+    assert len(loads) == 1
+    snapshot = registry.snapshot()
+    assert snapshot['models'][0]['hits'] == 1
+    assert snapshot['models'][0]['memory_mb'] >= 10
+
+def test_budget_evicts_least_recently_used():
+    registry = ModelRegistry(memory_budget_mb=250)
+
+    registry.get('whisper-small', lambda: _Model(100))
+    registry.get('bge-m3', lambda: _Model(100))
+    registry.get('whisper-small', lambda: _Model(100))
+    registry.get('whisper-tiny', lambda: _Model(100))
+
+    loaded = [model['key'] for model in registry.snapshot()['models']]
+    assert loaded == ['whisper-small', 'whisper-tiny']
+    assert registry.evictions == 1
+
+def test_loading_does_not_block_other_lookups():
+    import threading
+    import time
+
+    registry = ModelRegistry()
+    registry.get('loaded', lambda: _Model(1))
+    release = threading.Event()
+    loads = []
+
+    def slow_load():
+        loads.append(1)
+        release.wait(5)
+        return _Model(1)
+
+    threads = [threading.Thread(target=registry.get, args=('slow', slow_load)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    # A loaded model is served while another one is still loading
+    start = time.perf_counter()
+    registry.get('loaded', lambda: _Model(1))
+    assert time.perf_counter() - start < 0.5
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    # Concurrent callers of the loading key waited for the one load
+    assert len(loads) == 1
@@ -0,0 +1,102 @@
+import asyncio
+import pytest
+from src.models import Intent, IntentType
+from src.nlu_service import NLUBatchService
+
+class FakeClassifier:
+    def __init__(self, intent_type):
+        self.intent_type = intent_type
+        self.batches = []
+
+    def classify_batch(self, texts):
+        self.batches.append(list(texts))
+        return [Intent(type=self.intent_type, confidence=1.0, parameters={'text': text}) for text in texts]
+
+def test_concurrent_messages_share_batches():
+    zero_shot = FakeClassifier(IntentType.RESERVATION)
+    embedding = FakeClassifier(IntentType.BILLING)
+
+    async def run():
+        service = NLUBatchService(max_batch_size=4, max_wait_ms=20)
+        intents = await asyncio.gather(
+            service.classify("a", 'zero_shot', lambda: zero_shot),
+            service.classify("b", 'embedding', lambda: embedding),
+            service.classify("c", 'zero_shot', lambda: zero_shot),
+        )
+        service.shutdown()
+        return intents, service.metrics()
+
+    intents, metrics = asyncio.run(run())
+
+    # Each caller gets its own intent back
+    assert [(i.type, i.parameters['text']) for i in intents] == [
+        (IntentType.RESERVATION, 'a'), (IntentType.BILLING, 'b'), (IntentType.RESERVATION, 'c')
+    ]
+    # One batch per classifier, never mixed
+    assert zero_shot.batches == [['a', 'c']]
+    assert embedding.batches == [['b']]
+    assert metrics['messages'] == 3
+    assert metrics['batch_size_histogram'] == {1: 1, 2: 1}
+
+def test_batch_failure_reaches_every_caller():
+    class BrokenClassifier:
+        def classify_batch(self, texts):
+            raise RuntimeError("model unavailable")
+
+    async def run():
+        service = NLUBatchService(max_wait_ms=1)
+        await service.classify("a", 'broken', BrokenClassifier)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+def test_workers_run_batches_concurrently():
+    import threading
+    import time
+
+    running, peak, lock = 0, 0, threading.Lock()
+
+    class SlowClassifier:
+        def classify_batch(self, texts):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return [Intent(type=IntentType.INQUIRY, confidence=1.0) for _ in texts]
+
+    classifier = SlowClassifier()
+
+    async def run():
+        service = NLUBatchService(max_batch_size=1, max_wait_ms=1, workers=2)
+        await asyncio.gather(*(service.classify(str(i), 'slow', lambda: classifier) for i in range(6)))
+        service.shutdown()
+
+    asyncio.run(run())
+    assert peak == 2
+
+def test_shutdown_fails_waiting_callers():
+    import threading
+
+    release = threading.Event()
+
+    class BlockedClassifier:
+        def classify_batch(self, texts):
+            release.wait(1)
+            return [Intent(type=IntentType.INQUIRY, confidence=1.0) for _ in texts]
+
+    classifier = BlockedClassifier()
+
+    async def run():
+        service = NLUBatchService(max_batch_size=1, max_wait_ms=1)
+        # One message in flight, the others queued behind it
+        waiting = [asyncio.ensure_future(service.classify(str(i), 'blocked', lambda: classifier)) for i in range(3)]
+        await asyncio.sleep(0.02)
+        service.shutdown()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*waiting, return_exceptions=True), 1)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
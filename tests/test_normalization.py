@@ -0,0 +1,19 @@
+from src.normalization import normalize, normalize_many
+
+def test_arabic_folding_and_diacritics():
+    assert normalize('أَهْلاً بِكُم فِي الجَزائِر') == 'اهلا بكم في الجزائر'
+    assert normalize('الفاتورة مكتوبة على') == 'الفاتوره مكتوبه علي'
+    assert normalize('إنترنت آلي') == 'انترنت الي'
+
+def test_punctuation_whitespace_and_elongation():
+    assert normalize('  Bonjour!!   je veux une réservation, SVP… 😂 ') == 'bonjour je veux une réservation svp'
+    assert normalize('بزااااف merciii') == 'بزاف merci'
+    # Punctuation separates words even without a space after it
+    assert normalize("bonjour,je veux l'internet.merci") == 'bonjour je veux l internet merci'
+    assert normalize('سلام،واش راك؟لاباس') == 'سلام واش راك لاباس'
+    # Double letters and digit runs are meaningful
+    assert normalize('elle appelle 0555 00 11') == 'elle appelle 0555 00 11'
+
+def test_normalize_many_matches_normalize():
+    texts = ['واش راك؟', 'Connexion LENTE!!', None]
+    assert normalize_many(texts) == ['واش راك', 'connexion lente', '']
@@ -16,3 +16,6 @@ async def test_process_message():
 
     assert response['intent'] == IntentType.RESERVATION.value
     assert response['response'] == "When would you like to book?"
+    # Stage timings travel with the response
+    assert response['metadata']['timestamp']
+    assert set(response['metadata']['stage_ms']) >= {'context', 'language', 'intent', 'entities', 'response', 'save', 'total'}
@@ -0,0 +1,81 @@
+import os
+
+from src.models import Entity, Intent, IntentType, Language, LanguageContext
+from src.response_templates import ResponseTemplateEngine
+
+def _phone(value):
+    return {'phone': [Entity(type='phone', value=value, raw_text=value, confidence=0.8)]}
+
+def test_english_defaults_without_topic_or_known_language():
+    engine = ResponseTemplateEngine({'tenant_id': 'test'})
+
+    response = engine.render(Intent(type=IntentType.RESERVATION, confidence=0.9), LanguageContext(primary=Language.MSA), {})
+    assert response['text'] == "When would you like to book?"
+    assert response['action'] == 'request_reservation_details'
+
+    toxic = engine.render(Intent(type=IntentType.TOXIC, confidence=0.9), None, {})
+    assert toxic['end_conversation'] and toxic['action'] == 'flag_for_moderation'
+
+def test_localized_defaults_without_topic():
+    engine = ResponseTemplateEngine({'tenant_id': 'test'})
+    # Zero-shot, student and lexicon intents carry no dataset Topic
+    intent = Intent(type=IntentType.INQUIRY, confidence=0.9)
+
+    assert engine.render(intent, LanguageContext(primary=Language.DARIJA), {})['text'] == "كيفاش نقدر نعاونك؟"
+    french = engine.render(Intent(type=IntentType.RESERVATION, confidence=0.9), LanguageContext(primary=Language.FRENCH), {})
+    assert french['text'] == "Pour quand souhaitez-vous réserver ?"
+    assert french['action'] == 'request_reservation_details'
+
+def test_dataset_responses_per_topic_and_language():
+    engine = ResponseTemplateEngine({'tenant_id': 'test'})
+    intent = Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.9, parameters={'topic': 'Internet Outage'})
+
+    darija = engine.render(intent, LanguageContext(primary=Language.DARIJA), {})
+    french = engine.render(intent, LanguageContext(primary=Language.FRENCH), {})
+    assert darija['text'].startswith('آسف على الإزعاج')
+    assert french['text'].startswith('Je suis désolé')
+    assert darija['agent_action'] == french['agent_action'] == 'Check line status, create trouble ticket.'
+
+def test_tenant_templates_fill_slots_and_hot_reload(tmp_path):
+    path = tmp_path / 'templates.csv'
+    path.write_text(
+        "Intent,Language,Topic,Text,Action\n"
+        "technical_support,fr,Internet Outage,Je rappelle le {phone}.,create_trouble_ticket\n",
+        encoding='utf-8'
+    )
+    engine = ResponseTemplateEngine({'tenant_id': 'test', 'response_templates': {'path': str(path), 'reload_interval_s': 0}})
+    intent = Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.9, parameters={'topic': 'Internet Outage'})
+    french = LanguageContext(primary=Language.FRENCH)
+
+    response = engine.render(intent, french, _phone('0551234567'))
+    assert response['text'] == "Je rappelle le 05 51 23 45 67."
+    assert response['action'] == 'create_trouble_ticket'
+    # Without a phone the dataset response asking for it is used
+    assert engine.render(intent, french, {})['text'].startswith('Je suis désolé')
+
+    path.write_text(
+        "Intent,Language,Topic,Text,Action\n"
+        "technical_support,fr,Internet Outage,Nous vous rappelons au {phone}.,\n",
+        encoding='utf-8'
+    )
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (mtime, mtime))
+
+    response = engine.render(intent, french, _phone('0661234567'))
+    assert response['text'] == "Nous vous rappelons au 06 61 23 45 67."
+    assert engine.reloads == 2
+
+def test_broken_template_file_keeps_previous_table(tmp_path):
+    path = tmp_path / 'templates.csv'
+    path.write_text("Intent,Language,Topic,Text,Action\nreservation,,,Booking for {business_name}?,\n", encoding='utf-8')
+    engine = ResponseTemplateEngine({'tenant_id': 'test', 'business_name': 'Demo', 'response_templates': {'path': str(path), 'reload_interval_s': 0}})
+    intent = Intent(type=IntentType.RESERVATION, confidence=0.9)
+
+    path.write_text("Intent,Language,Topic,Text,Action\nreservaton,,,Typo,\n", encoding='utf-8')
+    mtime = os.path.getmtime(path) + 1
+    os.utime(path, (mtime, mtime))
+
+    assert engine.render(intent, None, {})['text'] == "Booking for Demo?"
+    assert engine.render(intent, None, {})['text'] == "Booking for Demo?"
+    # Tried once, not on every message
+    assert engine.reload_errors == 1 and engine.reloads == 1
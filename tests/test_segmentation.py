@@ -0,0 +1,27 @@
+from src.segmentation import postprocess_segments
+
+def test_fragments_are_merged_and_packed():
+    # 150 ms fragments every 400 ms, as produced on a noisy line
+    chunks = [{'start': s, 'end': s + 150} for s in range(0, 60000, 400)]
+
+    windows, report = postprocess_segments(chunks, padding_ms=200, max_window_ms=30000, audio_duration_ms=60000)
+
+    assert len(windows) == 2
+    assert all(w['end'] - w['start'] <= 30000 for w in windows)
+    assert report['raw_segments'] == 150
+    assert report['windows_saved'] == 148
+
+def test_short_isolated_segment_is_dropped():
+    chunks = [{'start': 1000, 'end': 3000}, {'start': 10000, 'end': 10090}]
+
+    windows, report = postprocess_segments(chunks, padding_ms=100, min_segment_ms=250)
+
+    assert windows == [{'start': 900, 'end': 3100}]
+    assert report['dropped_segments'] == 1
+
+def test_separate_segments_share_a_window():
+    chunks = [{'start': 0, 'end': 4000}, {'start': 8000, 'end': 12000}]
+
+    windows, _ = postprocess_segments(chunks, padding_ms=0, min_segment_ms=0, max_window_ms=30000)
+
+    assert windows == [{'start': 0, 'end': 12000}]
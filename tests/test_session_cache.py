@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from src.models import Intent, IntentType
+from src.session_cache import SessionCache
+from src.session_store import SessionStore
+from tests.test_session_codec import _Redis, _context
+
+def _turn(context, text):
+    intent = Intent(type=IntentType.INQUIRY, confidence=0.7)
+    messages = [{'role': 'customer', 'message': text}, {'role': 'agent', 'message': 'How can I help you?'}]
+    context.intent_history.append(intent)
+    context.conversation_history.extend(messages)
+    return [intent], messages
+
+def test_hits_need_no_redis_read_and_stale_entries_are_reloaded():
+    async def run():
+        redis_client = _Redis()
+        cache = SessionCache(SessionStore(redis_client), write_behind_ms=0)
+        context = _context()
+        await cache.save(context, context.intent_history, context.conversation_history)
+
+        # Own writes are fresh: the version check passes
+        assert await cache.load('c-1') == context
+        assert cache.hits['version_checked'] == 1
+
+        # Another worker saves a turn: the version moved, the entry is reloaded
+        other = SessionStore(redis_client)
+        changed = await other.load('c-1')
+        await other.save(changed, *_turn(changed, 'wach kayen?'))
+        loaded = await cache.load('c-1')
+        assert loaded == changed
+        assert cache.stale == 1
+
+        # A turn that fails before its save leaves the cache untouched
+        loaded.conversation_history.append({'role': 'customer', 'message': 'half a turn'})
+
+        # While subscribed to invalidations, hits read nothing
+        cache._listening = True
+        round_trips = cache.store.round_trips
+        assert await cache.load('c-1') == changed
+        assert cache.store.round_trips == round_trips
+
+    asyncio.run(run())
+
+def test_write_behind_coalesces_saves():
+    async def run():
+        redis_client = _Redis()
+        cache = SessionCache(SessionStore(redis_client), write_behind_ms=20)
+        first, second = _context(), _context()
+        second.conversation_id = 'c-2'
+
+        await cache.save(first, first.intent_history, first.conversation_history)
+        await cache.save(first, *_turn(first, 'merci'))
+        await cache.save(second, second.intent_history, second.conversation_history)
+        assert 'session:c-1' not in redis_client.data
+        assert cache.coalesced_saves == 1
+
+        await asyncio.sleep(0.05)
+        # Three turns of two conversations in one round trip
+        assert cache.store.round_trips == 1
+        assert cache.stats()['redis_round_trips_per_turn'] == pytest.approx(1 / 3)
+        assert await SessionStore(redis_client).load('c-1') == first
+
+        await cache.delete('c-1')
+        assert await cache.load('c-1') is None
+        await cache.close()
+
+    asyncio.run(run())
+
+def test_pending_save_evicted_from_lru_is_still_loaded():
+    async def run():
+        redis_client = _Redis()
+        cache = SessionCache(SessionStore(redis_client), max_entries=1, write_behind_ms=0)
+        first = _context()
+        await cache.save(first, first.intent_history, first.conversation_history)
+
+        cache.write_behind_s = 60
+        await cache.save(first, *_turn(first, 'merci'))
+        second = _context()
+        second.conversation_id = 'c-2'
+        await cache.save(second, second.intent_history, second.conversation_history)
+        assert 'c-1' not in cache._entries
+
+        # Served from the pending save, not the older copy in Redis
+        assert await cache.load('c-1') == first
+        assert cache.misses == 0
+
+        await cache.flush()
+        assert await SessionStore(redis_client).load('c-1') == first
+        await cache.close()
+
+    asyncio.run(run())
+
+def test_pending_turn_based_on_a_stale_version_does_not_overwrite_another_worker():
+    async def run():
+        redis_client = _Redis()
+        worker, other = SessionCache(SessionStore(redis_client), write_behind_ms=0), SessionCache(SessionStore(redis_client), write_behind_ms=0)
+        context = _context()
+        await worker.save(context, context.intent_history, context.conversation_history)
+
+        # Without affinity, both workers handle a turn of the conversation
+        mine, theirs = await worker.load('c-1'), await other.load('c-1')
+        worker.write_behind_s = 60
+        await worker.save(mine, *_turn(mine, 'merci'))
+        await other.save(theirs, *_turn(theirs, 'wach kayen?'))
+
+        # The pending turn is flushed before the hit, conflicts and is reloaded with both turns
+        loaded = await worker.load('c-1')
+        assert worker.conflicts == 1 and worker.stale == 1
+        assert [message['message'] for message in loaded.conversation_history[-4::2]] == ['wach kayen?', 'merci']
+        assert loaded.intent_history == context.intent_history + [Intent(type=IntentType.INQUIRY, confidence=0.7)] * 2
+        await worker.close()
+
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from dataclasses import asdict
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from src.models import ConversationContext, Entity, Intent, IntentType, Language, LanguageContext
+from src.session_codec import decode_context, decode_legacy_json, encode_intent, encode_message, encode_state
+from src.session_store import SessionStore
+
+def _context():
+    context = ConversationContext(
+        conversation_id='c-1',
+        tenant_id='demo_tenant',
+        customer_id='42',
+        language_context=LanguageContext(primary=Language.MIXED, contains_darija=True, contains_french=True, darija_words=['bghit'], french_words=['internet'], confidence=0.7),
+        pending_reservation={'date': '12/05/2024'},
+        metadata={'channel': 'whatsapp'},
+        created_at=datetime(2024, 5, 12, 9, 30, 0, 123456)
+    )
+    context.intent_history.append(Intent(type=IntentType.TECHNICAL_SUPPORT, confidence=0.91, parameters={'topic': 'Internet Outage', 'similarity': 0.83}))
+    context.entities['phone'] = [Entity(type='phone', value='0551234567', raw_text='05 51 23 45 67', confidence=0.8)]
+    context.conversation_history += [{'role': 'customer', 'message': 'internet ma yemchich'}, {'role': 'agent', 'message': 'آسف على الإزعاج'}]
+    return context
+
+def test_round_trip_is_exact():
+    context = _context()
+    encoded = decode_context(
+        encode_state(context),
+        [encode_intent(intent) for intent in context.intent_history],
+        [encode_message(message) for message in context.conversation_history]
+    )
+    assert encoded == context
+
+    legacy = json.dumps(asdict(context), default=str).encode('utf-8')
+    assert decode_legacy_json(legacy) == context
+    # Smaller than the JSON blob even with the history
+    assert len(encode_state(context)) < len(legacy) / 2
+
+class _Redis:
+    """Commands of redis.asyncio used by the session store, on a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    def _run(self, name, key, *args, **kwargs):
+        if name == 'get':
+            return self.data.get(key)
+        if name == 'lrange':
+            return list(self.data.get(key, []))
+        if name == 'set':
+            self.data[key] = args[0]
+        elif name == 'rpush':
+            self.data.setdefault(key, []).extend(args)
+            return len(self.data[key])
+        elif name == 'incr':
+            self.data[key] = int(self.data.get(key, 0)) + 1
+            return self.data[key]
+        elif name == 'publish':
+            self.published.append((key, args[0]))
+        elif name == 'eval':
+            return self._save_if_unchanged(*args)
+        return True
+
+    def _save_if_unchanged(self, numkeys, state_key, intents_key, history_key, version_key, expected_version, ttl, state, intents, *args):
+        # The session store's compare-and-set script
+        *entries, channel, message = args
+        unchanged = expected_version == '' or int(self.data.get(version_key, 0)) == expected_version
+        if unchanged:
+            self._run('set', state_key, state)
+        if entries[:intents]:
+            self._run('rpush', intents_key, *entries[:intents])
+        if entries[intents:]:
+            self._run('rpush', history_key, *entries[intents:])
+        if channel:
+            self._run('publish', channel, message)
+        return [self._run('incr', version_key), int(unchanged)]
+
+    async def get(self, key):
+        return self._run('get', key)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return _Pipeline(self)
+
+class _Pipeline:
+    def __init__(self, redis_client):
+        self.redis_client, self.commands = redis_client, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        return [self.redis_client._run(name, *args, **kwargs) for name, args, kwargs in self.commands]
+
+def test_store_appends_turns():
+    async def run():
+        redis_client = _Redis()
+        store = SessionStore(redis_client)
+        context = _context()
+        await store.save(context, context.intent_history, context.conversation_history)
+
+        loaded = await store.load('c-1')
+        assert loaded == context
+
+        intent = Intent(type=IntentType.BILLING, confidence=0.6)
+        loaded.intent_history.append(intent)
+        loaded.conversation_history.append({'role': 'customer', 'message': 'facture'})
+        await store.save(loaded, [intent], loaded.conversation_history[-1:])
+
+        assert len(redis_client.data['session:c-1:history']) == 3
+        assert redis_client.data['session:c-1:version'] == 2
+        assert await store.load('c-1') == loaded
+        assert await store.load('unknown') is None
+
+        # Sessions saved as JSON before the codec are migrated on load
+        legacy = _context()
+        legacy.conversation_id = 'c-2'
+        redis_client.data['session:c-2'] = json.dumps(asdict(legacy), default=str).encode('utf-8')
+        assert await store.load('c-2') == legacy
+        assert len(redis_client.data['session:c-2:intents']) == 1
+
+    asyncio.run(run())
@@ -0,0 +1,18 @@
+import pytest
+from src.models import IntentType
+
+def test_student_round_trip(tmp_path):
+    pytest.importorskip("sklearn")
+    import joblib
+    from data_processing.distill_intent_model import train_student
+    from src.student_classifier import StudentIntentClassifier
+
+    texts = ["je veux réserver une table", "نحب نحجز طاولة", "réservation pour demain", "je veux réserver",
+             "ma facture est trop chère", "الفاتورة غالية", "problème de facture", "facture incorrecte"]
+    intents = ["reservation"] * 4 + ["billing"] * 4
+    model_path = tmp_path / "student.joblib"
+    joblib.dump({'pipeline': train_student(texts, intents), 'teacher_model': 'teacher'}, model_path)
+
+    student = StudentIntentClassifier(str(model_path))
+    assert student.classify("je voudrais réserver").type == IntentType.RESERVATION
+    assert [intent.type for intent in student.classify_batch(["facture", "réserver"])] == [IntentType.BILLING, IntentType.RESERVATION]
@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+from src.decoding import DecodingPolicy
+from src.transcription_cache import TranscriptionCache
+
+def test_same_audio_hits_and_config_change_misses():
+    async def run():
+        cache = TranscriptionCache(max_entries=2)
+        samples = np.arange(16000, dtype=np.int16)
+
+        namespace = TranscriptionCache.namespace('openai/whisper-small', 'torch', DecodingPolicy(language='ar'))
+        await cache.set(TranscriptionCache.key(samples, namespace), 'السلام عليكم')
+
+        # Same PCM in a fresh buffer
+        assert await cache.get(TranscriptionCache.key(samples.copy(), namespace)) == 'السلام عليكم'
+
+        # A different model or decoding setting never sees the old entry
+        other_model = TranscriptionCache.namespace('openai/whisper-tiny', 'torch', DecodingPolicy(language='ar'))
+        other_policy = TranscriptionCache.namespace('openai/whisper-small', 'torch', DecodingPolicy(language='fr'))
+        assert await cache.get(TranscriptionCache.key(samples, other_model)) is None
+        assert await cache.get(TranscriptionCache.key(samples, other_policy)) is None
+
+        stats = cache.stats()
+        assert stats['hits']['memory'] == 1 and stats['misses'] == 2
+
+    asyncio.run(run())
+
+def test_lru_eviction_and_disk_tier(tmp_path):
+    async def run():
+        cache = TranscriptionCache(max_entries=1, disk_dir=str(tmp_path))
+        await cache.set('a', 'first')
+        await cache.set('b', 'second')
+
+        # Evicted from memory, still on disk
+        assert await cache.get('a') == 'first'
+        assert cache.stats()['hits']['disk'] == 1
+
+        # A new process starts cold in memory but warm on disk
+        assert await TranscriptionCache(disk_dir=str(tmp_path)).get('b') == 'second'
+
+    asyncio.run(run())
+
+def test_disk_tier_is_bounded(tmp_path):
+    async def run():
+        cache = TranscriptionCache(max_entries=1, disk_dir=str(tmp_path), disk_max_entries=2)
+        for key in 'abc':
+            await cache.set(key, key)
+
+        # Oldest file deleted
+        assert sorted(path.stem for path in tmp_path.glob('*.txt')) == ['b', 'c']
+        assert await cache.get('a') is None
+        assert cache.stats()['disk_evictions'] == 1
+
+    asyncio.run(run())